@@ -10,8 +10,14 @@ from alembic import context
 from models.base import Base
 
 from models.account import Account
+from models.account_daily_total import AccountDailyTotal
+from models.idempotency_key import IdempotencyKey
+from models.login_failure import LoginFailure
+from models.outbox import OutboxEvent, OutboxOffset
 from models.payment import Payment
 from models.user import User
+from models.user_purge import UserPurge
+from models.user_stats import UserStats
 
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,56 @@
+"""add user stats
+
+Revision ID: 290a88f249f5
+Revises: 32e07116c47a
+Create Date: 2026-10-19 11:03:47.902115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '290a88f249f5'
+down_revision: Union[str, Sequence[str], None] = '32e07116c47a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('accounts_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_balance', sa.Numeric(precision=18, scale=2), server_default='0', nullable=False),
+        sa.Column('payments_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('last_payment_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_index('ix_user_stats_accounts_count', 'user_stats', ['accounts_count', 'user_id'], unique=False)
+    op.create_index('ix_user_stats_total_balance', 'user_stats', ['total_balance', 'user_id'], unique=False)
+    op.create_index('ix_user_stats_payments_count', 'user_stats', ['payments_count', 'user_id'], unique=False)
+    op.create_index('ix_user_stats_last_payment_at', 'user_stats', ['last_payment_at', 'user_id'], unique=False)
+    op.execute(
+        "INSERT INTO user_stats "
+        "(user_id, accounts_count, total_balance, payments_count, last_payment_at) "
+        "SELECT u.id, coalesce(a.accounts_count, 0), coalesce(a.total_balance, 0), "
+        "coalesce(p.payments_count, 0), p.last_payment_at "
+        "FROM users u "
+        "LEFT JOIN (SELECT user_id, count(*) AS accounts_count, sum(balance) AS total_balance "
+        "FROM accounts GROUP BY user_id) a ON a.user_id = u.id "
+        "LEFT JOIN (SELECT user_id, count(*) AS payments_count, max(created_at) AS last_payment_at "
+        "FROM payments GROUP BY user_id) p ON p.user_id = u.id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_stats_last_payment_at', table_name='user_stats')
+    op.drop_index('ix_user_stats_payments_count', table_name='user_stats')
+    op.drop_index('ix_user_stats_total_balance', table_name='user_stats')
+    op.drop_index('ix_user_stats_accounts_count', table_name='user_stats')
+    op.drop_table('user_stats')
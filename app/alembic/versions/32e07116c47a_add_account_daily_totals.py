@@ -0,0 +1,51 @@
+"""add account daily totals
+
+Revision ID: 32e07116c47a
+Revises: 6af01d6c2259
+Create Date: 2026-10-19 10:12:31.418204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '32e07116c47a'
+down_revision: Union[str, Sequence[str], None] = '6af01d6c2259'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Payments had no timestamp before this revision, so every existing
+    # payment gets created_at = the time of the migration and is rolled up
+    # under the migration day. Statements for earlier days are therefore
+    # empty, and the migration day holds the whole history of the account.
+    op.add_column('payments', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.create_table(
+        'account_daily_totals',
+        sa.Column('account_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('payments_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_amount', sa.Numeric(precision=18, scale=2), server_default='0', nullable=False),
+        sa.Column('min_amount', sa.Numeric(precision=18, scale=2), nullable=False),
+        sa.Column('max_amount', sa.Numeric(precision=18, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('account_id', 'day'),
+    )
+    op.execute(
+        "INSERT INTO account_daily_totals "
+        "(account_id, day, payments_count, total_amount, min_amount, max_amount) "
+        "SELECT account_id, (created_at AT TIME ZONE 'UTC')::date, "
+        "count(*), sum(amount), min(amount), max(amount) "
+        "FROM payments GROUP BY account_id, (created_at AT TIME ZONE 'UTC')::date"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('account_daily_totals')
+    op.drop_column('payments', 'created_at')
@@ -0,0 +1,44 @@
+"""add soft delete and user purges
+
+Revision ID: 556b22882c8f
+Revises: f5ad46579116
+Create Date: 2026-10-19 16:11:40.318275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '556b22882c8f'
+down_revision: Union[str, Sequence[str], None] = 'f5ad46579116'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('accounts', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_table(
+        'user_purges',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('payments_deleted', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('payments_total', sa.BigInteger(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_index(op.f('ix_user_purges_status'), 'user_purges', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_purges_status'), table_name='user_purges')
+    op.drop_table('user_purges')
+    op.drop_column('accounts', 'deleted_at')
+    op.drop_column('users', 'deleted_at')
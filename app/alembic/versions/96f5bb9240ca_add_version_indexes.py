@@ -0,0 +1,32 @@
+"""add account versions and version indexes for conditional responses
+
+Revision ID: 96f5bb9240ca
+Revises: ea9513a3ab5e
+Create Date: 2026-10-19 14:27:52.641390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '96f5bb9240ca'
+down_revision: Union[str, Sequence[str], None] = 'ea9513a3ab5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('accounts', sa.Column('version', sa.BigInteger(), server_default='0', nullable=False))
+    op.create_index('ix_accounts_user_id_version', 'accounts', ['user_id', 'id', 'version'], unique=False)
+    op.create_index('ix_payments_user_id_id', 'payments', ['user_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payments_user_id_id', table_name='payments')
+    op.drop_index('ix_accounts_user_id_version', table_name='accounts')
+    op.drop_column('accounts', 'version')
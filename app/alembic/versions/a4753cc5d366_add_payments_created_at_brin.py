@@ -0,0 +1,34 @@
+"""add brin index on payments.created_at
+
+Revision ID: a4753cc5d366
+Revises: aa6e0fa25461
+Create Date: 2026-10-19 18:12:37.402518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4753cc5d366'
+down_revision: Union[str, Sequence[str], None] = 'aa6e0fa25461'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Payments are appended in time order, so a BRIN index lets time-range
+    # exports skip straight to their blocks for a few pages of index.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_payments_created_at_brin "
+            "ON payments USING brin (created_at)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_payments_created_at_brin")
@@ -0,0 +1,45 @@
+"""add trigram indexes for user search
+
+Revision ID: aa6e0fa25461
+Revises: 556b22882c8f
+Create Date: 2026-10-19 16:48:05.771902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'aa6e0fa25461'
+down_revision: Union[str, Sequence[str], None] = '556b22882c8f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently so that migrating a large users table does not
+    # block logins and webhooks.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_trgm "
+            "ON users USING gin (email gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_full_name_trgm "
+            "ON users USING gin (full_name gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_lower_prefix "
+            "ON users (lower(email) text_pattern_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_lower_prefix")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_full_name_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_trgm")
@@ -0,0 +1,36 @@
+"""add login failures
+
+Revision ID: c47ad477a000
+Revises: a4753cc5d366
+Create Date: 2026-10-19 19:02:51.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47ad477a000'
+down_revision: Union[str, Sequence[str], None] = 'a4753cc5d366'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'login_failures',
+        sa.Column('key', sa.String(length=330), nullable=False),
+        sa.Column('bucket', sa.BigInteger(), nullable=False),
+        sa.Column('failures', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('key', 'bucket'),
+    )
+    op.create_index(op.f('ix_login_failures_bucket'), 'login_failures', ['bucket'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_login_failures_bucket'), table_name='login_failures')
+    op.drop_table('login_failures')
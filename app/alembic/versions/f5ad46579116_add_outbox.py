@@ -0,0 +1,46 @@
+"""add transactional outbox
+
+Revision ID: f5ad46579116
+Revises: 96f5bb9240ca
+Create Date: 2026-10-19 15:02:18.904127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5ad46579116'
+down_revision: Union[str, Sequence[str], None] = '96f5bb9240ca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'outbox_events',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('topic', sa.String(length=64), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('claimed_until', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'outbox_offsets',
+        sa.Column('sink', sa.String(length=255), nullable=False),
+        sa.Column('last_event_id', sa.BigInteger(), nullable=False),
+        sa.Column('delivered_count', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('sink'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('outbox_offsets')
+    op.drop_table('outbox_events')
@@ -0,0 +1,86 @@
+import time
+from decimal import Decimal
+
+from sqlalchemy import select, exists, func, literal_column
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import configure_mappers
+
+from models.account import Account
+from models.payment import Payment
+from models.user import User
+from repositories import account, payment, user
+
+
+def _built_per_call():
+    """The webhook statements as they were built on every call before."""
+    return {
+        "payment.exists_transaction": lambda: select(
+            exists().where(Payment.transaction_id == "tx")
+        ),
+        "account.get_for_update": lambda: select(Account)
+        .where(Account.id == 1)
+        .with_for_update(),
+        "user.exists": lambda: select(exists().where(User.id == 1)),
+        "account.create_or_update": lambda: insert(Account)
+        .values(id=1, user_id=1)
+        .on_conflict_do_update(index_elements=["id"], set_={"updated_at": func.now()})
+        .returning(Account, literal_column("xmax = 0").label("created")),
+        "payment.create_if_not_exists": lambda: insert(Payment)
+        .values(transaction_id="tx", user_id=1, account_id=1, amount=Decimal("1"))
+        .on_conflict_do_nothing(index_elements=["transaction_id"])
+        .returning(Payment),
+    }
+
+
+PREBUILT = {
+    "payment.exists_transaction": payment.EXISTS_TRANSACTION,
+    "account.get_for_update": account.GET_FOR_UPDATE,
+    "user.exists": user.EXISTS,
+    "account.create_or_update": account.CREATE_OR_UPDATE,
+    "payment.create_if_not_exists": payment.CREATE_IF_NOT_EXISTS,
+}
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "bench-statements",
+        help="Measure per-call SQLAlchemy overhead of the webhook statements.",
+    )
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.set_defaults(handler=bench_statements, needs_db=False)
+
+
+def _per_call_us(func, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def bench_statements(args) -> int:
+    """
+    For every statement on the webhook path, print the Python time spent per
+    call before any SQL is sent: building the construct and computing its
+    cache key (what a compiled-cache hit costs), against reusing the prebuilt
+    construct. The cold compile column is the cost of a cache miss.
+    """
+    configure_mappers()
+    dialect = postgresql.asyncpg.dialect()
+    n = args.iterations
+    built = _built_per_call()
+    for name, build in built.items():
+        build()._generate_cache_key()
+        PREBUILT[name]._generate_cache_key()
+    print(f"{'statement':32} {'built us':>10} {'prebuilt us':>12} {'compile us':>11}")
+    totals = [0.0, 0.0]
+    for name, build in built.items():
+        stmt = PREBUILT[name]
+        per_call = _per_call_us(lambda: build()._generate_cache_key(), n)
+        prebuilt = _per_call_us(stmt._generate_cache_key, n)
+        compile_us = _per_call_us(lambda: stmt.compile(dialect=dialect), max(n // 50, 1))
+        totals[0] += per_call
+        totals[1] += prebuilt
+        print(f"{name:32} {per_call:10.1f} {prebuilt:12.1f} {compile_us:11.1f}")
+    print(f"{'per webhook (new account)':32} {totals[0]:10.1f} {totals[1]:12.1f}")
+    return 0
@@ -0,0 +1,95 @@
+import statistics
+import time
+
+from config import settings
+from utils.security import SUPPORTED_SCHEMES
+
+PASSWORD = "calibration-password"
+
+# Cost parameter swept per scheme, with its setting and search range.
+COSTS = {
+    "bcrypt": ("rounds", "PASSWORD_BCRYPT_ROUNDS", range(8, 18)),
+    "argon2": ("time_cost", "PASSWORD_ARGON2_TIME_COST", range(1, 11)),
+}
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "calibrate-hash",
+        help="Measure password hash cost on this host and recommend settings.",
+    )
+    parser.add_argument(
+        "--scheme",
+        choices=SUPPORTED_SCHEMES,
+        default=None,
+        help="Scheme to calibrate (default: first of PASSWORD_SCHEMES).",
+    )
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=250,
+        help="Highest acceptable time of one hash or verify.",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=5,
+        help="Hashes timed per cost; the median is used.",
+    )
+    parser.set_defaults(handler=calibrate_hash, needs_db=False)
+
+
+def _handler(scheme: str, cost: int):
+    from passlib import hash as handlers
+
+    if scheme == "argon2":
+        return handlers.argon2.using(
+            rounds=cost,
+            memory_cost=settings.PASSWORD_ARGON2_MEMORY_COST,
+            parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+        )
+    return handlers.bcrypt.using(rounds=cost)
+
+
+def _median_ms(handler, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash(PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def calibrate_hash(args) -> int:
+    """
+    Time hashing at increasing cost until the target is exceeded and print
+    the highest cost that stays within it. Runs on one core, like a login.
+    """
+    scheme = args.scheme or settings.PASSWORD_SCHEMES[0]
+    name, setting, costs = COSTS[scheme]
+    current = getattr(settings, setting)
+    if scheme == "argon2":
+        print(
+            f"argon2 memory_cost={settings.PASSWORD_ARGON2_MEMORY_COST} KiB, "
+            f"parallelism={settings.PASSWORD_ARGON2_PARALLELISM}"
+        )
+    print(f"{name:>10} {'median ms':>10}")
+
+    best = None
+    for cost in costs:
+        ms = _median_ms(_handler(scheme, cost), args.samples)
+        marker = "  (current)" if cost == current else ""
+        print(f"{cost:>10} {ms:>10.1f}{marker}")
+        if ms > args.target_ms:
+            break
+        best = cost
+
+    if best is None:
+        print(f"even the lowest {name} exceeds {args.target_ms:g} ms on this host")
+        return 1
+    print(f"recommended: {setting}={best} (target {args.target_ms:g} ms)")
+    if best != current:
+        print(
+            "existing hashes are rehashed at the new cost on their next successful login"
+        )
+    return 0
@@ -0,0 +1,45 @@
+import sys
+
+from config import settings
+from commands.reconcile import duty_cycle
+from db import async_session_maker
+from services.user_purge import UserPurgeService
+from uow import UnitOfWork
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "purge-users",
+        help="Run queued purges of deleted users in the foreground.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Payments deleted per transaction (default: PURGE_CHUNK_SIZE).",
+    )
+    parser.add_argument(
+        "--duty-cycle",
+        type=duty_cycle,
+        default=None,
+        help="Fraction of wall time spent deleting, (0-1] (default: PURGE_DUTY_CYCLE).",
+    )
+    parser.set_defaults(handler=purge_users)
+
+
+async def purge_users(args) -> int:
+    """Purge every queued user, printing progress after each chunk."""
+
+    def progress(user_id: int, deleted: int, total: int | None):
+        of = f"/{total}" if total is not None else ""
+        print(f"user {user_id}: {deleted}{of} payments deleted", file=sys.stderr)
+
+    chunk_size = args.chunk_size or settings.PURGE_CHUNK_SIZE
+    duty = args.duty_cycle or settings.PURGE_DUTY_CYCLE
+    purged = 0
+    async with UnitOfWork(async_session_maker) as uow:
+        svc = UserPurgeService(uow)
+        while await svc.purge_next(chunk_size, duty, progress) is not None:
+            purged += 1
+    print(f"{purged} users purged")
+    return 0
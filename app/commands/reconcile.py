@@ -0,0 +1,75 @@
+import argparse
+import json
+import sys
+
+from db import async_session_maker
+from services.reconciliation import ReconciliationService
+from uow import UnitOfWork
+
+
+def duty_cycle(value: str) -> float:
+    duty = float(value)
+    if not 0 < duty <= 1:
+        raise argparse.ArgumentTypeError("must be greater than 0 and at most 1")
+    return duty
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "reconcile-balances",
+        help="Compare account balances with the sum of their payments.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Number of accounts compared per query.",
+    )
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="Set mismatching balances to the sum of their payments.",
+    )
+    parser.add_argument(
+        "--duty-cycle",
+        type=duty_cycle,
+        default=0.5,
+        help="Fraction of wall time spent querying (0-1]; lower is gentler on the database.",
+    )
+    parser.add_argument(
+        "--report",
+        default="-",
+        help="File receiving one JSON line per mismatch ('-' for stdout).",
+    )
+    parser.set_defaults(handler=reconcile_balances)
+
+
+async def reconcile_balances(args) -> int:
+    """Report (and optionally repair) accounts whose balance is off; exit 1 if any."""
+    out = sys.stdout if args.report == "-" else open(args.report, "w", encoding="utf-8")
+
+    def report(entry: dict):
+        out.write(json.dumps(entry) + "\n")
+        out.flush()
+
+    def progress(last_id: int, scanned: int):
+        print(f"scanned {scanned} accounts up to id {last_id}", file=sys.stderr)
+
+    try:
+        async with UnitOfWork(async_session_maker) as uow:
+            totals = await ReconciliationService(uow).run(
+                chunk_size=args.chunk_size,
+                repair=args.repair,
+                duty_cycle=args.duty_cycle,
+                report=report,
+                progress=progress,
+            )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(
+        "{scanned} scanned, {mismatched} mismatched, {repaired} repaired, "
+        "{busy} skipped as busy".format(**totals),
+        file=sys.stderr,
+    )
+    return 1 if totals["mismatched"] > totals["repaired"] else 0
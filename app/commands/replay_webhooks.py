@@ -0,0 +1,271 @@
+import argparse
+import asyncio
+import bisect
+import gzip
+import heapq
+import json
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from pydantic import ValidationError
+
+from schemas.payment import WebhookIn
+from utils.idempotency import HEADER as IDEMPOTENCY_HEADER
+from utils.security import compute_signature
+
+WEBHOOK_PATH = "/webhooks/payment"
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Upper bounds (ms) of the latency histogram buckets.
+HISTOGRAM_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+MAX_EXAMPLES = 10
+
+
+def speed(value: str) -> float | None:
+    """Replay speed: a multiple of the captured pace, or "max" for no pacing."""
+    if value == "max":
+        return None
+    factor = float(value.rstrip("x"))
+    if factor <= 0:
+        raise argparse.ArgumentTypeError("must be positive or 'max'")
+    return factor
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "replay-webhooks",
+        help="Replay captured webhooks against an instance and compare statuses.",
+    )
+    parser.add_argument(
+        "files",
+        nargs="+",
+        help="Capture files (WEBHOOK_CAPTURE_DIR); several are merged by arrival time.",
+    )
+    parser.add_argument(
+        "--url",
+        default="http://127.0.0.1:8000",
+        help="Base URL of the target instance.",
+    )
+    parser.add_argument(
+        "--secret",
+        required=True,
+        help="SECRET_KEY of the target instance, used to re-sign the bodies.",
+    )
+    parser.add_argument(
+        "--speed",
+        type=speed,
+        default=1.0,
+        help="1 for the captured pace, N (or Nx) for N times faster, 'max' for no pacing.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=32,
+        help="Maximum requests in flight (one keep-alive connection each).",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Stop after this many webhooks.",
+    )
+    parser.set_defaults(handler=replay_webhooks, needs_db=False)
+
+
+def _read_capture(path: str):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def resign(body: str, secret: str) -> bytes:
+    """
+    Replaces the signature of a captured body with one made for `secret`.
+    The signed values are taken from the validated body, as the service
+    does; bodies that do not validate are sent unchanged.
+    """
+    try:
+        data = WebhookIn.model_validate_json(body).model_dump()
+        raw = json.loads(body)
+    except (ValidationError, ValueError):
+        return body.encode()
+    raw["signature"] = compute_signature(
+        account_id=data["account_id"],
+        amount=data["amount"],
+        transaction_id=data["transaction_id"],
+        user_id=data["user_id"],
+        secret=secret,
+    )
+    return json.dumps(raw).encode()
+
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client for JSON POSTs, over TLS if `tls`."""
+
+    def __init__(self, host: str, port: int, tls: bool = False):
+        self.host = host
+        self.port = port
+        self.tls = tls
+        self._reader = None
+        self._writer = None
+
+    async def post(self, path: str, body: bytes, headers: dict) -> int:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port, ssl=self.tls or None
+            )
+        head = [
+            f"POST {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            *(f"{k}: {v}" for k, v in headers.items()),
+        ]
+        try:
+            self._writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+            status_line = await self._reader.readline()
+            if not status_line:
+                raise ConnectionError("connection closed by server")
+            status = int(status_line.split()[1])
+            length, close = 0, False
+            while (line := await self._reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                name = name.strip().lower()
+                if name == "content-length":
+                    length = int(value)
+                elif name == "connection" and value.strip().lower() == "close":
+                    close = True
+            await self._reader.readexactly(length)
+        except Exception:
+            self.close()
+            raise
+        if close:
+            self.close()
+        return status
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+
+class ReplayReport:
+    def __init__(self):
+        self.sent = 0
+        self.errors = 0
+        self.latencies_ms: list[float] = []
+        self.buckets = [0] * (len(HISTOGRAM_MS) + 1)
+        self.statuses = Counter()
+        self.divergences = Counter()
+        self.examples: list[str] = []
+        self.max_lag_ms = 0.0
+
+    def add(self, entry: dict, status: int | None, latency_ms: float) -> None:
+        self.sent += 1
+        if status is None:
+            self.errors += 1
+            return
+        self.latencies_ms.append(latency_ms)
+        self.buckets[bisect.bisect_left(HISTOGRAM_MS, latency_ms)] += 1
+        self.statuses[status] += 1
+        expected = entry.get("status")
+        if expected is not None and expected != status:
+            self.divergences[(expected, status)] += 1
+            if len(self.examples) < MAX_EXAMPLES:
+                self.examples.append(f"{expected} -> {status}: {entry['body'][:200]}")
+
+    def _percentile(self, ordered: list[float], p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+    def print(self, elapsed: float, out=sys.stdout) -> None:
+        print(
+            f"{self.sent} sent in {elapsed:.1f} s ({self.sent / elapsed:.0f}/s), "
+            f"{self.errors} connection errors, max schedule lag {self.max_lag_ms:.0f} ms",
+            file=out,
+        )
+        if self.latencies_ms:
+            ordered = sorted(self.latencies_ms)
+            print(
+                "latency ms: "
+                + ", ".join(
+                    f"p{int(p * 100)} {self._percentile(ordered, p):.1f}"
+                    for p in (0.5, 0.9, 0.99)
+                )
+                + f", max {ordered[-1]:.1f}",
+                file=out,
+            )
+            total = len(ordered)
+            for bound, count in zip((*HISTOGRAM_MS, None), self.buckets):
+                label = f"<= {bound}" if bound is not None else f"> {HISTOGRAM_MS[-1]}"
+                bar = "#" * round(40 * count / total)
+                print(f"  {label:>8} {count:>8} {bar}", file=out)
+        print(
+            "statuses: " + ", ".join(f"{s}: {n}" for s, n in sorted(self.statuses.items())),
+            file=out,
+        )
+        diverged = sum(self.divergences.values())
+        print(f"{diverged} status divergences from the capture", file=out)
+        for (expected, got), n in self.divergences.most_common():
+            print(f"  captured {expected}, replayed {got}: {n}", file=out)
+        for example in self.examples:
+            print(f"  e.g. {example}", file=out)
+
+
+async def replay_webhooks(args) -> int:
+    """
+    Re-sign captured webhooks for the target's secret and send them,
+    keeping their original spacing scaled by --speed; exit 1 on divergences.
+    """
+    target = urlsplit(args.url)
+    if target.scheme not in DEFAULT_PORTS:
+        print(f"--url must be an http:// or https:// URL, got {args.url!r}", file=sys.stderr)
+        return 2
+    host, port = target.hostname, target.port or DEFAULT_PORTS[target.scheme]
+    tls = target.scheme == "https"
+    entries = heapq.merge(*(_read_capture(p) for p in args.files), key=lambda e: e["ts"])
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 2)
+    report = ReplayReport()
+
+    async def worker():
+        conn = Connection(host, port, tls)
+        while (item := await queue.get()) is not None:
+            entry, body = item
+            headers = {}
+            if entry.get("idempotency_key"):
+                headers[IDEMPOTENCY_HEADER] = entry["idempotency_key"]
+            started = time.perf_counter()
+            try:
+                status = await conn.post(WEBHOOK_PATH, body, headers)
+            except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError):
+                status = None
+            report.add(entry, status, (time.perf_counter() - started) * 1000)
+        conn.close()
+
+    workers = [asyncio.create_task(worker()) for _ in range(args.concurrency)]
+    started = time.perf_counter()
+    first_ts = None
+    for n, entry in enumerate(entries):
+        if args.limit is not None and n >= args.limit:
+            break
+        body = resign(entry["body"], args.secret)
+        if args.speed is not None:
+            if first_ts is None:
+                first_ts = entry["ts"]
+            due = started + (entry["ts"] - first_ts) / args.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                report.max_lag_ms = max(report.max_lag_ms, -delay * 1000)
+        await queue.put((entry, body))
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+
+    report.print(max(time.perf_counter() - started, 1e-9))
+    return 1 if report.divergences else 0
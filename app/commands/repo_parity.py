@@ -0,0 +1,119 @@
+import time
+
+from sqlalchemy import select
+
+from db import async_session_maker
+from models.account import Account
+from models.payment import Payment
+from models.user import User
+from repositories import BACKENDS
+from uow import UnitOfWork
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "repo-parity",
+        help="Check that the raw repositories return what the ORM ones do, and compare throughput.",
+    )
+    parser.add_argument("--samples", type=int, default=50, help="Rows sampled per table.")
+    parser.add_argument(
+        "--iterations", type=int, default=500, help="Calls per method in the throughput run."
+    )
+    parser.set_defaults(handler=repo_parity)
+
+
+def _normalize(value, columns):
+    """Turns ORM instances and records into comparable tuples of columns."""
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, tuple):
+        return tuple(_normalize(v, columns) for v in value)
+    if isinstance(value, list):
+        return sorted(_normalize(v, columns) for v in value)
+    return tuple(getattr(value, c) for c in columns)
+
+
+def _cases(users, accounts, payments):
+    """(repo name, method, args, compared columns) of every read path."""
+    user_cols = ("id", "email", "full_name", "password_hash", "is_admin", "deleted_at")
+    account_cols = ("id", "user_id", "balance", "updated_at", "version", "deleted_at")
+    payment_cols = ("id", "transaction_id", "user_id", "account_id", "amount", "created_at")
+    cases = []
+    for u in users:
+        cases += [
+            ("user", "get_by_id", (u.id,), user_cols),
+            ("user", "exists", (u.id,), ()),
+            ("user", "get_by_email", (u.email,), user_cols),
+            ("account", "list_by_user", (u.id,), account_cols),
+            ("payment", "list_by_user", (u.id,), payment_cols),
+        ]
+    for a in accounts:
+        cases += [
+            ("account", "get", (a.id,), account_cols),
+            ("account", "get_account_for_update", (a.id,), account_cols),
+            ("account", "create_or_update", (a.user_id, a.id), ("id", "user_id", "balance")),
+        ]
+    for p in payments:
+        cases += [
+            ("payment", "exists_transaction", (p.transaction_id,), ()),
+            (
+                "payment",
+                "create_if_not_exists",
+                (p.transaction_id, p.user_id, p.account_id, p.amount),
+                (),
+            ),
+        ]
+    missing = ("user", "get_by_id", (-1,), user_cols), ("payment", "exists_transaction", ("",), ())
+    return cases + list(missing)
+
+
+async def _call(uow, backend: str, repo: str, method: str, args):
+    return await getattr(BACKENDS[backend][repo](uow.session), method)(*args)
+
+
+async def repo_parity(args) -> int:
+    """
+    Runs every read path of both backends on sampled rows inside a
+    transaction that is rolled back, reports differing results, then
+    measures calls per second per method and backend.
+    """
+    async with UnitOfWork(async_session_maker) as uow:
+        users = (await uow.session.execute(select(User).limit(args.samples))).scalars().all()
+        accounts = (
+            await uow.session.execute(select(Account).limit(args.samples))
+        ).scalars().all()
+        payments = (
+            await uow.session.execute(select(Payment).limit(args.samples))
+        ).scalars().all()
+        cases = _cases(users, accounts, payments)
+        uow.session.expunge_all()
+
+        mismatches = 0
+        for repo, method, call_args, columns in cases:
+            orm = _normalize(await _call(uow, "orm", repo, method, call_args), columns)
+            uow.session.expunge_all()
+            raw = _normalize(await _call(uow, "raw", repo, method, call_args), columns)
+            if orm != raw:
+                mismatches += 1
+                print(f"MISMATCH {repo}.{method}{call_args}:\n  orm={orm}\n  raw={raw}")
+        print(f"{len(cases)} cases compared, {mismatches} mismatches")
+
+        print(f"{'method':34} {'orm/s':>9} {'raw/s':>9} {'speedup':>8}")
+        seen = set()
+        for repo, method, call_args, _ in cases:
+            if (repo, method) in seen:
+                continue
+            seen.add((repo, method))
+            rates = []
+            for backend in ("orm", "raw"):
+                started = time.perf_counter()
+                for _ in range(args.iterations):
+                    await _call(uow, backend, repo, method, call_args)
+                    uow.session.expunge_all()
+                rates.append(args.iterations / (time.perf_counter() - started))
+            print(
+                f"{repo + '.' + method:34} {rates[0]:9.0f} {rates[1]:9.0f} "
+                f"{rates[1] / rates[0]:7.2f}x"
+            )
+        await uow.rollback()
+    return 1 if mismatches else 0
@@ -0,0 +1,100 @@
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import time allowed for the app module, checked by tests/test_startup.py.
+DEFAULT_BUDGET_MS = 1500
+
+# Packages loaded on first use or during worker warm-up, never at import.
+DEFERRED_MODULES = ("passlib", "email_validator", "pyarrow")
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "startup-report",
+        help="Import a module in a fresh interpreter and report import time per module.",
+    )
+    parser.add_argument("--module", default="main", help="Module to import.")
+    parser.add_argument("--top", type=int, default=25, help="Number of rows to show.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="Exit with status 1 if importing the module takes longer than this "
+        "or loads a deferred package.",
+    )
+    parser.set_defaults(handler=startup_report, needs_db=False)
+
+
+def measure_imports(module: str) -> list[tuple[str, int, int, int]]:
+    """
+    Imports a module under `python -X importtime` in a subprocess.
+
+    Returns:
+        list[tuple[str, int, int, int]]: (module, self_us, cumulative_us, depth)
+                                         in import order.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def import_time_ms(rows: list[tuple[str, int, int, int]], module: str) -> float:
+    """Cumulative import time of `module` from measure_imports() rows."""
+    total_us = next(
+        (cumulative for name, _, cumulative, _ in rows if name == module),
+        sum(self_us for _, self_us, _, _ in rows),
+    )
+    return total_us / 1000
+
+
+def deferred_loaded(rows: list[tuple[str, int, int, int]]) -> list[str]:
+    """The DEFERRED_MODULES that were imported, from measure_imports() rows."""
+    imported = {name.split(".")[0] for name, _, _, _ in rows}
+    return [m for m in DEFERRED_MODULES if m in imported]
+
+
+async def startup_report(args) -> int:
+    """Print the import-time breakdown of a module and check it against a budget."""
+    rows = measure_imports(args.module)
+
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    total_us = import_time_ms(rows, args.module) * 1000
+
+    print(f"import {args.module}: {total_us / 1000:.1f} ms")
+    print("\nself time by top-level package:")
+    for package, self_us in sorted(by_package.items(), key=lambda i: -i[1])[: args.top]:
+        print(f"  {self_us / 1000:9.1f} ms  {self_us * 100 / total_us:5.1f}%  {package}")
+    print("\nslowest modules (cumulative):")
+    for name, _, cumulative_us, _ in sorted(rows, key=lambda r: -r[2])[: args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+
+    status = 0
+    if total_us / 1000 > args.budget_ms:
+        print(f"\nimport budget of {args.budget_ms:.0f} ms exceeded")
+        status = 1
+    loaded = deferred_loaded(rows)
+    if loaded:
+        print(f"\ndeferred packages imported at startup: {', '.join(loaded)}")
+        status = 1
+    return status
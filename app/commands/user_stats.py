@@ -0,0 +1,29 @@
+from db import async_session_maker
+from services.user_stats import UserStatsService
+from uow import UnitOfWork
+
+
+def register(subparsers):
+    parser = subparsers.add_parser(
+        "rebuild-user-stats",
+        help="Recompute the user_stats rollup from accounts and payments.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=10_000,
+        help="Number of user IDs recomputed and committed per chunk.",
+    )
+    parser.set_defaults(handler=rebuild_user_stats)
+
+
+async def rebuild_user_stats(args) -> int:
+    """Backfill or repair the user_stats table."""
+
+    def progress(done: int, total: int):
+        print(f"rebuilt users up to id {done}/{total}")
+
+    async with UnitOfWork(async_session_maker) as uow:
+        written = await UserStatsService(uow).rebuild(args.chunk_size, progress)
+    print(f"{written} user_stats rows written")
+    return 0
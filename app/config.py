@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 
 
@@ -6,8 +8,89 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     SECRET_KEY: str
     SANIC_WORKERS: int = 1
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_WARM_CONNECTIONS: int = 4
+    DB_QUERY_CACHE_SIZE: int = 500
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_SLOW_CHECKOUT_MS: float = 1000
+    DB_SLOW_QUERY_MS: float = 100
+    DB_SLOW_QUERY_BUFFER: int = 500
+    DB_SLOW_QUERY_EXPLAIN_SAMPLE: float = 0.05
+    DB_SLOW_QUERY_EXPLAIN_TIMEOUT: float = 10
+    REPOSITORY_BACKENDS: dict[str, str] = {}
+    DB_LEAK_DEBUG: bool = False
+    HASH_WORKERS: int = 0
+    PASSWORD_SCHEMES: list[str] = ["bcrypt"]
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_ARGON2_TIME_COST: int = 2
+    PASSWORD_ARGON2_MEMORY_COST: int = 19456
+    PASSWORD_ARGON2_PARALLELISM: int = 1
+    LOGIN_FAILURE_WINDOW: float = 900
+    LOGIN_EMAIL_MAX_FAILURES: int = 10
+    LOGIN_IP_MAX_FAILURES: int = 100
+    LOGIN_THROTTLE_MAX_KEYS: int = 100_000
+    LOGIN_THROTTLE_SHARED: bool = False
+    LOGIN_NEGATIVE_CACHE_TTL: float = 300
+    LOGIN_NEGATIVE_CACHE_SIZE: int = 10_000
+    LOGIN_REJECT_DELAY: float = 0.5
+    IMPORT_BATCH_SIZE: int = 5000
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    IDEMPOTENCY_CLEANUP_INTERVAL: float = 300
+    # A duplicate waits this long for the worker processing its key.
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10
+    # A claim older than this is treated as abandoned by a dead worker.
+    IDEMPOTENCY_PENDING_TIMEOUT: float = 120
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_OFFLOAD_SIZE: int = 64 * 1024
+    SSE_MAX_CONNECTIONS: int = 1000
+    SSE_HEARTBEAT_INTERVAL: float = 15
+    SSE_SEND_TIMEOUT: float = 10
+    WEBHOOK_CAPTURE_DIR: str = ""
+    WEBHOOK_CAPTURE_MAX_BYTES: int = 64 * 1024 * 1024
+    WEBHOOK_CAPTURE_KEEP_FILES: int = 20
+    WEBHOOK_CAPTURE_BUFFER: int = 10_000
+    OUTBOX_ENABLED: bool = False
+    OUTBOX_SINK_URL: str = ""
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_HTTP_TIMEOUT: float = 10
+    # Seconds a relay owns a claimed batch; must exceed OUTBOX_HTTP_TIMEOUT.
+    OUTBOX_CLAIM_LEASE: float = 60
+    PURGE_ASYNC_THRESHOLD: int = 10_000
+    PURGE_CHUNK_SIZE: int = 5000
+    PURGE_DUTY_CYCLE: float = 0.5
+    PURGE_POLL_INTERVAL: float = 5
+    PURGE_LEASE_SECONDS: float = 300
+    EXPORT_BATCH_SIZE: int = 50_000
+    PROFILE_MAX_SECONDS: float = 60
+    LIMITER_ENABLED: bool = True
+    LIMITER_QUEUE_TIMEOUT: float = 1.0
+    LIMITER_OVERRIDES: dict[str, dict[str, float]] = {}
 
     model_config = {"env_file": ".env", "extra": "ignore"}
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Reads the environment and .env file on first use."""
+    return Settings()
+
+
+class _LazySettings:
+    """
+    Module-level stand-in for Settings that defers reading the environment
+    until the first attribute access, so importing the app stays cheap.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+
+settings = _LazySettings()
@@ -1,7 +1,72 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.asyncio import (
+    create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
+)
+from sqlalchemy.engine import make_url
 from config import settings
+from utils import pool_metrics, slow_queries
 
-engine = create_async_engine(settings.DATABASE_URL, future=True, echo=True)
-async_session_maker = async_sessionmaker(
-    engine, expire_on_commit=False, class_=AsyncSession
-)
+engine: AsyncEngine | None = None
+async_session_maker = async_sessionmaker(expire_on_commit=False, class_=AsyncSession)
+
+
+def init_engine() -> AsyncEngine:
+    """
+    Creates the engine of the current process and binds the session factory
+    to it. Called once per worker before the server starts serving.
+    """
+    global engine
+    if engine is None:
+        engine = create_async_engine(
+            settings.DATABASE_URL,
+            future=True,
+            echo=settings.DB_ECHO,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            # Compiled SQL cached by SQLAlchemy per engine, and statements
+            # prepared by asyncpg per connection.
+            query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+            connect_args={
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+            },
+        )
+        async_session_maker.configure(bind=engine)
+        pool_metrics.install(engine)
+        slow_queries.install(engine)
+    return engine
+
+
+async def dispose_engine() -> None:
+    """Closes every pooled connection of the current process."""
+    global engine
+    if engine is not None:
+        await engine.dispose()
+        await slow_queries.get_slow_query_log().close()
+        engine = None
+
+
+async def get_driver_connection(session: AsyncSession, begin: bool = False):
+    """
+    Returns the asyncpg connection behind a session's current transaction,
+    for driver-level operations such as COPY that SQLAlchemy does not expose.
+
+    SQLAlchemy's asyncpg adapter sends BEGIN together with its first
+    statement, so driver-level statements issued before any ORM statement
+    run outside the transaction. Pass begin=True to start it first, with a
+    trivial statement executed through SQLAlchemy so the adapter tracks the
+    transaction; this costs one round trip, only when nothing ran yet.
+    """
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    if begin and not raw.driver_connection.is_in_transaction():
+        await conn.exec_driver_sql("SELECT 1")
+    return raw.driver_connection
+
+
+def asyncpg_dsn() -> str:
+    """
+    Returns DATABASE_URL as a plain asyncpg DSN, for dedicated connections
+    that live outside the pool (e.g. LISTEN).
+    """
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+from sanic.log import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import db
+from config import settings
+from repositories.account import AccountRepo
+from repositories.payment import PaymentRepo
+from repositories.user import UserRepo
+from schemas.account import AccountOut, AccountOutWithUserId, StatementEntryOut
+from schemas.auth import LoginSchema
+from schemas.payment import PaymentOut, WebhookIn
+from schemas.user import (
+    UserOut,
+    UserWithAccountsOut,
+    UserStatsOut,
+    UserStatsPageOut,
+    UserSearchPageOut,
+    UserImportRow,
+)
+from services.user_purge import run_user_purges
+from utils.executors import shutdown_process_pool
+from utils.events import listen_balance_changes
+from utils.idempotency import cleanup_expired
+from utils.login_guard import cleanup_login_failures
+from utils.outbox import relay_outbox
+from utils.webhook_capture import write_webhook_capture
+
+# Read-only queries executed on every pre-warmed connection so that asyncpg
+# has them prepared before the first request arrives.
+HOT_QUERIES = (
+    lambda s: UserRepo(s).get_by_id(0),
+    lambda s: UserRepo(s).get_by_email(""),
+    lambda s: AccountRepo(s).list_by_user(0),
+    lambda s: AccountRepo(s).get(0),
+    lambda s: PaymentRepo(s).list_by_user(0),
+    lambda s: PaymentRepo(s).exists_transaction(""),
+)
+
+SERIALIZERS = (
+    AccountOut,
+    AccountOutWithUserId,
+    StatementEntryOut,
+    LoginSchema,
+    PaymentOut,
+    WebhookIn,
+    UserOut,
+    UserWithAccountsOut,
+    UserStatsOut,
+    UserStatsPageOut,
+    UserSearchPageOut,
+    UserImportRow,
+)
+
+# Long-running per-worker tasks, started once the server accepts requests.
+BACKGROUND_TASKS = (
+    cleanup_expired,
+    cleanup_login_failures,
+    listen_balance_changes,
+    relay_outbox,
+    run_user_purges,
+    write_webhook_capture,
+)
+
+
+async def _warm_connection(engine) -> None:
+    async with engine.connect() as conn:
+        session = AsyncSession(bind=conn)
+        for query in HOT_QUERIES:
+            await query(session)
+        await session.close()
+        await conn.rollback()
+
+
+async def start_database(app) -> None:
+    db.init_engine()
+
+
+async def warm_up(app) -> None:
+    """
+    Opens DB_WARM_CONNECTIONS pool connections concurrently, prepares the hot
+    statements on each of them and builds the response serializers.
+    """
+    started = time.perf_counter()
+    warm = min(settings.DB_WARM_CONNECTIONS, settings.DB_POOL_SIZE)
+    await asyncio.gather(*(_warm_connection(db.engine) for _ in range(warm)))
+
+    for schema in SERIALIZERS:
+        schema.model_rebuild()
+
+    logger.info(
+        "Worker warmed up in %.1f ms (%d connections)",
+        (time.perf_counter() - started) * 1000,
+        warm,
+    )
+
+
+async def start_background_tasks(app) -> None:
+    for task in BACKGROUND_TASKS:
+        app.add_task(task(app), name=task.__qualname__)
+
+
+async def stop_background_tasks(app) -> None:
+    for task in BACKGROUND_TASKS:
+        await app.cancel_task(task.__qualname__, raise_exception=False)
+
+
+async def stop_database(app) -> None:
+    await db.dispose_engine()
+    shutdown_process_pool()
+
+
+def register(app) -> None:
+    """Attaches the per-worker startup and shutdown listeners to the app."""
+    app.register_listener(start_database, "before_server_start")
+    app.register_listener(warm_up, "before_server_start")
+    app.register_listener(start_background_tasks, "after_server_start")
+    app.register_listener(stop_background_tasks, "before_server_stop")
+    app.register_listener(stop_database, "after_server_stop")
@@ -1,29 +1,83 @@
+import asyncio
+import math
+
 from sanic import Sanic
 from sanic.response import json
 from uow import UnitOfWork
 
+import lifecycle
+from config import settings
+
 from routers.auth import bp as auth_bp
 from routers.user import bp as user_bp
 from routers.admin import bp as admin_bp
 from routers.webhook import bp as webhook_bp
 from db import async_session_maker
+from utils.compression import encode_response
+from utils.limiter import get_route_limiters
 
 app = Sanic("payments_app")
+lifecycle.register(app)
+
+
+@app.middleware("request")
+async def limit_concurrency(request):
+    if not settings.LIMITER_ENABLED:
+        return
+    limiters = get_route_limiters()
+    route_class = limiters.classify(request.path)
+    if route_class is None:
+        return
+    slot = await limiters.acquire(route_class)
+    if slot is None:
+        return json(
+            {"message": "overloaded"},
+            status=503,
+            headers={"Retry-After": str(math.ceil(settings.LIMITER_QUEUE_TIMEOUT))},
+        )
+    request.ctx.limiter_slot = slot
+    # Release on connection teardown too, in case the handler is cancelled
+    # before the response middleware runs.
+    asyncio.current_task().add_done_callback(slot.release)
 
 
 @app.middleware("request")
 async def inject_uow(request):
-    request.ctx.uow = UnitOfWork(async_session_maker)
+    uow = UnitOfWork(async_session_maker)
+    request.ctx.uow = uow
+    # If the handler is cancelled (client disconnect) the response middleware
+    # never runs; the connection task's teardown releases the session then.
+    # The unit of work drops that callback itself once it is closed, which
+    # for streaming handlers is after the response middleware has run.
+    uow.watch(asyncio.current_task())
+
+
+# Response middleware runs in reverse order of registration, so encoding
+# is registered first to see the final body.
+@app.middleware("response")
+async def compress(request, response_):
+    if settings.COMPRESSION_ENABLED:
+        await encode_response(request, response_)
 
 
 @app.middleware("response")
-async def close_session(request, response_):
+async def release_limiter_slot(request, response_):
+    slot = getattr(request.ctx, "limiter_slot", None)
+    if slot is not None:
+        # The connection task outlives the request on keep-alive connections.
+        asyncio.current_task().remove_done_callback(slot.release)
+        slot.release()
+
+
+@app.middleware("response")
+async def release_uow(request, response_):
     uow = getattr(request.ctx, "uow", None)
-    if uow and getattr(uow, "session", None):
-        try:
-            await uow.session.close()
-        except Exception:
-            pass
+    if uow is None:
+        return
+    # Streaming handlers respond from inside their unit of work, which then
+    # closes itself; anything else still open here has leaked.
+    if not uow.active:
+        uow.release()
 
 
 @app.get("/")
@@ -35,3 +89,15 @@ app.blueprint(auth_bp)
 app.blueprint(user_bp)
 app.blueprint(admin_bp)
 app.blueprint(webhook_bp)
+
+
+def main():
+    app.run(
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=settings.SANIC_WORKERS,
+    )
+
+
+if __name__ == "__main__":
+    main()
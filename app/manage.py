@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+import sys
+
+import db
+from commands import (
+    bench_statements,
+    calibrate_hash,
+    export_payments,
+    purge_users,
+    reconcile,
+    replay_webhooks,
+    repo_parity,
+    startup_report,
+    user_stats,
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="payments_app management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    user_stats.register(subparsers)
+    startup_report.register(subparsers)
+    reconcile.register(subparsers)
+    bench_statements.register(subparsers)
+    repo_parity.register(subparsers)
+    purge_users.register(subparsers)
+    export_payments.register(subparsers)
+    calibrate_hash.register(subparsers)
+    replay_webhooks.register(subparsers)
+    return parser
+
+
+async def run(args) -> int:
+    if not getattr(args, "needs_db", True):
+        return await args.handler(args)
+    db.init_engine()
+    try:
+        return await args.handler(args)
+    finally:
+        await db.dispose_engine()
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,13 @@
-from sqlalchemy import Integer, ForeignKey, Numeric, DateTime, func
+from sqlalchemy import BigInteger, Integer, ForeignKey, Numeric, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
 
 
 class Account(Base):
     __tablename__ = "accounts"
+    __table_args__ = (
+        Index("ix_accounts_user_id_version", "user_id", "id", "version"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(
@@ -16,8 +19,16 @@ class Account(Base):
 
     user = relationship("User", back_populates="accounts")
     payments = relationship(
-        "Payment", back_populates="account", cascade="all, delete-orphan"
+        "Payment", back_populates="account", cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     updated_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
+    # Incremented by every balance change, in the row lock, so it orders
+    # changes by commit unlike updated_at (transaction start time).
+    version: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0", nullable=False
+    )
+    # Set together with the owner's deleted_at; webhooks reject such accounts.
+    deleted_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
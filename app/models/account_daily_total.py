@@ -0,0 +1,27 @@
+from sqlalchemy import Integer, ForeignKey, Numeric, Date
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+
+class AccountDailyTotal(Base):
+    """
+    Per-account, per-day payment rollup maintained by the webhook path.
+
+    Statements are answered from this table so their cost depends on the
+    number of days requested, not on the number of raw payments.
+    """
+
+    __tablename__ = "account_daily_totals"
+
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey("accounts.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[Date] = mapped_column(Date, primary_key=True)
+    payments_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    total_amount: Mapped[Numeric] = mapped_column(
+        Numeric(18, 2), default=0, server_default="0", nullable=False
+    )
+    min_amount: Mapped[Numeric] = mapped_column(Numeric(18, 2), nullable=False)
+    max_amount: Mapped[Numeric] = mapped_column(Numeric(18, 2), nullable=False)
@@ -0,0 +1,23 @@
+from sqlalchemy import Integer, String, LargeBinary, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Stored response of a mutating request, keyed by a digest of the
+    Idempotency-Key header and the request scope (method, path, user).
+    A row without a status is a claim: the request is being processed.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # SHA-256 of the request body.
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[int | None] = mapped_column(Integer)
+    content_type: Mapped[str | None] = mapped_column(String(100))
+    body: Mapped[bytes | None] = mapped_column(LargeBinary)
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
@@ -0,0 +1,16 @@
+from sqlalchemy import Integer, String, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+
+class LoginFailure(Base):
+    """
+    Failed login attempts per throttling key (email or client IP) and time
+    bucket, shared between workers when LOGIN_THROTTLE_SHARED is set.
+    """
+
+    __tablename__ = "login_failures"
+
+    key: Mapped[str] = mapped_column(String(330), primary_key=True)
+    bucket: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
+    failures: Mapped[int] = mapped_column(Integer, nullable=False)
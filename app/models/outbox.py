@@ -0,0 +1,35 @@
+from sqlalchemy import BigInteger, String, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+
+class OutboxEvent(Base):
+    """
+    Event written in the same transaction as the change it describes and
+    removed once the relay has delivered it downstream.
+    """
+
+    __tablename__ = "outbox_events"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    topic: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    # Set while a relay is sending the event; other relays skip it until then.
+    claimed_until: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+
+
+class OutboxOffset(Base):
+    """Delivery progress of the relay for one sink."""
+
+    __tablename__ = "outbox_offsets"
+
+    sink: Mapped[str] = mapped_column(String(255), primary_key=True)
+    last_event_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    delivered_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -1,4 +1,6 @@
-from sqlalchemy import Integer, String, ForeignKey, Numeric, UniqueConstraint
+from sqlalchemy import (
+    Integer, String, ForeignKey, Numeric, UniqueConstraint, DateTime, Index, func
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
 
@@ -7,6 +9,8 @@ class Payment(Base):
     __tablename__ = "payments"
     __table_args__ = (
         UniqueConstraint("transaction_id", name="uq_payments_transaction_id"),
+        Index("ix_payments_user_id_id", "user_id", "id"),
+        Index("ix_payments_created_at_brin", "created_at", postgresql_using="brin"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -18,6 +22,9 @@ class Payment(Base):
         ForeignKey("accounts.id", ondelete="CASCADE"), index=True, nullable=False
     )
     amount: Mapped[Numeric] = mapped_column(Numeric(18, 2), nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
 
     user = relationship("User", back_populates="payments")
     account = relationship("Account", back_populates="payments")
@@ -1,10 +1,26 @@
-from sqlalchemy import String, Integer, Boolean
+from sqlalchemy import String, Integer, Boolean, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Trigram indexes serve substring search (ILIKE '%q%'); queries too
+        # short for trigrams use the email prefix index below the class.
+        Index(
+            "ix_users_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_users_full_name_trgm",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     email: Mapped[str] = mapped_column(
@@ -15,10 +31,22 @@ class User(Base):
     is_admin: Mapped[bool] = mapped_column(
         Boolean, default=False, server_default="false", nullable=False
     )
+    # Set when the user is being purged in the background; such users are
+    # treated as deleted everywhere.
+    deleted_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
 
     accounts = relationship(
-        "Account", back_populates="user", cascade="all, delete-orphan"
+        "Account", back_populates="user", cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     payments = relationship(
-        "Payment", back_populates="user", cascade="all, delete-orphan"
+        "Payment", back_populates="user", cascade="all, delete-orphan",
+        passive_deletes=True,
     )
+
+
+Index(
+    "ix_users_email_lower_prefix",
+    func.lower(User.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"},
+)
@@ -0,0 +1,26 @@
+from sqlalchemy import Integer, String, BigInteger, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+
+class UserPurge(Base):
+    """
+    Background deletion of a soft-deleted user. Kept after the user row is
+    gone to report the outcome, hence no foreign key.
+    """
+
+    __tablename__ = "user_purges"
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
+    payments_deleted: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0", nullable=False
+    )
+    payments_total: Mapped[int | None] = mapped_column(BigInteger)
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    finished_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,32 @@
+from sqlalchemy import Integer, ForeignKey, Numeric, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+
+class UserStats(Base):
+    """
+    Per-user dashboard rollup, updated in the same transaction as the
+    webhook and account creation paths.
+    """
+
+    __tablename__ = "user_stats"
+    __table_args__ = (
+        Index("ix_user_stats_accounts_count", "accounts_count", "user_id"),
+        Index("ix_user_stats_total_balance", "total_balance", "user_id"),
+        Index("ix_user_stats_payments_count", "payments_count", "user_id"),
+        Index("ix_user_stats_last_payment_at", "last_payment_at", "user_id"),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    accounts_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    total_balance: Mapped[Numeric] = mapped_column(
+        Numeric(18, 2), default=0, server_default="0", nullable=False
+    )
+    payments_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    last_payment_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
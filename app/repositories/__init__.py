@@ -1,5 +1,42 @@
+from config import settings
 from .user import UserRepo
 from .account import AccountRepo
 from .payment import PaymentRepo
+from .statement import AccountStatementRepo
+from .user_stats import UserStatsRepo
+from .idempotency import IdempotencyRepo
+from .outbox import OutboxRepo
+from .reconciliation import ReconciliationRepo
+from .user_purge import UserPurgeRepo
+from .raw import RawUserRepo, RawAccountRepo, RawPaymentRepo
 
-__all__ = ["UserRepo", "AccountRepo", "PaymentRepo"]
+__all__ = [
+    "UserRepo",
+    "AccountRepo",
+    "PaymentRepo",
+    "AccountStatementRepo",
+    "UserStatsRepo",
+    "IdempotencyRepo",
+    "OutboxRepo",
+    "ReconciliationRepo",
+    "UserPurgeRepo",
+    "RawUserRepo",
+    "RawAccountRepo",
+    "RawPaymentRepo",
+    "BACKENDS",
+    "backend_for",
+]
+
+# Interchangeable implementations of the user, account and payment repos.
+BACKENDS = {
+    "orm": {"user": UserRepo, "account": AccountRepo, "payment": PaymentRepo},
+    "raw": {"user": RawUserRepo, "account": RawAccountRepo, "payment": RawPaymentRepo},
+}
+
+
+def backend_for(service: str) -> dict:
+    """
+    Returns the repository classes configured for a service in
+    REPOSITORY_BACKENDS, the ORM ones by default.
+    """
+    return BACKENDS[settings.REPOSITORY_BACKENDS.get(service, "orm")]
@@ -1,9 +1,22 @@
+import json
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, literal_column, bindparam
 from sqlalchemy.dialects.postgresql import insert
 
 from models.account import Account
 
+# Hot statements are built once at import; calls only bind parameters.
+LIST_BY_USER = select(Account).where(Account.user_id == bindparam("user_id"))
+GET_FOR_UPDATE = (
+    select(Account).where(Account.id == bindparam("account_id")).with_for_update()
+)
+CREATE_OR_UPDATE = (
+    insert(Account)
+    .on_conflict_do_update(index_elements=["id"], set_={"updated_at": func.now()})
+    .returning(Account, literal_column("xmax = 0").label("created"))
+)
+
 
 class AccountRepo:
     """
@@ -44,10 +57,30 @@ class AccountRepo:
         Returns:
             list[Account]: List of Account instances belonging to the user.
         """
+        q = await self.session.execute(LIST_BY_USER, {"user_id": user_id})
+        return q.scalars().all()
+
+    async def version_for_user(self, user_id: int) -> tuple[int, int, int]:
+        """
+        Returns a cheap version of a user's accounts, answered by an
+        index-only scan: their count, the sum of their IDs (changes when an
+        account is replaced) and the sum of their balance versions (grows
+        with every committed balance change).
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            tuple[int, int, int]: (count, sum(id), sum(version)).
+        """
         q = await self.session.execute(
-            select(Account).where(Account.user_id == user_id)
+            select(
+                func.count(),
+                func.coalesce(func.sum(Account.id), 0),
+                func.coalesce(func.sum(Account.version), 0),
+            ).where(Account.user_id == user_id)
         )
-        return q.scalars().all()
+        return tuple(q.one())
 
     async def create(self, user_id: int, account_id: int | None = None) -> Account:
         """
@@ -68,29 +101,38 @@ class AccountRepo:
         await self.session.flush()
         return acc
 
-    async def create_or_update(self, user_id: int, account_id: int) -> Account:
-        stmt = (
-            insert(Account)
-            .values(id=account_id, user_id=user_id)
-            .on_conflict_do_update(
-                index_elements=["id"],
-                set_={"updated_at": func.now()}
-            )
-            .returning(Account)
+    async def create_or_update(
+        self, user_id: int, account_id: int
+    ) -> tuple[Account, bool]:
+        """
+        Inserts an account with the given ID or touches it if it already exists.
+
+        Args:
+            user_id (int): The ID of the user to associate the account with.
+            account_id (int): The ID of the account.
+
+        Returns:
+            tuple[Account, bool]: The Account instance and whether it was created
+                                  by this statement (False if it already existed).
+        """
+        result = await self.session.execute(
+            CREATE_OR_UPDATE, {"id": account_id, "user_id": user_id}
         )
-        result = await self.session.execute(stmt)
-        return result.scalar_one()
+        account, created = result.one()
+        return account, created
 
 
     async def update_balance(self, account: Account, new_balance) -> None:
         """
-        Updates the balance of an existing account.
+        Updates the balance of an existing account and increments its version.
+        The account must be locked (get_account_for_update).
 
         Args:
             account (Account): The Account instance to update.
             new_balance (decimal.Decimal | float): The new balance to set.
         """
         account.balance = new_balance
+        account.version = Account.version + 1
 
     async def get_account_for_update(self, account_id: int):
         """
@@ -105,7 +147,23 @@ class AccountRepo:
         Returns:
             Account | None: The Account instance if found, else None.
         """
-        result = await self.session.execute(
-            select(Account).where(Account.id == account_id).with_for_update()
-        )
+        result = await self.session.execute(GET_FOR_UPDATE, {"account_id": account_id})
         return result.scalar_one_or_none()
+
+    async def notify_balance_change(
+        self, channel: str, user_id: int, account_id: int, balance
+    ) -> None:
+        """
+        Emits a NOTIFY with the new balance of an account. PostgreSQL delivers
+        it to listeners only when the surrounding transaction commits.
+
+        Args:
+            channel (str): The notification channel.
+            user_id (int): The ID of the account owner.
+            account_id (int): The ID of the account.
+            balance (decimal.Decimal | float): The new balance.
+        """
+        payload = json.dumps(
+            {"user_id": user_id, "account_id": account_id, "balance": float(balance)}
+        )
+        await self.session.execute(select(func.pg_notify(channel, payload)))
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update, func, or_, and_
+from sqlalchemy.dialects.postgresql import insert
+
+from models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyRepo:
+    """
+    Repository for stored responses of idempotent requests and for the
+    claims that serialize their processing across workers.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, key: str, not_before: datetime) -> IdempotencyKey | None:
+        """
+        Retrieves a stored response or claim that has not expired yet.
+
+        Args:
+            key (str): Digest of the idempotency key and request scope.
+            not_before (datetime): Rows created earlier are ignored.
+
+        Returns:
+            IdempotencyKey | None: The row if found; its status is None while
+                                   the request is still being processed.
+        """
+        q = await self.session.execute(
+            select(IdempotencyKey).where(
+                IdempotencyKey.key == key, IdempotencyKey.created_at >= not_before
+            )
+        )
+        return q.scalar_one_or_none()
+
+    async def claim(
+        self, key: str, request_hash: str, not_before: datetime, stale_before: datetime
+    ) -> bool:
+        """
+        Inserts a claim for the key, so that only the caller processes it.
+        An expired row, or a claim abandoned since `stale_before` (its worker
+        died), is taken over instead.
+
+        Args:
+            key (str): Digest of the idempotency key and request scope.
+            request_hash (str): Digest of the request body.
+            not_before (datetime): Rows created earlier have expired.
+            stale_before (datetime): Claims created earlier are abandoned.
+
+        Returns:
+            bool: True if the caller now holds the claim.
+        """
+        stmt = insert(IdempotencyKey).values(key=key, request_hash=request_hash)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={
+                "request_hash": stmt.excluded.request_hash,
+                "status": None,
+                "content_type": None,
+                "body": None,
+                "created_at": func.now(),
+            },
+            where=or_(
+                IdempotencyKey.created_at < not_before,
+                and_(
+                    IdempotencyKey.status.is_(None),
+                    IdempotencyKey.created_at < stale_before,
+                ),
+            ),
+        ).returning(IdempotencyKey.key)
+        q = await self.session.execute(stmt)
+        return q.scalar() is not None
+
+    async def complete(self, key: str, status: int, content_type: str | None, body: bytes):
+        """
+        Stores the response of a claimed key.
+        """
+        await self.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key, IdempotencyKey.status.is_(None))
+            .values(status=status, content_type=content_type, body=body)
+        )
+
+    async def release(self, key: str) -> None:
+        """
+        Drops a claim whose request produced no storable response, so that a
+        retry is processed again.
+        """
+        await self.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.key == key, IdempotencyKey.status.is_(None)
+            )
+        )
+
+    async def delete_expired(self, before: datetime) -> int:
+        """
+        Deletes responses stored before the given time.
+
+        Returns:
+            int: Number of deleted rows.
+        """
+        result = await self.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.created_at < before)
+        )
+        return result.rowcount
@@ -0,0 +1,59 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+
+from models.login_failure import LoginFailure
+
+
+class LoginFailureRepo:
+    """
+    Repository for failed login counters shared between workers.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def counts(self, keys: list[str], since_bucket: int) -> dict[str, int]:
+        """
+        Sums the failures of each key over the buckets from `since_bucket` on.
+
+        Returns:
+            dict[str, int]: Failures per key; keys without failures are omitted.
+        """
+        q = await self.session.execute(
+            select(LoginFailure.key, func.sum(LoginFailure.failures))
+            .where(LoginFailure.key.in_(keys), LoginFailure.bucket >= since_bucket)
+            .group_by(LoginFailure.key)
+        )
+        return {key: int(total) for key, total in q.all()}
+
+    async def add(self, keys: list[str], bucket: int) -> None:
+        """
+        Counts one failure for each key in the given bucket.
+        """
+        stmt = insert(LoginFailure).values(
+            [{"key": key, "bucket": bucket, "failures": 1} for key in keys]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key", "bucket"],
+            set_={"failures": LoginFailure.failures + 1},
+        )
+        await self.session.execute(stmt)
+
+    async def reset(self, key: str) -> None:
+        """
+        Forgets all failures of a key, e.g. after a successful login.
+        """
+        await self.session.execute(delete(LoginFailure).where(LoginFailure.key == key))
+
+    async def delete_expired(self, before_bucket: int) -> int:
+        """
+        Deletes buckets older than the given one.
+
+        Returns:
+            int: Number of deleted rows.
+        """
+        result = await self.session.execute(
+            delete(LoginFailure).where(LoginFailure.bucket < before_bucket)
+        )
+        return result.rowcount
@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update, func, or_
+from sqlalchemy.dialects.postgresql import insert
+
+from models.outbox import OutboxEvent, OutboxOffset
+
+
+class OutboxRepo:
+    """
+    Repository for the transactional outbox.
+
+    Writers add events inside their own transaction; the relay claims the
+    oldest events in batches for a lease, skipping rows claimed by other
+    relays, and deletes them once they are delivered.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add(self, topic: str, payload: dict) -> None:
+        """
+        Queues an event. It becomes visible to the relay on commit.
+
+        Args:
+            topic (str): The event type, e.g. "payment.created".
+            payload (dict): JSON-serializable event body.
+        """
+        await self.session.execute(
+            insert(OutboxEvent).values(topic=topic, payload=payload)
+        )
+
+    async def claim_batch(self, limit: int, lease: float) -> list[OutboxEvent]:
+        """
+        Claims up to `limit` of the oldest undelivered events for `lease`
+        seconds. Events claimed by another relay whose lease has not run
+        out, or locked by a concurrent claim, are skipped. The claim holds
+        no lock once the transaction commits.
+
+        Args:
+            limit (int): Maximum number of events to claim.
+            lease (float): Seconds before other relays may claim them again.
+
+        Returns:
+            list[OutboxEvent]: The claimed events ordered by ID.
+        """
+        claimable = (
+            select(OutboxEvent.id)
+            .where(
+                or_(
+                    OutboxEvent.claimed_until.is_(None),
+                    OutboxEvent.claimed_until < func.now(),
+                )
+            )
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        q = await self.session.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(claimable.scalar_subquery()))
+            .values(claimed_until=func.now() + timedelta(seconds=lease))
+            .returning(OutboxEvent)
+            .execution_options(synchronize_session=False)
+        )
+        return sorted(q.scalars().all(), key=lambda e: e.id)
+
+    async def release_ids(self, ids: list[int]) -> None:
+        """Drops the claim on events whose delivery failed."""
+        await self.session.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(ids))
+            .values(claimed_until=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def delete_ids(self, ids: list[int]) -> None:
+        """Deletes delivered events."""
+        await self.session.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(ids)))
+
+    async def advance_offset(self, sink: str, last_event_id: int, delivered: int) -> None:
+        """
+        Records delivery progress of a sink.
+
+        Args:
+            sink (str): Name of the sink.
+            last_event_id (int): ID of the newest event delivered.
+            delivered (int): Number of events delivered by this batch.
+        """
+        stmt = insert(OutboxOffset).values(
+            sink=sink, last_event_id=last_event_id, delivered_count=delivered
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["sink"],
+            set_={
+                "last_event_id": func.greatest(
+                    OutboxOffset.last_event_id, stmt.excluded.last_event_id
+                ),
+                "delivered_count": OutboxOffset.delivered_count
+                + stmt.excluded.delivered_count,
+                "updated_at": func.now(),
+            },
+        )
+        await self.session.execute(stmt)
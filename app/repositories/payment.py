@@ -1,17 +1,53 @@
 from decimal import Decimal
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, exists
+from sqlalchemy import select, exists, func, bindparam
 from sqlalchemy.dialects.postgresql import insert
+
+from db import get_driver_connection
 from models.payment import Payment
 
+# Hot statements are built once at import. Calls only bind parameters, and
+# SQLAlchemy reuses the memoized cache key of the same construct instead of
+# rebuilding and re-keying it on every request.
+CREATE_IF_NOT_EXISTS = (
+    insert(Payment)
+    .on_conflict_do_nothing(index_elements=["transaction_id"])
+    .returning(Payment)
+)
+LIST_BY_USER = select(Payment).where(Payment.user_id == bindparam("user_id"))
+EXISTS_TRANSACTION = select(
+    exists().where(Payment.transaction_id == bindparam("transaction_id"))
+)
+
+EXPORT_COLUMNS = ("id", "transaction_id", "user_id", "account_id", "amount", "created_at")
+EXPORT_FILTERS = (
+    ("created_from", "created_at >= ${}"),
+    ("created_to", "created_at < ${}"),
+    ("account_from", "account_id >= ${}"),
+    ("account_to", "account_id <= ${}"),
+)
+
+
+def _export_where(after_id: int, last_id: int | None, filters: dict) -> tuple[str, list]:
+    clauses, args = ["id > $1"], [after_id]
+    if last_id is not None:
+        args.append(last_id)
+        clauses.append(f"id <= ${len(args)}")
+    for name, clause in EXPORT_FILTERS:
+        if filters.get(name) is not None:
+            args.append(filters[name])
+            clauses.append(clause.format(len(args)))
+    return " AND ".join(clauses), args
+
 
 class PaymentRepo:
     """
     Repository for managing Payment entities in the database.
 
-    This class provides methods to create payments and list payments by user,
-    encapsulating direct database access using SQLAlchemy AsyncSession.
+    This class provides methods to create payments, list payments by user and
+    export them in ID windows, encapsulating direct database access using
+    SQLAlchemy AsyncSession.
     """
 
     def __init__(self, session: AsyncSession):
@@ -20,16 +56,15 @@ class PaymentRepo:
     async def create_if_not_exists(
             self, transaction_id: str, user_id: int, account_id: int, amount
     ) -> Payment | None:
-        stmt = insert(Payment).values(
-            transaction_id=transaction_id,
-            user_id=user_id,
-            account_id=account_id,
-            amount=Decimal(str(amount))
-        ).on_conflict_do_nothing(
-            index_elements=['transaction_id']
-        ).returning(Payment)
-
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(
+            CREATE_IF_NOT_EXISTS,
+            {
+                "transaction_id": transaction_id,
+                "user_id": user_id,
+                "account_id": account_id,
+                "amount": Decimal(str(amount)),
+            },
+        )
         payment = result.scalar_one_or_none()
         return payment
 
@@ -43,12 +78,85 @@ class PaymentRepo:
         Returns:
             list[Payment]: List of Payment instances associated with the user.
         """
+        q = await self.session.execute(LIST_BY_USER, {"user_id": user_id})
+        return q.scalars().all()
+
+    async def version_for_user(self, user_id: int) -> tuple[int, int | None]:
+        """
+        Returns a cheap version of a user's payments: their count and the
+        largest ID, answered by an index-only scan. Payment IDs only grow.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            tuple[int, int | None]: (count, max(id)).
+        """
         q = await self.session.execute(
-            select(Payment).where(Payment.user_id == user_id)
+            select(func.count(), func.max(Payment.id)).where(Payment.user_id == user_id)
         )
-        return q.scalars().all()
+        return tuple(q.one())
 
     async def exists_transaction(self, transaction_id: str) -> bool:
-        stmt = select(exists().where(Payment.transaction_id == transaction_id))
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(
+            EXISTS_TRANSACTION, {"transaction_id": transaction_id}
+        )
         return result.scalar()
+
+    async def export_window_end(self, after_id: int, limit: int, filters: dict) -> int | None:
+        """
+        Finds where the next export window ends: the ID of the `limit`-th
+        matching payment after `after_id`, or of the last one if fewer remain.
+        The scan walks the primary key from `after_id`, so its cost does not
+        grow with the export's progress.
+
+        Args:
+            after_id (int): ID of the last payment already exported.
+            limit (int): Maximum number of payments in the window.
+            filters (dict): Optional created_from/created_to (datetime, end
+                            exclusive) and account_from/account_to (inclusive).
+
+        Returns:
+            int | None: The last ID of the window, or None if nothing is left.
+        """
+        where, args = _export_where(after_id, None, filters)
+        conn = await get_driver_connection(self.session)
+        return await conn.fetchval(
+            f"SELECT max(id) FROM (SELECT id FROM payments WHERE {where} "
+            f"ORDER BY id LIMIT {int(limit)}) AS w",
+            *args,
+        )
+
+    async def export_rows(self, after_id: int, last_id: int, filters: dict) -> list:
+        """
+        Retrieves the payments of one export window, ordered by ID.
+
+        Returns:
+            list: asyncpg records with the EXPORT_COLUMNS fields.
+        """
+        where, args = _export_where(after_id, last_id, filters)
+        conn = await get_driver_connection(self.session)
+        return await conn.fetch(
+            f"SELECT {', '.join(EXPORT_COLUMNS)} FROM payments WHERE {where} ORDER BY id",
+            *args,
+        )
+
+    async def copy_out_csv(
+        self, output, after_id: int, last_id: int, filters: dict, header: bool = False
+    ) -> None:
+        """
+        Streams the payments of one export window as CSV with COPY TO STDOUT.
+
+        Args:
+            output (callable): Async callable receiving each chunk of bytes.
+            header (bool): Whether to write the column names first.
+        """
+        where, args = _export_where(after_id, last_id, filters)
+        conn = await get_driver_connection(self.session)
+        await conn.copy_from_query(
+            f"SELECT {', '.join(EXPORT_COLUMNS)} FROM payments WHERE {where} ORDER BY id",
+            *args,
+            output=output,
+            format="csv",
+            header=header,
+        )
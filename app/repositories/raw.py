@@ -0,0 +1,161 @@
+from decimal import Decimal
+
+import asyncpg
+from sqlalchemy.exc import IntegrityError
+
+from db import get_driver_connection
+from repositories.account import AccountRepo
+from repositories.payment import PaymentRepo
+from repositories.user import UserRepo
+
+
+# Fast-path repositories: hand-written SQL on the asyncpg connection of the
+# session's transaction. Statements are prepared per connection and use the
+# binary protocol, and rows are plain records instead of tracked ORM
+# instances. Methods not overridden fall back to the ORM repositories.
+
+
+class Row(asyncpg.Record):
+    """asyncpg record with attribute access, so services can use either backend."""
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+async def _fetch(session, query: str, *args) -> list[Row]:
+    conn = await get_driver_connection(session, begin=True)
+    return await conn.fetch(query, *args, record_class=Row)
+
+
+async def _fetchrow(session, query: str, *args) -> Row | None:
+    conn = await get_driver_connection(session, begin=True)
+    return await conn.fetchrow(query, *args, record_class=Row)
+
+
+async def _fetchval(session, query: str, *args):
+    conn = await get_driver_connection(session, begin=True)
+    return await conn.fetchval(query, *args)
+
+
+USER_COLUMNS = "id, email, full_name, password_hash, is_admin, deleted_at"
+ACCOUNT_COLUMNS = "id, user_id, balance, updated_at, version, deleted_at"
+PAYMENT_COLUMNS = "id, transaction_id, user_id, account_id, amount, created_at"
+
+
+class RawUserRepo(UserRepo):
+    """UserRepo returning records for the hot lookups."""
+
+    async def get_by_id(self, user_id: int) -> Row | None:
+        return await _fetchrow(
+            self.session,
+            f"SELECT {USER_COLUMNS} FROM users WHERE id = $1 AND deleted_at IS NULL",
+            user_id,
+        )
+
+    async def exists(self, user_id: int) -> bool:
+        return await _fetchval(
+            self.session,
+            "SELECT EXISTS (SELECT 1 FROM users WHERE id = $1 AND deleted_at IS NULL)",
+            user_id,
+        )
+
+    async def lock_active(self, user_id: int) -> bool:
+        locked = await _fetchval(
+            self.session,
+            "SELECT id FROM users WHERE id = $1 AND deleted_at IS NULL FOR SHARE",
+            user_id,
+        )
+        return locked is not None
+
+    async def get_by_email(self, email: str, include_deleted: bool = False) -> Row | None:
+        query = f"SELECT {USER_COLUMNS} FROM users WHERE email = $1"
+        if not include_deleted:
+            query += " AND deleted_at IS NULL"
+        return await _fetchrow(self.session, query, email)
+
+
+class RawAccountRepo(AccountRepo):
+    """
+    AccountRepo returning records. Records are immutable, so balances must
+    be changed through update_balance.
+    """
+
+    async def get(self, account_id: int) -> Row | None:
+        return await _fetchrow(
+            self.session,
+            f"SELECT {ACCOUNT_COLUMNS} FROM accounts WHERE id = $1",
+            account_id,
+        )
+
+    async def list_by_user(self, user_id: int) -> list[Row]:
+        return await _fetch(
+            self.session,
+            f"SELECT {ACCOUNT_COLUMNS} FROM accounts WHERE user_id = $1",
+            user_id,
+        )
+
+    async def get_account_for_update(self, account_id: int) -> Row | None:
+        return await _fetchrow(
+            self.session,
+            f"SELECT {ACCOUNT_COLUMNS} FROM accounts WHERE id = $1 FOR UPDATE",
+            account_id,
+        )
+
+    async def create_or_update(self, user_id: int, account_id: int) -> tuple[Row, bool]:
+        query = (
+            "INSERT INTO accounts (id, user_id, balance) VALUES ($1, $2, 0) "
+            "ON CONFLICT (id) DO UPDATE SET updated_at = now() "
+            f"RETURNING {ACCOUNT_COLUMNS}, xmax = 0 AS created"
+        )
+        try:
+            row = await _fetchrow(self.session, query, account_id, user_id)
+        except asyncpg.IntegrityConstraintViolationError as e:
+            # Same exception as the ORM version raises for a missing user.
+            raise IntegrityError(query, (account_id, user_id), e) from e
+        return row, row["created"]
+
+    async def update_balance(self, account: Row, new_balance) -> None:
+        conn = await get_driver_connection(self.session, begin=True)
+        await conn.execute(
+            "UPDATE accounts SET balance = $1, updated_at = now(), version = version + 1 "
+            "WHERE id = $2",
+            Decimal(str(new_balance)),
+            account.id,
+        )
+
+
+class RawPaymentRepo(PaymentRepo):
+    """PaymentRepo returning records for the webhook and /me paths."""
+
+    async def create_if_not_exists(
+        self, transaction_id: str, user_id: int, account_id: int, amount
+    ) -> Row | None:
+        return await _fetchrow(
+            self.session,
+            "INSERT INTO payments (transaction_id, user_id, account_id, amount) "
+            "VALUES ($1, $2, $3, $4) ON CONFLICT (transaction_id) DO NOTHING "
+            f"RETURNING {PAYMENT_COLUMNS}",
+            transaction_id,
+            user_id,
+            account_id,
+            Decimal(str(amount)),
+        )
+
+    async def list_by_user(self, user_id: int) -> list[Row]:
+        return await _fetch(
+            self.session,
+            f"SELECT {PAYMENT_COLUMNS} FROM payments WHERE user_id = $1",
+            user_id,
+        )
+
+    async def exists_transaction(self, transaction_id: str) -> bool:
+        return await _fetchval(
+            self.session,
+            "SELECT EXISTS (SELECT 1 FROM payments WHERE transaction_id = $1)",
+            transaction_id,
+        )
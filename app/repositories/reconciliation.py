@@ -0,0 +1,80 @@
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+
+from models.account import Account
+from models.payment import Payment
+
+
+class ReconciliationRepo:
+    """
+    Repository comparing stored account balances with the sum of their
+    payments, chunk by chunk in account ID order. Accounts of users being
+    purged are skipped: their payments are deleted in chunks, so their
+    balances legitimately stop matching until the account is gone.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def balances_chunk(self, after_id: int, limit: int) -> list:
+        """
+        Retrieves the next chunk of accounts with their stored balance and
+        the sum of their payments, in a single grouped query.
+
+        Both values come from the same statement snapshot, so a concurrent
+        webhook is either fully visible or not at all.
+
+        Args:
+            after_id (int): Only accounts with a greater ID are returned.
+            limit (int): Maximum number of accounts.
+
+        Returns:
+            list: Rows of (id, user_id, balance, expected) ordered by id.
+        """
+        chunk = (
+            select(Account.id, Account.user_id, Account.balance)
+            .where(Account.id > after_id, Account.deleted_at.is_(None))
+            .order_by(Account.id)
+            .limit(limit)
+            .subquery()
+        )
+        stmt = (
+            select(
+                chunk.c.id,
+                chunk.c.user_id,
+                chunk.c.balance,
+                func.coalesce(func.sum(Payment.amount), 0).label("expected"),
+            )
+            .outerjoin(Payment, Payment.account_id == chunk.c.id)
+            .group_by(chunk.c.id, chunk.c.user_id, chunk.c.balance)
+            .order_by(chunk.c.id)
+        )
+        q = await self.session.execute(stmt)
+        return q.all()
+
+    async def lock_account(self, account_id: int) -> Account | None:
+        """
+        Locks an account row unless it is locked already, e.g. by a webhook
+        in progress.
+
+        Returns:
+            Account | None: The locked account, or None if it is busy, gone or
+                            being purged.
+        """
+        q = await self.session.execute(
+            select(Account)
+            .where(Account.id == account_id, Account.deleted_at.is_(None))
+            .with_for_update(skip_locked=True)
+        )
+        return q.scalar_one_or_none()
+
+    async def payments_total(self, account_id: int) -> Decimal:
+        """Returns the sum of the payments of an account."""
+        q = await self.session.execute(
+            select(func.coalesce(func.sum(Payment.amount), 0)).where(
+                Payment.account_id == account_id
+            )
+        )
+        return Decimal(q.scalar())
@@ -0,0 +1,92 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, cast, Date
+from sqlalchemy.dialects.postgresql import insert
+
+from models.account_daily_total import AccountDailyTotal
+
+
+class AccountStatementRepo:
+    """
+    Repository for the per-account daily payment rollup.
+
+    The rollup is written incrementally by the webhook path and read by the
+    statement endpoints with a single grouped query.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_payment(self, account_id: int, day: date, amount) -> None:
+        """
+        Folds a single payment into the rollup row of its account and day.
+
+        Args:
+            account_id (int): The ID of the account that received the payment.
+            day (date): The UTC day the payment was recorded on.
+            amount (decimal.Decimal | float): The payment amount.
+        """
+        amount = Decimal(str(amount))
+        stmt = insert(AccountDailyTotal).values(
+            account_id=account_id,
+            day=day,
+            payments_count=1,
+            total_amount=amount,
+            min_amount=amount,
+            max_amount=amount,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["account_id", "day"],
+            set_={
+                "payments_count": AccountDailyTotal.payments_count + 1,
+                "total_amount": AccountDailyTotal.total_amount
+                + stmt.excluded.total_amount,
+                "min_amount": func.least(
+                    AccountDailyTotal.min_amount, stmt.excluded.min_amount
+                ),
+                "max_amount": func.greatest(
+                    AccountDailyTotal.max_amount, stmt.excluded.max_amount
+                ),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def list_buckets(
+        self, account_id: int, date_from: date | None, date_to: date | None, bucket: str
+    ) -> list:
+        """
+        Aggregates the rollup rows of an account into day or month buckets.
+
+        Args:
+            account_id (int): The ID of the account.
+            date_from (date | None): First day to include, unbounded if None.
+            date_to (date | None): Last day to include, unbounded if None.
+            bucket (str): Either "day" or "month".
+
+        Returns:
+            list: Rows of (period, payments_count, total_amount, min_amount, max_amount)
+                  ordered by period.
+        """
+        if bucket == "month":
+            period = cast(func.date_trunc("month", AccountDailyTotal.day), Date)
+        else:
+            period = AccountDailyTotal.day
+        period = period.label("period")
+
+        stmt = select(
+            period,
+            func.sum(AccountDailyTotal.payments_count).label("payments_count"),
+            func.sum(AccountDailyTotal.total_amount).label("total_amount"),
+            func.min(AccountDailyTotal.min_amount).label("min_amount"),
+            func.max(AccountDailyTotal.max_amount).label("max_amount"),
+        ).where(AccountDailyTotal.account_id == account_id)
+        if date_from is not None:
+            stmt = stmt.where(AccountDailyTotal.day >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(AccountDailyTotal.day <= date_to)
+        stmt = stmt.group_by(period).order_by(period)
+
+        q = await self.session.execute(stmt)
+        return q.all()
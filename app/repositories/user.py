@@ -1,8 +1,81 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import (
+    select, text, exists, bindparam, delete, update, func, case, or_, tuple_
+)
 from models.user import User
+from models.account import Account
 from sqlalchemy.orm import selectinload
 
+from db import get_driver_connection
+
+IMPORT_STAGING_TABLE = "users_import"
+IMPORT_COLUMNS = ("row_no", "email", "full_name", "password_hash", "is_admin")
+
+CREATE_IMPORT_STAGING = text(
+    f"CREATE TEMP TABLE IF NOT EXISTS {IMPORT_STAGING_TABLE} ("
+    "row_no integer NOT NULL, "
+    "email varchar(255) NOT NULL, "
+    "full_name varchar(255), "
+    "password_hash varchar(255) NOT NULL, "
+    "is_admin boolean NOT NULL"
+    ") ON COMMIT DROP"
+)
+
+# Inserts the first staged row of every email that is not taken yet, creates
+# their stats rows, and returns every staged row that was not inserted.
+MERGE_IMPORT_STAGING = text(
+    f"""
+    WITH candidates AS (
+        SELECT DISTINCT ON (email) row_no, email, full_name, password_hash, is_admin
+        FROM {IMPORT_STAGING_TABLE}
+        ORDER BY email, row_no
+    ), inserted AS (
+        INSERT INTO users (email, full_name, password_hash, is_admin)
+        SELECT email, full_name, password_hash, is_admin
+        FROM candidates
+        ORDER BY row_no
+        ON CONFLICT (email) DO NOTHING
+        RETURNING id, email
+    ), stats AS (
+        INSERT INTO user_stats (user_id)
+        SELECT id FROM inserted
+    )
+    SELECT s.row_no, s.email
+    FROM {IMPORT_STAGING_TABLE} s
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM inserted i
+        JOIN candidates c ON c.email = i.email
+        WHERE c.row_no = s.row_no
+    )
+    ORDER BY s.row_no
+    """
+)
+
+# Hot statements are built once at import; calls only bind parameters.
+# Soft-deleted users (being purged) are filtered out of every lookup.
+GET_BY_EMAIL = select(User).where(
+    User.email == bindparam("email"), User.deleted_at.is_(None)
+)
+GET_BY_EMAIL_ANY = select(User).where(User.email == bindparam("email"))
+EXISTS = select(
+    exists().where(User.id == bindparam("user_id"), User.deleted_at.is_(None))
+)
+LOCK_ACTIVE = (
+    select(User.id)
+    .where(User.id == bindparam("user_id"), User.deleted_at.is_(None))
+    .with_for_update(read=True)
+)
+
+# Trigrams need at least this many characters; shorter queries only match
+# email prefixes.
+TRIGRAM_MIN_LENGTH = 3
+
+EXPORT_QUERY = (
+    "SELECT id, email, full_name, is_admin FROM users "
+    "WHERE deleted_at IS NULL ORDER BY id"
+)
+
 
 class UserRepo:
     """
@@ -25,19 +98,53 @@ class UserRepo:
         Returns:
             User | None: The User instance if found, otherwise None.
         """
-        return await self.session.get(User, user_id)
+        user = await self.session.get(User, user_id)
+        if user is None or user.deleted_at is not None:
+            return None
+        return user
+
+    async def exists(self, user_id: int) -> bool:
+        """
+        Check whether a user exists without loading the row.
 
-    async def get_by_email(self, email: str) -> User | None:
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            bool: True if the user exists.
+        """
+        q = await self.session.execute(EXISTS, {"user_id": user_id})
+        return q.scalar()
+
+    async def lock_active(self, user_id: int) -> bool:
+        """
+        Lock a user row against deletion (FOR SHARE) unless it is deleted or
+        being purged. A concurrent delete waits for the caller's commit, so
+        rows created for the user meanwhile are deleted with it.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            bool: True if an active user was locked.
+        """
+        q = await self.session.execute(LOCK_ACTIVE, {"user_id": user_id})
+        return q.scalar() is not None
+
+    async def get_by_email(self, email: str, include_deleted: bool = False) -> User | None:
         """
         Retrieve a user by their email address.
 
         Args:
             email (str): Email address of the user.
+            include_deleted (bool): Also return a user that is being purged,
+                                    whose email is still taken.
 
         Returns:
             User | None: The User instance if found, otherwise None.
         """
-        q = await self.session.execute(select(User).where(User.email == email))
+        stmt = GET_BY_EMAIL_ANY if include_deleted else GET_BY_EMAIL
+        q = await self.session.execute(stmt, {"email": email})
         return q.scalar_one_or_none()
 
     async def create(
@@ -77,10 +184,59 @@ class UserRepo:
             list[User]: List of all User instances with related accounts loaded.
         """
         q = await self.session.execute(
-            select(User).options(selectinload(User.accounts))
+            select(User)
+            .where(User.deleted_at.is_(None))
+            .options(selectinload(User.accounts))
         )
         return q.scalars().all()
 
+    async def search(
+        self, query: str, limit: int, after: tuple[int, int] | None = None
+    ) -> list:
+        """
+        Find active users whose email or full name contains the query,
+        case-insensitively, best matches first.
+
+        Matches are ranked in tiers: 0 exact email, 1 email prefix, 2 name
+        prefix, 3 substring; ties are ordered by ID. The tiers are cheap to
+        compute for every candidate returned by the trigram indexes and give
+        a stable keyset for pagination.
+
+        Args:
+            query (str): Text to look for.
+            limit (int): Maximum number of rows to return.
+            after (tuple[int, int] | None): (rank, id) of the last row of the
+                                            previous page.
+
+        Returns:
+            list: Rows of (id, email, full_name, rank).
+        """
+        lowered = query.lower()
+        escaped = (
+            lowered.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        prefix = escaped + "%"
+        rank = case(
+            (func.lower(User.email) == lowered, 0),
+            (func.lower(User.email).like(prefix), 1),
+            (User.full_name.ilike(prefix), 2),
+            else_=3,
+        ).label("rank")
+
+        if len(query) >= TRIGRAM_MIN_LENGTH:
+            contains = "%" + escaped + "%"
+            match = or_(User.email.ilike(contains), User.full_name.ilike(contains))
+        else:
+            match = func.lower(User.email).like(prefix)
+
+        stmt = select(User.id, User.email, User.full_name, rank).where(
+            match, User.deleted_at.is_(None)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(rank, User.id) > tuple_(after[0], after[1]))
+        q = await self.session.execute(stmt.order_by(rank, User.id).limit(limit))
+        return q.all()
+
     async def delete(self, user: User) -> None:
         """
         Delete a user from the database.
@@ -89,3 +245,81 @@ class UserRepo:
             user (User): The User instance to delete.
         """
         await self.session.delete(user)
+
+    async def delete_by_id(self, user_id: int) -> bool:
+        """
+        Delete a user with a single statement. Accounts, payments and
+        rollups are removed by the database's ON DELETE CASCADE, without
+        loading them.
+
+        Args:
+            user_id (int): The ID of the user to delete.
+
+        Returns:
+            bool: True if the user existed.
+        """
+        result = await self.session.execute(delete(User).where(User.id == user_id))
+        return result.rowcount > 0
+
+    async def soft_delete(self, user_id: int) -> bool:
+        """
+        Mark a user and their accounts as deleted, hiding them from lookups
+        and making webhooks reject their accounts until they are purged.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            bool: True if an active user was marked.
+        """
+        result = await self.session.execute(
+            update(User)
+            .where(User.id == user_id, User.deleted_at.is_(None))
+            .values(deleted_at=func.now())
+        )
+        if not result.rowcount:
+            return False
+        await self.session.execute(
+            update(Account).where(Account.user_id == user_id).values(deleted_at=func.now())
+        )
+        return True
+
+    async def create_import_staging(self) -> None:
+        """
+        Create the temporary staging table used by bulk imports.
+        The table is dropped when the transaction commits.
+        """
+        await self.session.execute(CREATE_IMPORT_STAGING)
+
+    async def copy_to_import_staging(self, records: list[tuple]) -> None:
+        """
+        Load rows into the staging table with COPY.
+
+        Args:
+            records (list[tuple]): Tuples ordered as IMPORT_COLUMNS.
+        """
+        conn = await get_driver_connection(self.session)
+        await conn.copy_records_to_table(
+            IMPORT_STAGING_TABLE, records=records, columns=IMPORT_COLUMNS
+        )
+
+    async def merge_import_staging(self) -> list[tuple[int, str]]:
+        """
+        Insert staged users whose email is free and report the rest.
+
+        Returns:
+            list[tuple[int, str]]: (row_no, email) of every staged row that was
+                                   not inserted because its email already exists.
+        """
+        q = await self.session.execute(MERGE_IMPORT_STAGING)
+        return [(r.row_no, r.email) for r in q]
+
+    async def copy_out_csv(self, output) -> None:
+        """
+        Stream all users as CSV with COPY TO STDOUT.
+
+        Args:
+            output (callable): Async callable receiving each chunk of bytes.
+        """
+        conn = await get_driver_connection(self.session)
+        await conn.copy_from_query(EXPORT_QUERY, output=output, format="csv", header=True)
@@ -0,0 +1,95 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update, func, or_, and_
+from sqlalchemy.dialects.postgresql import insert
+
+from models.payment import Payment
+from models.user_purge import UserPurge
+
+
+class UserPurgeRepo:
+    """
+    Repository for background user purges and the chunked deletes they run.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def start(self, user_id: int, payments_total: int | None) -> None:
+        """
+        Queues a purge of a soft-deleted user.
+
+        Args:
+            user_id (int): The ID of the user.
+            payments_total (int | None): Expected number of payments, for progress.
+        """
+        stmt = insert(UserPurge).values(
+            user_id=user_id, status="pending", payments_total=payments_total
+        ).on_conflict_do_nothing(index_elements=["user_id"])
+        await self.session.execute(stmt)
+
+    async def get(self, user_id: int) -> UserPurge | None:
+        return await self.session.get(UserPurge, user_id)
+
+    async def claim(self, lease_seconds: float) -> UserPurge | None:
+        """
+        Marks the oldest pending purge as running and returns it. A running
+        purge whose worker stopped reporting progress for `lease_seconds` is
+        taken over. Purges claimed concurrently by others are skipped.
+
+        Returns:
+            UserPurge | None: The claimed purge, if any.
+        """
+        stale = func.now() - func.make_interval(0, 0, 0, 0, 0, 0, lease_seconds)
+        candidate = (
+            select(UserPurge.user_id)
+            .where(
+                or_(
+                    UserPurge.status == "pending",
+                    and_(UserPurge.status == "running", UserPurge.updated_at < stale),
+                )
+            )
+            .order_by(UserPurge.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        q = await self.session.execute(
+            update(UserPurge)
+            .where(UserPurge.user_id == candidate)
+            .values(status="running", updated_at=func.now())
+            .returning(UserPurge)
+        )
+        return q.scalar_one_or_none()
+
+    async def delete_payments_chunk(self, user_id: int, limit: int) -> int:
+        """
+        Deletes up to `limit` payments of a user.
+
+        Returns:
+            int: Number of deleted payments.
+        """
+        chunk = select(Payment.id).where(Payment.user_id == user_id).limit(limit)
+        result = await self.session.execute(
+            delete(Payment)
+            .where(Payment.id.in_(chunk))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    async def record_progress(self, user_id: int, deleted: int) -> None:
+        """Adds deleted payments to a purge and refreshes its lease."""
+        await self.session.execute(
+            update(UserPurge)
+            .where(UserPurge.user_id == user_id)
+            .values(
+                payments_deleted=UserPurge.payments_deleted + deleted,
+                updated_at=func.now(),
+            )
+        )
+
+    async def finish(self, user_id: int) -> None:
+        await self.session.execute(
+            update(UserPurge)
+            .where(UserPurge.user_id == user_id)
+            .values(status="done", updated_at=func.now(), finished_at=func.now())
+        )
@@ -0,0 +1,229 @@
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, or_, tuple_, bindparam, cast, Integer
+from sqlalchemy.dialects.postgresql import insert
+
+from models.account import Account
+from models.payment import Payment
+from models.user import User
+from models.user_stats import UserStats
+
+SORT_COLUMNS = {
+    "accounts_count": UserStats.accounts_count,
+    "total_balance": UserStats.total_balance,
+    "payments_count": UserStats.payments_count,
+    "last_payment_at": UserStats.last_payment_at,
+}
+NULLABLE_SORTS = {"last_payment_at"}
+
+# Transaction-level advisory locks serializing rebuilds with incremental
+# updates. Users are grouped in buckets of LOCK_BUCKET IDs; apply() holds its
+# user's bucket shared until commit and rebuild() holds the buckets of its
+# range exclusively, so a delta is either committed before a rebuild reads
+# the source tables or added on top of the rebuilt row, never overwritten.
+LOCK_NAMESPACE = 27001
+LOCK_BUCKET = 1000
+
+LOCK_USER_SHARED = select(
+    func.pg_advisory_xact_lock_shared(LOCK_NAMESPACE, bindparam("bucket"))
+)
+LOCK_RANGE = select(
+    func.pg_advisory_xact_lock(
+        LOCK_NAMESPACE,
+        func.generate_series(
+            cast(bindparam("first_bucket"), Integer),
+            cast(bindparam("last_bucket"), Integer),
+        ),
+    )
+)
+
+
+class UserStatsRepo:
+    """
+    Repository for the per-user dashboard rollup.
+
+    Provides incremental updates for the write paths, a set-based rebuild
+    for backfill/repair and keyset pagination sorted by any stat.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, user_id: int) -> UserStats | None:
+        """Retrieves the stats row of a user."""
+        return await self.session.get(UserStats, user_id)
+
+    async def apply(
+        self,
+        user_id: int,
+        accounts: int = 0,
+        balance=0,
+        payments: int = 0,
+        last_payment_at=None,
+    ) -> None:
+        """
+        Adds deltas to a user's stats row, creating the row if needed.
+
+        Args:
+            user_id (int): The ID of the user.
+            accounts (int): Number of accounts created.
+            balance (decimal.Decimal | float): Change of the total balance.
+            payments (int): Number of payments received.
+            last_payment_at (datetime | None): Time of the latest payment, if any.
+        """
+        await self.session.execute(LOCK_USER_SHARED, {"bucket": user_id // LOCK_BUCKET})
+        stmt = insert(UserStats).values(
+            user_id=user_id,
+            accounts_count=accounts,
+            total_balance=Decimal(str(balance)),
+            payments_count=payments,
+            last_payment_at=last_payment_at,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "accounts_count": UserStats.accounts_count
+                + stmt.excluded.accounts_count,
+                "total_balance": UserStats.total_balance + stmt.excluded.total_balance,
+                "payments_count": UserStats.payments_count
+                + stmt.excluded.payments_count,
+                "last_payment_at": func.greatest(
+                    UserStats.last_payment_at, stmt.excluded.last_payment_at
+                ),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def rebuild(self, user_id_from: int, user_id_to: int) -> int:
+        """
+        Recomputes the stats of a range of users from the source tables.
+
+        Waits for transactions that applied deltas to users of the range and
+        holds off new ones until the caller commits.
+
+        Args:
+            user_id_from (int): First user ID of the range (inclusive).
+            user_id_to (int): Last user ID of the range (inclusive).
+
+        Returns:
+            int: Number of stats rows written.
+        """
+        await self.session.execute(
+            LOCK_RANGE,
+            {
+                "first_bucket": user_id_from // LOCK_BUCKET,
+                "last_bucket": user_id_to // LOCK_BUCKET,
+            },
+        )
+        accounts = (
+            select(
+                Account.user_id,
+                func.count().label("accounts_count"),
+                func.sum(Account.balance).label("total_balance"),
+            )
+            .where(Account.user_id.between(user_id_from, user_id_to))
+            .group_by(Account.user_id)
+            .subquery()
+        )
+        payments = (
+            select(
+                Payment.user_id,
+                func.count().label("payments_count"),
+                func.max(Payment.created_at).label("last_payment_at"),
+            )
+            .where(Payment.user_id.between(user_id_from, user_id_to))
+            .group_by(Payment.user_id)
+            .subquery()
+        )
+        source = (
+            select(
+                User.id,
+                func.coalesce(accounts.c.accounts_count, 0),
+                func.coalesce(accounts.c.total_balance, 0),
+                func.coalesce(payments.c.payments_count, 0),
+                payments.c.last_payment_at,
+            )
+            .outerjoin(accounts, accounts.c.user_id == User.id)
+            .outerjoin(payments, payments.c.user_id == User.id)
+            .where(User.id.between(user_id_from, user_id_to))
+        )
+        stmt = insert(UserStats).from_select(
+            [
+                "user_id",
+                "accounts_count",
+                "total_balance",
+                "payments_count",
+                "last_payment_at",
+            ],
+            source,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "accounts_count": stmt.excluded.accounts_count,
+                "total_balance": stmt.excluded.total_balance,
+                "payments_count": stmt.excluded.payments_count,
+                "last_payment_at": stmt.excluded.last_payment_at,
+            },
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
+
+    async def page(
+        self,
+        sort: str,
+        descending: bool,
+        limit: int,
+        after: tuple | None = None,
+    ) -> list[UserStats]:
+        """
+        Retrieves one page of stats rows ordered by a stat column and user ID.
+
+        Uses PostgreSQL's default NULL ordering (last for ASC, first for DESC)
+        so the (stat, user_id) indexes can serve both directions.
+
+        Args:
+            sort (str): Name of the stat column to sort by.
+            descending (bool): Sort direction.
+            limit (int): Maximum number of rows to return.
+            after (tuple | None): (stat value, user_id) of the last row of the
+                                  previous page.
+
+        Returns:
+            list[UserStats]: The rows of the page.
+        """
+        col = SORT_COLUMNS[sort]
+        stmt = select(UserStats)
+        if after is not None:
+            stmt = stmt.where(
+                _after(col, after[0], after[1], descending, sort in NULLABLE_SORTS)
+            )
+        if descending:
+            stmt = stmt.order_by(col.desc(), UserStats.user_id.desc())
+        else:
+            stmt = stmt.order_by(col.asc(), UserStats.user_id.asc())
+        q = await self.session.execute(stmt.limit(limit))
+        return q.scalars().all()
+
+    async def user_id_bounds(self) -> tuple[int | None, int | None]:
+        """
+        Returns the smallest and largest user IDs, used to chunk rebuilds.
+        """
+        q = await self.session.execute(select(func.min(User.id), func.max(User.id)))
+        return tuple(q.one())
+
+
+def _after(col, value, user_id: int, descending: bool, nullable: bool):
+    if value is None:
+        if descending:
+            return or_(and_(col.is_(None), UserStats.user_id < user_id), col.isnot(None))
+        return and_(col.is_(None), UserStats.user_id > user_id)
+
+    key = tuple_(col, UserStats.user_id)
+    if descending:
+        return key < tuple_(value, user_id)
+    cond = key > tuple_(value, user_id)
+    if nullable:
+        cond = or_(cond, col.is_(None))
+    return cond
@@ -1,9 +1,36 @@
+import os
+
 from sanic import Blueprint, response
+
+from config import settings
 from utils.auth import auth_required, admin_required
+from utils.idempotency import idempotent
 from services.admin import AdminService
+from services.payment_export import CONTENT_TYPES, PaymentExportService, parse_export_range
+from services.statement import StatementService
+from services.user_stats import UserStatsService
+from services.user_purge import UserPurgeService
+from services.user_import import UserImportService
+from utils import metrics
+from utils.profiler import profile_worker
+from utils.slow_queries import get_slow_query_log
 
 bp = Blueprint("admin", url_prefix="/admin")
 
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+async def _body_chunks(request):
+    while True:
+        chunk = await request.stream.read()
+        if chunk is None:
+            break
+        yield chunk
+
 
 @bp.get("/me")
 @auth_required
@@ -50,13 +77,95 @@ async def list_users(request):
         return response.json([u.model_dump() for u in users])
 
 
+@bp.get("/users/stats")
+@auth_required
+@admin_required
+async def user_stats(request):
+    """
+    Page over per-user dashboard stats sorted by any stat.
+
+    Query parameters:
+        sort (str, optional): accounts_count | total_balance | payments_count |
+                              last_payment_at. Default: payments_count.
+        order (str, optional): asc | desc. Default: desc.
+        limit (int, optional): Page size, at most 500. Default: 50.
+        cursor (str, optional): next_cursor of the previous page.
+
+    Returns:
+        JSON object:
+        {
+            "items": [
+                {
+                    "user_id": int,
+                    "accounts_count": int,
+                    "total_balance": float,
+                    "payments_count": int,
+                    "last_payment_at": str | None
+                },
+                ...
+            ],
+            "next_cursor": str | None
+        }
+    """
+    async with request.ctx.uow:
+        svc = UserStatsService(request.ctx.uow)
+        page = await svc.page(
+            sort=request.args.get("sort"),
+            order=request.args.get("order"),
+            limit=request.args.get("limit", 50),
+            cursor=request.args.get("cursor"),
+        )
+        return response.json(page.model_dump())
+
+
+@bp.get("/users/search")
+@auth_required
+@admin_required
+async def search_users(request):
+    """
+    Search users by part of their email or full name, case-insensitively.
+
+    Query parameters:
+        q (str): Text to look for. Queries shorter than 3 characters only
+                 match email prefixes.
+        limit (int, optional): Page size, at most 100. Default: 20.
+        cursor (str, optional): next_cursor of the previous page.
+
+    Returns:
+        JSON object, exact and prefix matches first:
+        {
+            "items": [
+                {
+                    "id": int,
+                    "email": str,
+                    "full_name": str | None
+                },
+                ...
+            ],
+            "next_cursor": str | None
+        }
+    """
+    async with request.ctx.uow:
+        svc = AdminService(request.ctx.uow)
+        page = await svc.search_users(
+            request.args.get("q"),
+            limit=request.args.get("limit", 20),
+            cursor=request.args.get("cursor"),
+        )
+        return response.json(page.model_dump())
+
+
 @bp.post("/users")
 @auth_required
 @admin_required
+@idempotent
 async def create_user(request):
     """
     Create a new user.
 
+    Supports the Idempotency-Key header: a retry with the same key returns
+    the stored response without creating the user again.
+
     Request body (JSON):
     {
         "email": str,
@@ -81,35 +190,134 @@ async def create_user(request):
         return response.json(user.model_dump(), status=201)
 
 
+@bp.post("/users/import", stream=True)
+@auth_required
+@admin_required
+async def import_users(request):
+    """
+    Bulk-create users from a streamed CSV (with header) or NDJSON body.
+
+    The format is taken from the "format" query parameter (csv | ndjson) or
+    from the Content-Type (text/csv, application/x-ndjson).
+    Each record has the fields email, full_name, password and is_admin.
+
+    Returns:
+        JSON object:
+        {
+            "created": int,
+            "conflicts": [{"row": int, "email": str, "error": str}, ...],
+            "errors": [{"row": int, "error": str}, ...]
+        }
+
+        400 if the format is unknown or a line is not valid UTF-8. Rows are
+        committed in batches of IMPORT_BATCH_SIZE, so the batches before the
+        bad line stay imported.
+    """
+    content_type = (request.content_type or "").split(";")[0].strip()
+    fmt = request.args.get("format") or IMPORT_CONTENT_TYPES.get(content_type, "csv")
+    async with request.ctx.uow:
+        svc = UserImportService(request.ctx.uow)
+        result = await svc.import_users(_body_chunks(request), fmt)
+        return response.json(result)
+
+
+@bp.get("/users/export")
+@auth_required
+@admin_required
+async def export_users(request):
+    """
+    Stream all users as CSV (id, email, full_name, is_admin).
+
+    Returns:
+        200 OK with a text/csv body.
+    """
+    async with request.ctx.uow:
+        svc = UserImportService(request.ctx.uow)
+        resp = await request.respond(
+            content_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="users.csv"'},
+        )
+        await svc.export_users(resp.send)
+        await resp.eof()
+
+
 @bp.delete("/users/<user_id:int>")
 @auth_required
 @admin_required
 async def delete_user(request, user_id: int):
     """
-    Delete a user by ID.
+    Delete a user by ID with their accounts and payments.
 
     Path parameter:
         user_id (int): ID of the user to delete.
 
+    Query parameters:
+        mode (str, optional): "sync" deletes in this request, "async" hides
+            the user at once and purges their data in the background.
+            Defaults to "auto", which purges users with many payments
+            asynchronously.
+
     Returns:
         204 on successful deletion.
+        202 if a background purge was queued:
+        {
+            "status": "purging",
+            "progress": str  # URL of the purge status
+        }
         404 if the user does not exist.
     """
+    mode = request.args.get("mode", "auto")
     async with request.ctx.uow:
         svc = AdminService(request.ctx.uow)
-        ok = await svc.delete_user(user_id)
-        if not ok:
+        result = await svc.delete_user(user_id, mode)
+        if result is None:
             return response.json({"message": "not found"}, status=404)
+        if result == "purging":
+            return response.json(
+                {"status": "purging", "progress": f"/admin/users/{user_id}/purge"},
+                status=202,
+            )
         return response.json({"status": "deleted"}, status=204)
 
 
+@bp.get("/users/<user_id:int>/purge")
+@auth_required
+@admin_required
+async def user_purge_status(request, user_id: int):
+    """
+    Progress of a background user purge.
+
+    Returns:
+        200 OK with JSON:
+        {
+            "user_id": int,
+            "status": "pending" | "running" | "done",
+            "payments_deleted": int,
+            "payments_total": int | null,
+            "created_at": str,
+            "finished_at": str | null
+        }
+
+        404 if no purge exists for the user.
+    """
+    async with request.ctx.uow:
+        svc = UserPurgeService(request.ctx.uow)
+        status = await svc.status(user_id)
+    if status is None:
+        return response.json({"message": "not found"}, status=404)
+    return response.json(status)
+
+
 @bp.patch("/users/<user_id:int>")
 @auth_required
 @admin_required
+@idempotent
 async def update_user(request, user_id: int):
     """
     Update a user's information.
 
+    Supports the Idempotency-Key header.
+
     Path parameter:
         user_id (int): ID of the user to update.
 
@@ -160,3 +368,208 @@ async def user_accounts(request, user_id: int):
         svc = AdminService(request.ctx.uow)
         accounts = await svc.get_user_accounts(user_id)
         return response.json([a.model_dump() for a in accounts])
+
+
+@bp.get("/accounts/<account_id:int>/statement")
+@auth_required
+@admin_required
+async def account_statement(request, account_id: int):
+    """
+    Get aggregated payment totals for any account.
+
+    Path parameter:
+        account_id (int): ID of the account.
+
+    Query parameters:
+        from (str, optional): First day to include, YYYY-MM-DD.
+        to (str, optional): Last day to include, YYYY-MM-DD.
+        bucket (str, optional): "day" (default) or "month".
+
+    Payments made before the statement rollup was introduced carry no
+    timestamp of their own and are all reported under the day of that
+    migration.
+
+    Returns:
+        JSON array of statement entries:
+        [
+            {
+                "period": str,
+                "count": int,
+                "total": float,
+                "min": float,
+                "max": float
+            },
+            ...
+        ]
+        404 if the account does not exist.
+    """
+    async with request.ctx.uow:
+        svc = StatementService(request.ctx.uow)
+        entries = await svc.get_statement(
+            account_id,
+            date_from=request.args.get("from"),
+            date_to=request.args.get("to"),
+            bucket=request.args.get("bucket"),
+        )
+        if entries is None:
+            return response.json({"message": "not found"}, status=404)
+        return response.json([e.model_dump() for e in entries])
+
+
+@bp.get("/payments/export")
+@auth_required
+@admin_required
+async def export_payments(request):
+    """
+    Stream payments ordered by ID for finance extracts.
+
+    Query parameters:
+        format (str, optional): "csv" (default) or "parquet" (needs pyarrow).
+        from (str, optional): Earliest creation time, ISO date or datetime (UTC if naive).
+        to (str, optional): Creation time to stop before (exclusive).
+        account_from (int, optional): Smallest account ID to include.
+        account_to (int, optional): Largest account ID to include.
+        after_id (int, optional): Resume after this payment ID.
+
+    Returns:
+        200 OK with a text/csv or Parquet body with columns
+        id, transaction_id, user_id, account_id, amount, created_at.
+        400 if a parameter is malformed.
+    """
+    fmt = PaymentExportService.check_format(request.args.get("format"))
+    filters = parse_export_range(
+        request.args.get("from"),
+        request.args.get("to"),
+        request.args.get("account_from"),
+        request.args.get("account_to"),
+    )
+    after_id = request.args.get("after_id", "0")
+    if not after_id.isdigit():
+        return response.json({"message": "'after_id' must be an integer"}, status=400)
+
+    async with request.ctx.uow:
+        svc = PaymentExportService(request.ctx.uow)
+        resp = await request.respond(
+            content_type=CONTENT_TYPES[fmt],
+            headers={"Content-Disposition": f'attachment; filename="payments.{fmt}"'},
+        )
+        await svc.export(fmt, resp.send, filters, after_id=int(after_id))
+        await resp.eof()
+
+
+@bp.get("/metrics")
+@auth_required
+@admin_required
+async def worker_metrics(request):
+    """
+    Get the in-process metrics of the worker that served the request.
+
+    Returns:
+        JSON object keyed by component, e.g.
+        {
+            "limiter": {"webhook": {"limit": float, "in_flight": int, ...}, ...}
+        }
+    """
+    return response.json(metrics.snapshot())
+
+
+@bp.get("/slow-queries")
+@auth_required
+@admin_required
+async def slow_queries(request):
+    """
+    Get the statements slower than DB_SLOW_QUERY_MS on the worker that
+    served the request.
+
+    Query parameters:
+        limit (int, optional): Number of top statements, default 20.
+
+    Returns:
+        200 OK with JSON:
+        {
+            "threshold_ms": float,
+            "top": [  # by total time, worst first
+                {
+                    "sql": str,
+                    "count": int,
+                    "total_ms": float,
+                    "avg_ms": float,
+                    "max_ms": float,
+                    "origins": [str],  # repository methods issuing it
+                    "routes": [str],
+                    "plan": {"at": float, "analyze": bool, "text": str} | None
+                },
+                ...
+            ],
+            "recent": [  # latest slow statements, oldest first
+                {"at": float, "ms": float, "sql": str, "origin": str, "route": str},
+                ...
+            ]
+        }
+    """
+    limit = request.args.get("limit", "20")
+    if not limit.isdigit():
+        return response.json({"message": "'limit' must be an integer"}, status=400)
+    log = get_slow_query_log()
+    return response.json(
+        {
+            "threshold_ms": log.threshold_ms,
+            "top": log.top(int(limit)),
+            "recent": list(log.recent)[-int(limit):],
+        }
+    )
+
+
+@bp.get("/profile")
+@auth_required
+@admin_required
+async def profile(request):
+    """
+    Sample the stacks of the worker that served the request for a while.
+
+    Query parameters:
+        seconds (float, optional): How long to sample, default 10, at most
+            PROFILE_MAX_SECONDS.
+        interval_ms (float, optional): Thread sampling interval, default 10.
+        format (str, optional): "collapsed" (default) for a flamegraph
+            input file, or "json" for the most frequent stacks.
+
+    Returns:
+        200 OK with collapsed stacks (text/plain), one "frame;...;frame count"
+        line per stack. Stacks rooted at "thread <name>" are what each
+        thread was executing, including code blocking the event loop;
+        stacks rooted at "task <name>" are what each pending coroutine was
+        awaiting.
+        400 if a parameter is malformed.
+        409 if a profile is already running on this worker.
+    """
+    try:
+        seconds = float(request.args.get("seconds", 10))
+        interval = float(request.args.get("interval_ms", 10)) / 1000
+    except ValueError:
+        return response.json(
+            {"message": "'seconds' and 'interval_ms' must be numbers"}, status=400
+        )
+    fmt = request.args.get("format", "collapsed")
+    if fmt not in ("collapsed", "json"):
+        return response.json({"message": "'format' must be collapsed or json"}, status=400)
+    if not 0 < seconds <= settings.PROFILE_MAX_SECONDS or not 0.001 <= interval <= 1:
+        return response.json(
+            {
+                "message": f"'seconds' must be in (0, {settings.PROFILE_MAX_SECONDS}] "
+                "and 'interval_ms' in [1, 1000]"
+            },
+            status=400,
+        )
+
+    result = await profile_worker(seconds, interval)
+    if result is None:
+        return response.json({"message": "a profile is already running"}, status=409)
+    if fmt == "json":
+        return response.json(result.summary())
+    return response.text(
+        result.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{os.getpid()}.collapsed"'
+        },
+    )
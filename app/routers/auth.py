@@ -1,6 +1,9 @@
+import time
+
 from sanic import Blueprint, response
 from schemas.auth import LoginSchema
 from services.auth import AuthService
+from utils.login_guard import LoginGuard
 
 bp = Blueprint("auth", url_prefix="/auth")
 
@@ -22,15 +25,26 @@ async def login(request):
             "access_token": str
         }
 
-        401 Unauthorized if the credentials are invalid:
+        401 Unauthorized if the credentials are invalid or too many attempts
+        failed recently for the email or client address; every 401 takes
+        LOGIN_REJECT_DELAY seconds:
         {
             "message": "invalid credentials"
         }
     """
+    started = time.monotonic()
     data = LoginSchema.model_validate(request.json or {})
     async with request.ctx.uow:
         svc = AuthService(request.ctx.uow)
-        token = await svc.authenticate(data.email, data.password)
-        if not token:
-            return response.json({"message": "invalid credentials"}, status=401)
-        return response.json({"access_token": token})
+        token = await svc.authenticate(
+            data.email, data.password, request.remote_addr or request.ip
+        )
+    if not token:
+        # The padding is not work: free the limiter slot so it neither
+        # blocks other logins nor counts as latency.
+        slot = getattr(request.ctx, "limiter_slot", None)
+        if slot is not None:
+            slot.release()
+        await LoginGuard.delay_rejection(started)
+        return response.json({"message": "invalid credentials"}, status=401)
+    return response.json({"access_token": token})
@@ -1,6 +1,13 @@
+import asyncio
+
 from sanic import Blueprint, response
+
+from config import settings
 from utils.auth import auth_required
 from services.user import UserService
+from services.statement import StatementService
+from utils.etag import etag_matches, not_modified
+from utils.events import get_balance_hub, stream_balance_events
 
 bp = Blueprint("user", url_prefix="")
 
@@ -41,11 +48,53 @@ async def my_accounts(request):
             },
             ...
         ]
+
+        304 Not Modified if If-None-Match matches the current ETag.
     """
     async with request.ctx.uow:
         svc = UserService(request.ctx.uow)
+        etag = await svc.get_accounts_etag(request.ctx.user_id)
+        if etag_matches(request, etag):
+            return not_modified(etag)
         accounts = await svc.get_my_accounts(request.ctx.user_id)
-        return response.json([a.model_dump() for a in accounts])
+        return response.json([a.model_dump() for a in accounts], headers={"ETag": etag})
+
+
+@bp.get("/me/accounts/events")
+@auth_required
+async def my_account_events(request):
+    """
+    Subscribe to balance changes of the authenticated user's accounts.
+
+    Returns:
+        200 OK with a text/event-stream body. Each change is sent as
+            event: balance
+            data: {"user_id": int, "account_id": int, "balance": float}
+        If several changes of one account happen while the client is not
+        reading, only the latest is delivered.
+
+        503 Service Unavailable if the worker's subscriber cap is reached.
+    """
+    hub = get_balance_hub()
+    sub = hub.subscribe(request.ctx.user_id)
+    if sub is None:
+        return response.json(
+            {"message": "too many subscribers"}, status=503, headers={"Retry-After": "5"}
+        )
+    try:
+        resp = await request.respond(
+            content_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        await stream_balance_events(sub, resp.send)
+        try:
+            await asyncio.wait_for(resp.eof(), settings.SSE_SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            # The client stopped reading; drop the connection instead of
+            # waiting for its buffer to drain.
+            request.transport.abort()
+    finally:
+        hub.unsubscribe(sub)
 
 
 @bp.get("/me/payments")
@@ -66,8 +115,57 @@ async def my_payments(request):
             },
             ...
         ]
+
+        304 Not Modified if If-None-Match matches the current ETag.
     """
     async with request.ctx.uow:
         svc = UserService(request.ctx.uow)
+        etag = await svc.get_payments_etag(request.ctx.user_id)
+        if etag_matches(request, etag):
+            return not_modified(etag)
         payments = await svc.get_my_payments(request.ctx.user_id)
-        return response.json([p.model_dump() for p in payments])
+        return response.json([p.model_dump() for p in payments], headers={"ETag": etag})
+
+
+@bp.get("/me/accounts/<account_id:int>/statement")
+@auth_required
+async def my_account_statement(request, account_id: int):
+    """
+    Get aggregated payment totals for one of the authenticated user's accounts.
+
+    Query parameters:
+        from (str, optional): First day to include, YYYY-MM-DD.
+        to (str, optional): Last day to include, YYYY-MM-DD.
+        bucket (str, optional): "day" (default) or "month".
+
+    Payments made before the statement rollup was introduced carry no
+    timestamp of their own and are all reported under the day of that
+    migration.
+
+    Returns:
+        200 OK with JSON list:
+        [
+            {
+                "period": str,
+                "count": int,
+                "total": float,
+                "min": float,
+                "max": float
+            },
+            ...
+        ]
+
+        404 Not Found if the account does not belong to the user.
+    """
+    async with request.ctx.uow:
+        svc = StatementService(request.ctx.uow)
+        entries = await svc.get_statement(
+            account_id,
+            date_from=request.args.get("from"),
+            date_to=request.args.get("to"),
+            bucket=request.args.get("bucket"),
+            user_id=request.ctx.user_id,
+        )
+        if entries is None:
+            return response.json({"message": "not found"}, status=404)
+        return response.json([e.model_dump() for e in entries])
@@ -1,17 +1,23 @@
 from sanic import Blueprint, response
 from schemas.payment import WebhookIn
 from services.payment import PaymentService
+from utils.idempotency import idempotent
+from utils.webhook_capture import captured
 
 bp = Blueprint("webhook", url_prefix="/webhooks")
 
 
 @bp.post("/payment")
+@captured
+@idempotent
 async def payment_webhook(request):
     """
     Process a payment webhook from an external system.
 
-    Validates the signature, ensures the user and account exist,
+    Validates the signature, ensures the user and account exist and match,
     creates a payment record, and updates the account balance.
+    Supports the Idempotency-Key header. Recorded for replay when
+    WEBHOOK_CAPTURE_DIR is set.
 
     Returns:
         201 Created with JSON:
@@ -37,6 +43,11 @@ async def payment_webhook(request):
         {
             "message": "user not found"
         }
+
+        409 Conflict if the account belongs to a different user:
+        {
+            "message": "account belongs to another user"
+        }
     """
     data = WebhookIn.model_validate(request.json or {})
     async with request.ctx.uow:
@@ -47,5 +58,9 @@ async def payment_webhook(request):
             return response.json({"message": "invalid signature"}, status=400)
         except LookupError:
             return response.json({"message": "user not found"}, status=404)
+        except PermissionError:
+            return response.json(
+                {"message": "account belongs to another user"}, status=409
+            )
 
         return response.json(result, status=status)
@@ -10,3 +10,11 @@ class AccountOutWithUserId(BaseModel):
 class AccountOut(BaseModel):
     id: int
     balance: float
+
+
+class StatementEntryOut(BaseModel):
+    period: str
+    count: int
+    total: float
+    min: float
+    max: float
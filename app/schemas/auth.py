@@ -1,6 +1,8 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 
 class LoginSchema(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     email: EmailStr
     password: str
@@ -1,17 +1,50 @@
 from typing import Optional, List
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from .account import AccountOut
 
 
 class UserOut(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     email: EmailStr
     full_name: str | None = None
 
 
 class UserWithAccountsOut(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     email: EmailStr
     full_name: Optional[str] = None
     accounts: List[AccountOut] = Field(default_factory=list)
+
+
+class UserStatsOut(BaseModel):
+    user_id: int
+    accounts_count: int
+    total_balance: float
+    payments_count: int
+    last_payment_at: Optional[str] = None
+
+
+class UserStatsPageOut(BaseModel):
+    items: List[UserStatsOut] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+class UserSearchPageOut(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
+    items: List[UserOut] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+class UserImportRow(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
+    email: EmailStr
+    full_name: Optional[str] = None
+    password: str = Field(min_length=1)
+    is_admin: bool = False
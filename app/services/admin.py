@@ -1,14 +1,22 @@
+import base64
+import json
 from typing import Any
 
 from sanic.exceptions import InvalidUsage
 
+from config import settings
 from repositories.user import UserRepo
 from repositories.account import AccountRepo
+from repositories.user_stats import UserStatsRepo
+from repositories.user_purge import UserPurgeRepo
 from schemas.user import UserOut
+from utils.login_guard import get_login_guard
 from utils.security import hash_password
 from utils.other import filter_none_values
 
-from schemas.user import UserWithAccountsOut, AccountOut
+from schemas.user import UserWithAccountsOut, AccountOut, UserSearchPageOut
+
+MAX_SEARCH_PAGE_SIZE = 100
 
 
 class AdminService:
@@ -17,6 +25,8 @@ class AdminService:
         self.uow = uow
         self.uow.set_repository("user", UserRepo)
         self.uow.set_repository("account", AccountRepo)
+        self.uow.set_repository("user_stats", UserStatsRepo)
+        self.uow.set_repository("user_purge", UserPurgeRepo)
 
     async def create_user(
         self, email: str, full_name: str | None, password: str, is_admin: bool = False
@@ -36,7 +46,7 @@ class AdminService:
         Returns:
             UserOut: Pydantic schema representing the created user.
         """
-        existing = await self.uow.user.get_by_email(email)
+        existing = await self.uow.user.get_by_email(email, include_deleted=True)
         if existing:
             raise InvalidUsage(f"User with email {email} already exists")
 
@@ -44,6 +54,7 @@ class AdminService:
         user = await self.uow.user.create(
             email=email, full_name=full_name, password_hash=pwd_hash, is_admin=is_admin
         )
+        await self.uow.user_stats.apply(user_id=user.id)
 
         await self.uow.commit()
 
@@ -78,6 +89,8 @@ class AdminService:
                 setattr(user, key, value)
 
         await self.uow.commit()
+        if "password" in update_data:
+            get_login_guard().forget(user.email)
         return UserOut.model_validate(
             {"id": user.id, "email": user.email, "full_name": user.full_name}
         )
@@ -102,21 +115,96 @@ class AdminService:
             for user in users
         ]
 
-    async def delete_user(self, user_id: int):
+    async def search_users(
+        self, query: str | None, limit: int | str = 20, cursor: str | None = None
+    ) -> UserSearchPageOut:
+        """
+        Search users by part of their email or full name.
+
+        Args:
+            query (str | None): Text to look for.
+            limit (int | str): Page size, capped at MAX_SEARCH_PAGE_SIZE.
+            cursor (str | None): Opaque cursor returned with the previous page.
+
+        Raises:
+            InvalidUsage: If the query is empty or the limit or cursor is invalid.
+
+        Returns:
+            UserSearchPageOut: Best matches first and the cursor of the next page.
+        """
+        query = (query or "").strip()
+        if not query:
+            raise InvalidUsage("'q' is required")
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise InvalidUsage("'limit' must be an integer")
+        if limit < 1:
+            raise InvalidUsage("'limit' must be positive")
+        limit = min(limit, MAX_SEARCH_PAGE_SIZE)
+        after = None
+        if cursor:
+            try:
+                rank, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+                after = (int(rank), int(user_id))
+            except (ValueError, TypeError):
+                raise InvalidUsage("invalid cursor")
+
+        rows = await self.uow.user.search(query, limit, after)
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            raw = json.dumps([last.rank, last.id]).encode()
+            next_cursor = base64.urlsafe_b64encode(raw).decode()
+        return UserSearchPageOut(
+            items=[
+                UserOut.model_validate(
+                    {"id": r.id, "email": r.email, "full_name": r.full_name}
+                )
+                for r in rows
+            ],
+            next_cursor=next_cursor,
+        )
+
+    async def delete_user(self, user_id: int, mode: str = "auto") -> str | None:
         """
-        Delete a user by ID.
+        Delete a user by ID together with their accounts and payments.
+
+        "sync" deletes the user row in this transaction and lets the
+        database cascade to the children. "async" soft-deletes the user
+        right away and queues a background purge that removes payments in
+        throttled chunks. "auto" picks "async" for users with at least
+        PURGE_ASYNC_THRESHOLD payments.
 
         Args:
             user_id (int): ID of the user to delete.
+            mode (str): "auto", "sync" or "async".
+
+        Raises:
+            InvalidUsage: If the mode is unknown.
 
         Returns:
-            bool: True if deletion was successful, False if user not found.
+            str | None: "deleted" or "purging", or None if user not found.
         """
-        user = await self.uow.user.get_by_id(user_id)
-        if not user:
-            return False
-        await self.uow.user.delete(user)
-        return True
+        if mode not in ("auto", "sync", "async"):
+            raise InvalidUsage("mode must be one of auto, sync, async")
+        if not await self.uow.user.exists(user_id):
+            return None
+
+        stats = await self.uow.user_stats.get(user_id)
+        payments = stats.payments_count if stats else None
+        if mode == "auto":
+            large = payments is not None and payments >= settings.PURGE_ASYNC_THRESHOLD
+            mode = "async" if large else "sync"
+
+        if mode == "async":
+            await self.uow.user.soft_delete(user_id)
+            await self.uow.user_purge.start(user_id, payments)
+            result = "purging"
+        else:
+            await self.uow.user.delete_by_id(user_id)
+            result = "deleted"
+        return result
 
     async def get_user_accounts(self, user_id: int) -> list[AccountOut]:
         """
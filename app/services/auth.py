@@ -1,6 +1,7 @@
 from repositories.user import UserRepo
 from utils.auth import create_access_token
-from utils.security import verify_password
+from utils.login_guard import get_login_guard
+from utils.security import hash_password, password_needs_update, verify_password
 
 
 class AuthService:
@@ -14,22 +15,38 @@ class AuthService:
         self.uow = uow
         self.uow.set_repository("user", UserRepo)
 
-    async def authenticate(self, email: str, password: str):
+    async def authenticate(self, email: str, password: str, ip: str | None = None):
         """
         Authenticate a user by email and password.
 
+        Attempts over the failure limits of the email or client IP, and
+        pairs that failed recently, are rejected before the user lookup and
+        the password verify. A hash made with an outdated scheme or cost is
+        replaced after a successful verify.
+
         Args:
             email (str): User's email address.
             password (str): Plain text password to verify.
+            ip (str | None): Client address, for per-IP throttling.
 
         Returns:
             str | None: JWT access token if authentication succeeds, otherwise None.
         """
-        user = await self.uow.user.get_by_email(email)
-        if not user:
+        guard = get_login_guard()
+        if not await guard.allowed(email, ip):
             return None
-        if not verify_password(password, user.password_hash):
+        if guard.known_bad(email, password):
+            await guard.record_failure(email, ip, password)
+            return None
+        user = await self.uow.user.get_by_email(email)
+        if not user or not verify_password(password, user.password_hash):
+            await guard.record_failure(email, ip, password)
             return None
+        await guard.record_success(email)
+        if password_needs_update(user.password_hash):
+            # Only now is the plain password known to be right: move the
+            # hash to the configured scheme and cost without a reset.
+            user.password_hash = hash_password(password)
         token = create_access_token(
             {"sub": str(user.id), "is_admin": bool(user.is_admin)}
         )
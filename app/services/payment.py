@@ -1,26 +1,34 @@
 from decimal import Decimal
 
-
-from repositories.user import UserRepo
-from repositories.account import AccountRepo
-from repositories.payment import PaymentRepo
+from config import settings
+from repositories import backend_for
+from repositories.statement import AccountStatementRepo
+from repositories.user_stats import UserStatsRepo
+from repositories.outbox import OutboxRepo
+from services.statement import payment_day
 from utils.security import compute_signature
 from schemas.payment import PaymentOut
+from utils.events import BALANCE_CHANNEL
 
 
 class PaymentService:
     """
     Service responsible for processing payment webhooks and managing payment records.
 
-    This service verifies the webhook signature, ensures the user and account exist,
-    creates new payments, and updates account balances atomically.
+    This service verifies the webhook signature, ensures the user and account exist
+    and that the account belongs to the user, creates new payments, and updates
+    account balances atomically.
     """
 
     def __init__(self, uow):
         self.uow = uow
-        self.uow.set_repository("user", UserRepo)
-        self.uow.set_repository("account", AccountRepo)
-        self.uow.set_repository("payment", PaymentRepo)
+        repos = backend_for("payment")
+        self.uow.set_repository("user", repos["user"])
+        self.uow.set_repository("account", repos["account"])
+        self.uow.set_repository("payment", repos["payment"])
+        self.uow.set_repository("statement", AccountStatementRepo)
+        self.uow.set_repository("user_stats", UserStatsRepo)
+        self.uow.set_repository("outbox", OutboxRepo)
 
     async def process_webhook(self, data: dict):
         existing_payment = await self.uow.payment.exists_transaction(data["transaction_id"])
@@ -38,21 +46,35 @@ class PaymentService:
         if expected != data["signature"]:
             raise ValueError("invalid_signature")
 
-        user = await self.uow.user.get_by_id(data["user_id"])
-        if not user:
-            raise LookupError("user_not_found")
-
-
+        user_id = data["user_id"]
+        account_created = False
         account = await self.uow.account.get_account_for_update(data["account_id"])
         if not account:
-            account = await self.uow.account.create_or_update(
-                user_id=user.id,
+            # An existing account implies its owner exists (FK), so the user
+            # is only looked up when a new account has to be created. It is
+            # checked in the database every time, since any worker may have
+            # deleted it, and locked so a delete waits for this payment.
+            if not await self.uow.user.lock_active(user_id):
+                await self.uow.rollback()
+                raise LookupError("user_not_found")
+            account, account_created = await self.uow.account.create_or_update(
+                user_id=user_id,
                 account_id=data["account_id"]
             )
 
+        if account.deleted_at is not None:
+            # The owner is being purged.
+            await self.uow.rollback()
+            raise LookupError("user_not_found")
+
+        # Ownership is decided on the locked row only.
+        if account.user_id != user_id:
+            await self.uow.rollback()
+            raise PermissionError("account_owner_mismatch")
+
         payment = await self.uow.payment.create_if_not_exists(
             transaction_id=data["transaction_id"],
-            user_id=user.id,
+            user_id=user_id,
             account_id=account.id,
             amount=data["amount"],
         )
@@ -61,7 +83,33 @@ class PaymentService:
             await self.uow.rollback()
             return {"message": "duplicate transaction"}, 200
 
-        account.balance = (account.balance or Decimal("0")) + Decimal(str(data["amount"]))
+        balance = (account.balance or Decimal("0")) + Decimal(str(data["amount"]))
+        await self.uow.account.update_balance(account, balance)
+        await self.uow.account.notify_balance_change(
+            BALANCE_CHANNEL, user_id, account.id, balance
+        )
+        await self.uow.statement.add_payment(
+            account_id=account.id,
+            day=payment_day(payment.created_at),
+            amount=payment.amount,
+        )
+        await self.uow.user_stats.apply(
+            user_id=user_id,
+            accounts=1 if account_created else 0,
+            balance=payment.amount,
+            payments=1,
+            last_payment_at=payment.created_at,
+        )
+        if settings.OUTBOX_ENABLED:
+            await self.uow.outbox.add("payment.created", {
+                "payment_id": payment.id,
+                "transaction_id": payment.transaction_id,
+                "user_id": user_id,
+                "account_id": account.id,
+                "amount": str(payment.amount),
+                "balance": str(balance),
+                "created_at": payment.created_at.isoformat(),
+            })
         await self.uow.commit()
 
         return PaymentOut.model_validate({
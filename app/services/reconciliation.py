@@ -0,0 +1,115 @@
+import asyncio
+import time
+from decimal import Decimal
+
+from repositories.account import AccountRepo
+from repositories.reconciliation import ReconciliationRepo
+from repositories.user_stats import UserStatsRepo
+from utils.events import BALANCE_CHANNEL
+
+
+class ReconciliationService:
+    """
+    Service verifying that every account balance equals the sum of its
+    payments, optionally repairing the accounts that do not.
+    """
+
+    def __init__(self, uow):
+        self.uow = uow
+        self.uow.set_repository("account", AccountRepo)
+        self.uow.set_repository("reconciliation", ReconciliationRepo)
+        self.uow.set_repository("user_stats", UserStatsRepo)
+
+    async def repair(self, account_id: int) -> str:
+        """
+        Sets an account's balance to the sum of its payments and adjusts the
+        owner's total balance in user_stats by the same delta.
+
+        The account is locked first and the sum is read afterwards, so a
+        payment committed while we waited is included. Accounts locked by a
+        webhook are skipped rather than waited for.
+
+        Returns:
+            str: "repaired", "consistent" (fixed meanwhile) or "busy".
+        """
+        account = await self.uow.reconciliation.lock_account(account_id)
+        if account is None:
+            await self.uow.rollback()
+            return "busy"
+        expected = await self.uow.reconciliation.payments_total(account_id)
+        delta = expected - account.balance
+        if not delta:
+            await self.uow.rollback()
+            return "consistent"
+        await self.uow.account.update_balance(account, expected)
+        await self.uow.user_stats.apply(user_id=account.user_id, balance=delta)
+        await self.uow.account.notify_balance_change(
+            BALANCE_CHANNEL, account.user_id, account.id, expected
+        )
+        await self.uow.commit()
+        return "repaired"
+
+    async def run(
+        self,
+        chunk_size: int = 1000,
+        repair: bool = False,
+        duty_cycle: float = 0.5,
+        report=None,
+        progress=None,
+    ) -> dict:
+        """
+        Scans all accounts in ID order and reports balance mismatches.
+
+        Each chunk is one grouped query in its own short transaction. After
+        every chunk the scan sleeps long enough to stay busy at most
+        `duty_cycle` of the wall time, which keeps its load on the primary
+        bounded.
+
+        Args:
+            chunk_size (int): Number of accounts per chunk.
+            repair (bool): Whether to repair mismatching accounts.
+            duty_cycle (float): Fraction of time spent querying, in (0, 1].
+            report (callable | None): Called with a dict per mismatch.
+            progress (callable | None): Called with (last_account_id, scanned)
+                                        after each chunk.
+
+        Returns:
+            dict: Totals of scanned, mismatched, repaired and busy accounts.
+        """
+        totals = {"scanned": 0, "mismatched": 0, "repaired": 0, "busy": 0}
+        after_id = 0
+        while True:
+            started = time.perf_counter()
+            rows = await self.uow.reconciliation.balances_chunk(after_id, chunk_size)
+            await self.uow.rollback()
+            if not rows:
+                break
+            after_id = rows[-1].id
+            totals["scanned"] += len(rows)
+
+            for row in rows:
+                expected = Decimal(row.expected)
+                if row.balance == expected:
+                    continue
+                totals["mismatched"] += 1
+                entry = {
+                    "account_id": row.id,
+                    "user_id": row.user_id,
+                    "balance": str(row.balance),
+                    "expected": str(expected),
+                    "difference": str(row.balance - expected),
+                }
+                if repair:
+                    entry["result"] = await self.repair(row.id)
+                    if entry["result"] in ("repaired", "busy"):
+                        totals[entry["result"]] += 1
+                if report:
+                    report(entry)
+
+            if progress:
+                progress(after_id, totals["scanned"])
+            if len(rows) < chunk_size:
+                break
+            elapsed = time.perf_counter() - started
+            await asyncio.sleep(elapsed * (1 / duty_cycle - 1))
+        return totals
@@ -0,0 +1,85 @@
+from datetime import date, timezone
+
+from sanic.exceptions import InvalidUsage
+
+from repositories.account import AccountRepo
+from repositories.statement import AccountStatementRepo
+from schemas.account import StatementEntryOut
+
+STATEMENT_BUCKETS = ("day", "month")
+
+
+def _parse_day(value: str | None, name: str) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise InvalidUsage(f"'{name}' must be a date in YYYY-MM-DD format")
+
+
+def payment_day(created_at) -> date:
+    """Returns the UTC day a payment is rolled up under."""
+    return created_at.astimezone(timezone.utc).date()
+
+
+class StatementService:
+    """
+    Service producing aggregated account statements from the daily rollup.
+    """
+
+    def __init__(self, uow):
+        self.uow = uow
+        self.uow.set_repository("account", AccountRepo)
+        self.uow.set_repository("statement", AccountStatementRepo)
+
+    async def get_statement(
+        self,
+        account_id: int,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        bucket: str | None = None,
+        user_id: int | None = None,
+    ) -> list[StatementEntryOut] | None:
+        """
+        Build a statement of payment totals for an account.
+
+        Args:
+            account_id (int): ID of the account.
+            date_from (str | None): First day to include (YYYY-MM-DD).
+            date_to (str | None): Last day to include (YYYY-MM-DD).
+            bucket (str | None): "day" or "month". Defaults to "day".
+            user_id (int | None): If given, the account must belong to this user.
+
+        Raises:
+            InvalidUsage: If the dates or the bucket are malformed.
+
+        Returns:
+            list[StatementEntryOut] | None: One entry per period with payments,
+                                            or None if the account is not found.
+        """
+        bucket = bucket or "day"
+        if bucket not in STATEMENT_BUCKETS:
+            raise InvalidUsage(f"'bucket' must be one of {', '.join(STATEMENT_BUCKETS)}")
+        start = _parse_day(date_from, "from")
+        end = _parse_day(date_to, "to")
+        if start and end and start > end:
+            raise InvalidUsage("'from' must not be after 'to'")
+
+        account = await self.uow.account.get(account_id)
+        if not account or (user_id is not None and account.user_id != user_id):
+            return None
+
+        rows = await self.uow.statement.list_buckets(account_id, start, end, bucket)
+        return [
+            StatementEntryOut.model_validate(
+                {
+                    "period": r.period.isoformat(),
+                    "count": int(r.payments_count),
+                    "total": float(r.total_amount),
+                    "min": float(r.min_amount),
+                    "max": float(r.max_amount),
+                }
+            )
+            for r in rows
+        ]
@@ -1,22 +1,29 @@
-from repositories.user import UserRepo
-from repositories.account import AccountRepo
-from repositories.payment import PaymentRepo
+from repositories import backend_for
 from schemas.user import UserOut
 from schemas.account import AccountOutWithUserId
 from schemas.payment import PaymentOut
+from utils.etag import make_etag
+from utils.singleflight import SingleFlight
+
+# Concurrent identical reads (same method and user) share one DB call.
+user_reads = SingleFlight("user_reads")
 
 
 class UserService:
     """
     Service for managing user-related operations, including retrieving user info,
     accounts, and payments for the authenticated user.
+
+    Reads are coalesced per (method, user_id): concurrent identical requests,
+    e.g. the same user on several devices, share one in-flight query.
     """
 
     def __init__(self, uow):
         self.uow = uow
-        self.uow.set_repository("user", UserRepo)
-        self.uow.set_repository("account", AccountRepo)
-        self.uow.set_repository("payment", PaymentRepo)
+        repos = backend_for("user")
+        self.uow.set_repository("user", repos["user"])
+        self.uow.set_repository("account", repos["account"])
+        self.uow.set_repository("payment", repos["payment"])
 
     async def get_me(self, user_id: int) -> UserOut:
         """
@@ -28,6 +35,9 @@ class UserService:
         Returns:
             UserOut: Pydantic schema containing user's ID, email, and full name.
         """
+        return await user_reads.do(("get_me", user_id), lambda: self._get_me(user_id))
+
+    async def _get_me(self, user_id: int) -> UserOut:
         user = await self.uow.user.get_by_id(user_id)
         return UserOut.model_validate(
             {"id": user.id, "email": user.email, "full_name": user.full_name}
@@ -43,6 +53,11 @@ class UserService:
         Returns:
             list[AccountOutWithUserId]: List of Pydantic schemas with account ID, user ID, and balance.
         """
+        return await user_reads.do(
+            ("get_my_accounts", user_id), lambda: self._get_my_accounts(user_id)
+        )
+
+    async def _get_my_accounts(self, user_id: int) -> list[AccountOutWithUserId]:
         accounts = await self.uow.account.list_by_user(user_id)
         return [
             AccountOutWithUserId.model_validate(
@@ -63,6 +78,11 @@ class UserService:
                               including payment ID, transaction ID, user ID, account ID,
                               and amount.
         """
+        return await user_reads.do(
+            ("get_my_payments", user_id), lambda: self._get_my_payments(user_id)
+        )
+
+    async def _get_my_payments(self, user_id: int) -> list[PaymentOut]:
         payments = await self.uow.payment.list_by_user(user_id)
         return [
             PaymentOut.model_validate(
@@ -76,3 +96,37 @@ class UserService:
             )
             for p in payments
         ]
+
+    async def get_accounts_etag(self, user_id: int) -> str:
+        """
+        Compute the ETag of the authenticated user's account list without
+        loading the accounts.
+
+        Args:
+            user_id (int): ID of the authenticated user.
+
+        Returns:
+            str: Weak ETag derived from the account count, IDs and versions.
+        """
+        count, ids, versions = await user_reads.do(
+            ("accounts_version", user_id),
+            lambda: self.uow.account.version_for_user(user_id),
+        )
+        return make_etag("a", user_id, count, ids, versions)
+
+    async def get_payments_etag(self, user_id: int) -> str:
+        """
+        Compute the ETag of the authenticated user's payment list without
+        loading the payments.
+
+        Args:
+            user_id (int): ID of the authenticated user.
+
+        Returns:
+            str: Weak ETag derived from the payment count and largest payment ID.
+        """
+        count, max_id = await user_reads.do(
+            ("payments_version", user_id),
+            lambda: self.uow.payment.version_for_user(user_id),
+        )
+        return make_etag("p", user_id, count, max_id or 0)
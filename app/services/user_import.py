@@ -0,0 +1,199 @@
+import asyncio
+import csv
+import json
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+from sanic.exceptions import InvalidUsage
+
+from config import settings
+from repositories.user import UserRepo
+from schemas.user import UserImportRow
+from utils.executors import get_process_pool, process_pool_size
+from utils.security import hash_passwords
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def _decode(line: bytes, line_no: int) -> str:
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        raise InvalidUsage(f"line {line_no} is not valid UTF-8")
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks into decoded lines.
+
+    Raises:
+        InvalidUsage: If a line is not valid UTF-8, with its 1-based number.
+    """
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield _decode(line, line_no)
+    if buffer:
+        yield _decode(buffer, line_no + 1)
+
+
+async def _iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[str]:
+    """
+    Yield the non-empty records of the stream. A CSV record continues on the
+    next line while a quoted field is open, so fields may contain newlines.
+    """
+    pending = []
+    async for line in _iter_lines(chunks):
+        if not pending and not line.strip():
+            continue
+        pending.append(line)
+        if fmt == "csv" and sum(part.count('"') for part in pending) % 2:
+            continue
+        yield "\n".join(pending)
+        pending = []
+    if pending:
+        yield "\n".join(pending)
+
+
+async def _iter_rows(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple]:
+    """
+    Yield (row_no, raw_row, error) for every non-empty record of the stream.
+    Row numbers are 1-based data rows (the CSV header is not counted).
+    """
+    header = None
+    row_no = 0
+    async for record in _iter_records(chunks, fmt):
+        if fmt == "csv" and header is None:
+            header = next(csv.reader([record]))
+            continue
+        row_no += 1
+        try:
+            if fmt == "csv":
+                row = dict(zip(header, next(csv.reader([record]))))
+            else:
+                row = json.loads(record)
+                if not isinstance(row, dict):
+                    raise ValueError("expected a JSON object")
+        except (ValueError, csv.Error) as e:
+            yield row_no, None, str(e)
+            continue
+        yield row_no, row, None
+
+
+def _normalize(row: dict) -> dict:
+    if row.get("full_name") == "":
+        row["full_name"] = None
+    if row.get("is_admin") == "":
+        row.pop("is_admin")
+    return row
+
+
+class UserImportService:
+    """
+    Service for bulk user import and export.
+
+    Imported rows are validated and their passwords hashed in a process pool
+    while no connection is held; each batch is then loaded with COPY into a
+    staging table, merged into users in a single statement and committed.
+    Export streams the users table with COPY TO STDOUT.
+    """
+
+    def __init__(self, uow):
+        self.uow = uow
+        self.uow.set_repository("user", UserRepo)
+
+    async def import_users(self, chunks: AsyncIterator[bytes], fmt: str) -> dict:
+        """
+        Import users from a CSV (with header) or NDJSON stream.
+
+        Every IMPORT_BATCH_SIZE valid rows are committed on their own, so an
+        upload that fails midway keeps its earlier batches; importing the
+        file again reports those rows as conflicts.
+
+        Args:
+            chunks (AsyncIterator[bytes]): Request body chunks.
+            fmt (str): "csv" or "ndjson".
+
+        Raises:
+            InvalidUsage: If the format is not supported, or a line is not
+                          valid UTF-8 (rows before it may be imported).
+
+        Returns:
+            dict: {"created": int, "conflicts": [...], "errors": [...]}, where
+                  conflicts and errors reference 1-based data row numbers.
+        """
+        if fmt not in IMPORT_FORMATS:
+            raise InvalidUsage(f"format must be one of {', '.join(IMPORT_FORMATS)}")
+
+        created = 0
+        conflicts = []
+        errors = []
+        batch: list[tuple[int, UserImportRow]] = []
+        try:
+            async for row_no, raw, error in _iter_rows(chunks, fmt):
+                if error is None:
+                    try:
+                        batch.append(
+                            (row_no, UserImportRow.model_validate(_normalize(raw)))
+                        )
+                    except ValidationError as e:
+                        error = "; ".join(
+                            f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                            for err in e.errors()
+                        )
+                if error is not None:
+                    errors.append({"row": row_no, "error": error})
+                if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                    created += await self._import_batch(batch, conflicts)
+                    batch = []
+        except InvalidUsage as e:
+            if created:
+                raise InvalidUsage(f"{e}; {created} users before it were imported")
+            raise
+        if batch:
+            created += await self._import_batch(batch, conflicts)
+        return {"created": created, "conflicts": conflicts, "errors": errors}
+
+    async def _import_batch(
+        self, batch: list[tuple[int, UserImportRow]], conflicts: list[dict]
+    ) -> int:
+        """Stages, merges and commits one batch; returns the users created."""
+        hashes = await self._hash_parallel([row.password for _, row in batch])
+        await self.uow.user.create_import_staging()
+        await self.uow.user.copy_to_import_staging(
+            [
+                (row_no, row.email, row.full_name, pwd_hash, row.is_admin)
+                for (row_no, row), pwd_hash in zip(batch, hashes)
+            ]
+        )
+        rejected = await self.uow.user.merge_import_staging()
+        await self.uow.commit()
+        conflicts.extend(
+            {"row": row_no, "email": email, "error": "email already exists"}
+            for row_no, email in rejected
+        )
+        return len(batch) - len(rejected)
+
+    @staticmethod
+    async def _hash_parallel(passwords: list[str]) -> list[str]:
+        loop = asyncio.get_running_loop()
+        pool = get_process_pool()
+        size = -(-len(passwords) // process_pool_size())
+        parts = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+        results = await asyncio.gather(
+            *(loop.run_in_executor(pool, hash_passwords, part) for part in parts)
+        )
+        return [h for part in results for h in part]
+
+    async def export_users(self, output) -> None:
+        """
+        Stream all users as CSV.
+
+        Args:
+            output (callable): Async callable receiving each chunk of bytes.
+        """
+        await self.uow.user.copy_out_csv(output)
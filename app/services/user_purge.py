@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from sanic.log import logger
+
+from config import settings
+from db import async_session_maker
+from repositories.user import UserRepo
+from repositories.user_purge import UserPurgeRepo
+from uow import UnitOfWork
+
+
+class UserPurgeService:
+    """
+    Service deleting soft-deleted users in the background: their payments
+    are removed in throttled chunks, each committed on its own, and the
+    user row (with accounts and rollups, via ON DELETE CASCADE) last.
+    """
+
+    def __init__(self, uow):
+        self.uow = uow
+        self.uow.set_repository("user", UserRepo)
+        self.uow.set_repository("user_purge", UserPurgeRepo)
+
+    async def status(self, user_id: int) -> dict | None:
+        """
+        Report the progress of a user's purge.
+
+        Returns:
+            dict | None: Status and deleted/expected payment counts, or None if
+                         the user was never purged.
+        """
+        purge = await self.uow.user_purge.get(user_id)
+        if purge is None:
+            return None
+        return {
+            "user_id": purge.user_id,
+            "status": purge.status,
+            "payments_deleted": purge.payments_deleted,
+            "payments_total": purge.payments_total,
+            "created_at": purge.created_at.isoformat(),
+            "finished_at": purge.finished_at.isoformat() if purge.finished_at else None,
+        }
+
+    async def purge_next(
+        self, chunk_size: int, duty_cycle: float = 0.5, progress=None
+    ) -> int | None:
+        """
+        Claim one pending purge and run it to completion.
+
+        After every chunk the purge sleeps long enough to stay busy at most
+        `duty_cycle` of the wall time, so webhooks keep their latency.
+
+        Args:
+            chunk_size (int): Payments deleted per transaction.
+            duty_cycle (float): Fraction of time spent deleting, in (0, 1].
+            progress (callable | None): Called with (user_id, deleted, total)
+                                        after each chunk.
+
+        Returns:
+            int | None: The ID of the purged user, or None if nothing was pending.
+        """
+        purge = await self.uow.user_purge.claim(settings.PURGE_LEASE_SECONDS)
+        await self.uow.commit()
+        if purge is None:
+            return None
+        user_id, deleted = purge.user_id, purge.payments_deleted
+
+        while True:
+            started = time.perf_counter()
+            count = await self.uow.user_purge.delete_payments_chunk(user_id, chunk_size)
+            await self.uow.user_purge.record_progress(user_id, count)
+            await self.uow.commit()
+            deleted += count
+            if progress:
+                progress(user_id, deleted, purge.payments_total)
+            if count < chunk_size:
+                break
+            elapsed = time.perf_counter() - started
+            await asyncio.sleep(elapsed * (1 / duty_cycle - 1))
+
+        await self.uow.user.delete_by_id(user_id)
+        await self.uow.user_purge.finish(user_id)
+        await self.uow.commit()
+        return user_id
+
+
+async def run_user_purges(app) -> None:
+    """Background task running queued purges one at a time."""
+    while True:
+        purged = None
+        try:
+            async with UnitOfWork(async_session_maker) as uow:
+                purged = await UserPurgeService(uow).purge_next(
+                    settings.PURGE_CHUNK_SIZE, settings.PURGE_DUTY_CYCLE
+                )
+            if purged is not None:
+                logger.info("Purged user %d", purged)
+        except Exception:
+            logger.exception("User purge failed")
+        if purged is None:
+            await asyncio.sleep(settings.PURGE_POLL_INTERVAL)
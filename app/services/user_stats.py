@@ -0,0 +1,135 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from sanic.exceptions import InvalidUsage
+
+from repositories.user_stats import UserStatsRepo, SORT_COLUMNS
+from schemas.user import UserStatsOut, UserStatsPageOut
+
+MAX_PAGE_SIZE = 500
+
+_CURSOR_PARSERS = {
+    "accounts_count": int,
+    "total_balance": Decimal,
+    "payments_count": int,
+    "last_payment_at": datetime.fromisoformat,
+}
+
+
+def _encode_cursor(value, user_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+    raw = json.dumps([value, user_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str, sort: str) -> tuple:
+    try:
+        value, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if value is not None:
+            value = _CURSOR_PARSERS[sort](value)
+        return value, int(user_id)
+    except (ValueError, TypeError, InvalidOperation):
+        raise InvalidUsage("invalid cursor")
+
+
+class UserStatsService:
+    """
+    Service for the per-user dashboard rollup: paging and rebuilding.
+    """
+
+    def __init__(self, uow):
+        self.uow = uow
+        self.uow.set_repository("user_stats", UserStatsRepo)
+
+    async def page(
+        self,
+        sort: str | None = None,
+        order: str | None = None,
+        limit: int | str = 50,
+        cursor: str | None = None,
+    ) -> UserStatsPageOut:
+        """
+        Retrieve one page of user stats sorted by a stat.
+
+        Args:
+            sort (str | None): Stat to sort by. Defaults to "payments_count".
+            order (str | None): "asc" or "desc". Defaults to "desc".
+            limit (int | str): Page size, capped at MAX_PAGE_SIZE.
+            cursor (str | None): Opaque cursor returned with the previous page.
+
+        Raises:
+            InvalidUsage: If the sort, order, limit or cursor is invalid.
+
+        Returns:
+            UserStatsPageOut: Page items and the cursor of the next page, if any.
+        """
+        sort = sort or "payments_count"
+        order = order or "desc"
+        if sort not in SORT_COLUMNS:
+            raise InvalidUsage(f"'sort' must be one of {', '.join(SORT_COLUMNS)}")
+        if order not in ("asc", "desc"):
+            raise InvalidUsage("'order' must be 'asc' or 'desc'")
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise InvalidUsage("'limit' must be an integer")
+        if limit < 1:
+            raise InvalidUsage("'limit' must be positive")
+        limit = min(limit, MAX_PAGE_SIZE)
+        after = _decode_cursor(cursor, sort) if cursor else None
+
+        rows = await self.uow.user_stats.page(sort, order == "desc", limit, after)
+        items = [
+            UserStatsOut.model_validate(
+                {
+                    "user_id": r.user_id,
+                    "accounts_count": r.accounts_count,
+                    "total_balance": float(r.total_balance),
+                    "payments_count": r.payments_count,
+                    "last_payment_at": (
+                        r.last_payment_at.isoformat() if r.last_payment_at else None
+                    ),
+                }
+            )
+            for r in rows
+        ]
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            next_cursor = _encode_cursor(getattr(last, sort), last.user_id)
+        return UserStatsPageOut(items=items, next_cursor=next_cursor)
+
+    async def rebuild(self, chunk_size: int = 10_000, progress=None) -> int:
+        """
+        Recompute all stats rows from the source tables in user ID chunks.
+
+        Each chunk is committed separately so a rebuild never holds locks on
+        the whole table. Updates of users in the chunk being rebuilt wait
+        for its commit instead of being overwritten by it.
+
+        Args:
+            chunk_size (int): Number of user IDs per chunk.
+            progress (callable | None): Called with (last_user_id, max_user_id)
+                                        after each chunk.
+
+        Returns:
+            int: Total number of stats rows written.
+        """
+        low, high = await self.uow.user_stats.user_id_bounds()
+        if low is None:
+            return 0
+        written = 0
+        start = low
+        while start <= high:
+            end = start + chunk_size - 1
+            written += await self.uow.user_stats.rebuild(start, end)
+            await self.uow.commit()
+            if progress:
+                progress(min(end, high), high)
+            start = end + 1
+        return written
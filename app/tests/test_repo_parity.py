@@ -0,0 +1,46 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+from commands.repo_parity import _cases, _normalize
+from repositories import BACKENDS
+
+
+def test_normalize_compares_rows_by_columns():
+    a = SimpleNamespace(id=1, email="a@x", extra="orm only")
+    b = SimpleNamespace(id=1, email="a@x")
+    assert _normalize(a, ("id", "email")) == _normalize(b, ("id", "email"))
+
+
+def test_normalize_ignores_list_order_and_keeps_scalars():
+    rows = [SimpleNamespace(id=2), SimpleNamespace(id=1)]
+    assert _normalize(rows, ("id",)) == [(1,), (2,)]
+    assert _normalize((SimpleNamespace(id=3), True), ("id",)) == ((3,), True)
+    assert _normalize(None, ("id",)) is None
+    assert _normalize(5, ("id",)) == 5
+
+
+def test_cases_cover_every_sampled_row():
+    users = [SimpleNamespace(id=1, email="a@x")]
+    accounts = [SimpleNamespace(id=10, user_id=1)]
+    payments = [
+        SimpleNamespace(
+            transaction_id="t1", user_id=1, account_id=10, amount=Decimal("5")
+        )
+    ]
+    cases = _cases(users, accounts, payments)
+    calls = {(repo, method, args) for repo, method, args, _ in cases}
+    assert ("user", "get_by_email", ("a@x",)) in calls
+    assert ("account", "get_account_for_update", (10,)) in calls
+    assert ("account", "create_or_update", (1, 10)) in calls
+    assert ("payment", "create_if_not_exists", ("t1", 1, 10, Decimal("5"))) in calls
+    assert ("user", "get_by_id", (-1,)) in calls
+    for repo, method, _, columns in cases:
+        assert repo in ("user", "account", "payment")
+        assert isinstance(columns, tuple)
+
+
+def test_cases_call_methods_of_both_backends():
+    cases = _cases([SimpleNamespace(id=1, email="a@x")], [], [])
+    for repo, method, _, _ in cases:
+        for backend in ("orm", "raw"):
+            assert callable(getattr(BACKENDS[backend][repo], method))
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+from commands.startup_report import (
+    DEFAULT_BUDGET_MS,
+    deferred_loaded,
+    import_time_ms,
+    measure_imports,
+)
+
+
+# Wall-clock timing depends on the machine and its load; opt in where the
+# runner is quiet enough for the budget to mean something.
+@pytest.mark.skipif(
+    not os.environ.get("CHECK_IMPORT_BUDGET"),
+    reason="set CHECK_IMPORT_BUDGET=1 to check the import time budget",
+)
+def test_main_imports_within_budget():
+    rows = measure_imports("main")
+    assert import_time_ms(rows, "main") <= DEFAULT_BUDGET_MS
+
+
+def test_main_does_not_import_deferred_packages():
+    assert deferred_loaded(measure_imports("main")) == []
@@ -0,0 +1,35 @@
+import asyncio
+
+from services.user_import import _iter_rows
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def _rows(data: bytes, fmt: str) -> list[tuple]:
+    async def collect():
+        return [row async for row in _iter_rows(_chunks(data), fmt)]
+
+    return asyncio.run(collect())
+
+
+def test_csv_quoted_fields_may_span_lines():
+    data = (
+        b'email,password,full_name\r\n'
+        b'a@x,"pa\r\nss","Smith, ""J"""\r\n'
+        b'\r\n'
+        b'b@x,p2,"two\n\nlines"\n'
+    )
+    assert _rows(data, "csv") == [
+        (1, {"email": "a@x", "password": "pa\nss", "full_name": 'Smith, "J"'}, None),
+        (2, {"email": "b@x", "password": "p2", "full_name": "two\n\nlines"}, None),
+    ]
+
+
+def test_ndjson_reports_non_objects():
+    assert _rows(b'{"email": "a@x"}\n\n[1]\n', "ndjson") == [
+        (1, {"email": "a@x"}, None),
+        (2, None, "expected a JSON object"),
+    ]
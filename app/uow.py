@@ -1,4 +1,31 @@
+import asyncio
+import traceback
+
+from sanic.log import logger
+
+from config import settings
 from db import async_session_maker
+from utils import metrics
+
+
+class SessionStats:
+    def __init__(self):
+        self.opened = 0
+        self.open = 0
+        self.cancelled = 0
+        self.leaked = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "opened": self.opened,
+            "open": self.open,
+            "cancelled": self.cancelled,
+            "leaked": self.leaked,
+        }
+
+
+stats = SessionStats()
+metrics.register("sessions", stats.snapshot)
 
 
 class IUnitOfWork:
@@ -20,26 +47,98 @@ class UnitOfWork(IUnitOfWork):
         self.session_factory = session_factory
         self.repositories = {}
         self.session = None
+        self.active = False
+        self._opened_by = None
+        self._task = None
+        self._watching = False
+
+    def watch(self, task: asyncio.Task) -> None:
+        """
+        Calls release() when `task` finishes while a session is still open,
+        e.g. the connection task of a request whose handler was cancelled.
+        The callback is removed as soon as the unit of work is closed or
+        released, so a long-lived task does not accumulate them.
+        """
+        self._task = task
+        self._attach()
+
+    def _attach(self) -> None:
+        if self._task is not None and not self._watching:
+            self._task.add_done_callback(self._release_on_done)
+            self._watching = True
+
+    def _detach(self) -> None:
+        if self._watching:
+            self._task.remove_done_callback(self._release_on_done)
+            self._watching = False
+
+    def _release_on_done(self, _task) -> None:
+        self._watching = False
+        self.release()
 
     async def __aenter__(self):
         """
         Creates a new database session and starts the unit of work.
         Returns the UnitOfWork instance to be used within the 'async with' block.
         """
+        self._attach()
         self.session = self.session_factory()
+        self.active = True
+        stats.opened += 1
+        stats.open += 1
+        if settings.DB_LEAK_DEBUG:
+            self._opened_by = traceback.extract_stack()[:-1]
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
         """
-        Commits or rolls back the transaction depending on the outcome of the operations.
-        If an exception occurred, the transaction is rolled back, otherwise, it's committed.
-        Closes the session when done.
+        Commits the transaction if the block succeeded. The session is closed
+        in every case, which rolls back anything uncommitted and returns the
+        connection to the pool, even if the commit fails or the task is
+        cancelled (e.g. the client disconnected).
+        """
+        try:
+            if exc_type is None:
+                await self.commit()
+            elif issubclass(exc_type, asyncio.CancelledError):
+                stats.cancelled += 1
+        finally:
+            self.active = False
+            await self.close()
+
+    async def close(self):
+        """
+        Closes the session and returns its connection to the pool. Safe to
+        call several times. The close is shielded from cancellation so the
+        connection is released even if the calling task is cancelled.
+        """
+        self._detach()
+        session, self.session = self.session, None
+        if session is None:
+            return
+        stats.open -= 1
+        self._opened_by = None
+        await asyncio.shield(session.close())
+
+    def release(self) -> None:
+        """
+        Last-resort cleanup for a unit of work that was never closed, e.g.
+        because its task was cancelled before reaching __aexit__. Logs it as a
+        leak, with the stack that opened it when DB_LEAK_DEBUG is set, and
+        schedules the close.
         """
-        if exc_type:
-            await self.session.rollback()
+        self._detach()
+        if self.session is None:
+            return
+        stats.leaked += 1
+        if self._opened_by is not None:
+            logger.warning(
+                "Unit of work was not closed; opened at:\n%s",
+                "".join(traceback.format_list(self._opened_by)),
+            )
         else:
-            await self.commit()
-        await self.session.close()
+            logger.warning("Unit of work was not closed (set DB_LEAK_DEBUG for the stack)")
+        asyncio.get_running_loop().create_task(self.close())
 
     async def commit(self):
         """
@@ -0,0 +1,188 @@
+import asyncio
+import gzip
+import json
+import time
+
+from sanic.request import Request
+from sanic.response import HTTPResponse
+
+from config import settings
+from utils import metrics
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+# Compression levels per profile for each codec.
+PROFILES = {
+    "fast": {"zstd": 1, "br": 1, "gzip": 1},
+    "default": {"zstd": 3, "br": 5, "gzip": 6},
+    "max": {"zstd": 12, "br": 9, "gzip": 9},
+}
+
+# Profile per route prefix; large, rarely changing listings get more effort.
+ROUTE_PROFILES = (
+    ("/me/payments", "default"),
+    ("/admin/users", "max"),
+)
+DEFAULT_PROFILE = "fast"
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def _zstd(body: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+def _br(body: bytes, level: int) -> bytes:
+    return brotli.compress(body, quality=level)
+
+
+def _gzip(body: bytes, level: int) -> bytes:
+    return gzip.compress(body, compresslevel=level)
+
+
+# Server preference order; codecs whose module is missing are skipped.
+CODECS = tuple(
+    (name, func)
+    for name, func, available in (
+        ("zstd", _zstd, zstandard is not None),
+        ("br", _br, brotli is not None),
+        ("gzip", _gzip, True),
+    )
+    if available
+)
+
+
+def _parse_accept(header: str | None) -> dict[str, float]:
+    accepted = {}
+    for item in (header or "").split(","):
+        name, *params = item.strip().split(";")
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            param = param.strip()
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def negotiate_encoding(header: str | None) -> tuple | None:
+    """Picks the preferred available codec accepted by the client."""
+    accepted = _parse_accept(header)
+    wildcard = accepted.get("*", 0.0)
+    for name, func in CODECS:
+        if accepted.get(name, wildcard) > 0:
+            return name, func
+    return None
+
+
+def wants_msgpack(request: Request) -> bool:
+    if msgpack is None:
+        return False
+    accepted = _parse_accept(request.headers.get("Accept"))
+    return any(accepted.get(t, 0) > 0 for t in MSGPACK_TYPES)
+
+
+def route_profile(path: str) -> str:
+    for prefix, profile in ROUTE_PROFILES:
+        if path.startswith(prefix):
+            return profile
+    return DEFAULT_PROFILE
+
+
+class CompressionStats:
+    def __init__(self):
+        self.codecs: dict[str, dict[str, float]] = {}
+        self.msgpack = 0
+
+    def record(self, codec: str, size_in: int, size_out: int, seconds: float, offloaded: bool):
+        c = self.codecs.setdefault(
+            codec,
+            {"responses": 0, "bytes_in": 0, "bytes_out": 0, "time_ms": 0.0, "offloaded": 0},
+        )
+        c["responses"] += 1
+        c["bytes_in"] += size_in
+        c["bytes_out"] += size_out
+        c["time_ms"] += seconds * 1000
+        c["offloaded"] += offloaded
+
+    def snapshot(self) -> dict:
+        return {
+            "msgpack_responses": self.msgpack,
+            "codecs": {
+                name: {
+                    **c,
+                    "time_ms": round(c["time_ms"], 2),
+                    "ratio": round(c["bytes_out"] / c["bytes_in"], 4) if c["bytes_in"] else None,
+                }
+                for name, c in self.codecs.items()
+            },
+        }
+
+
+stats = CompressionStats()
+metrics.register("compression", stats.snapshot)
+
+
+def _add_vary(resp: HTTPResponse, value: str) -> None:
+    vary = resp.headers.get("Vary")
+    resp.headers["Vary"] = f"{vary}, {value}" if vary else value
+
+
+async def encode_response(request: Request, resp: HTTPResponse) -> None:
+    """
+    Converts JSON bodies to MessagePack when the client asks for it, then
+    compresses bodies above COMPRESSION_MIN_SIZE with the best codec the
+    client accepts. Bodies above COMPRESSION_OFFLOAD_SIZE are compressed in
+    a worker thread to keep the event loop free.
+    """
+    body = resp.body
+    if not body or resp.status in (204, 304) or "Content-Encoding" in resp.headers:
+        return
+
+    if (resp.content_type or "").startswith("application/json"):
+        _add_vary(resp, "Accept")
+        if wants_msgpack(request):
+            body = msgpack.packb(json.loads(body))
+            resp.body = body
+            resp.content_type = "application/msgpack"
+            stats.msgpack += 1
+
+    if len(body) < settings.COMPRESSION_MIN_SIZE:
+        return
+    _add_vary(resp, "Accept-Encoding")
+    codec = negotiate_encoding(request.headers.get("Accept-Encoding"))
+    if codec is None:
+        return
+    name, func = codec
+    level = PROFILES[route_profile(request.path)][name]
+
+    offload = len(body) >= settings.COMPRESSION_OFFLOAD_SIZE
+    started = time.perf_counter()
+    if offload:
+        compressed = await asyncio.get_running_loop().run_in_executor(
+            None, func, body, level
+        )
+    else:
+        compressed = func(body, level)
+    stats.record(name, len(body), len(compressed), time.perf_counter() - started, offload)
+
+    resp.body = compressed
+    resp.headers["Content-Encoding"] = name
@@ -0,0 +1,26 @@
+from sanic import response
+from sanic.request import Request
+from sanic.response import HTTPResponse
+
+
+def make_etag(*parts) -> str:
+    """Builds a weak ETag from version components."""
+    return 'W/"' + "-".join(str(p) for p in parts) + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Checks the If-None-Match header of a request against an ETag, using
+    weak comparison.
+    """
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    weak = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == weak for tag in header.split(","))
+
+
+def not_modified(etag: str) -> HTTPResponse:
+    return response.empty(status=304, headers={"ETag": etag})
@@ -0,0 +1,154 @@
+import asyncio
+import json
+
+import asyncpg
+from sanic.log import logger
+
+from config import settings
+from db import asyncpg_dsn
+from utils import metrics
+
+BALANCE_CHANNEL = "balance_changes"
+
+
+class Subscription:
+    """
+    One SSE client. Pending events are kept per account and overwritten by
+    newer ones, so a slow consumer only ever skips intermediate balances and
+    its memory stays bounded by its number of accounts.
+    """
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self._pending: dict[int, dict] = {}
+        self._ready = asyncio.Event()
+        self.coalesced = 0
+
+    def push(self, event: dict) -> None:
+        if event["account_id"] in self._pending:
+            self.coalesced += 1
+        self._pending[event["account_id"]] = event
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> list[dict]:
+        """Waits up to `timeout` seconds and returns the pending events."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        events, self._pending = list(self._pending.values()), {}
+        return events
+
+
+class BalanceHub:
+    """Per-worker fan-out of balance change events to SSE subscribers."""
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self.connections = 0
+        self.rejected = 0
+        self.published = 0
+        self.dropped_slow = 0
+
+    def subscribe(self, user_id: int) -> Subscription | None:
+        """Registers a subscriber, or returns None if the cap is reached."""
+        if self.connections >= self.max_connections:
+            self.rejected += 1
+            return None
+        sub = Subscription(user_id)
+        self._subscribers.setdefault(user_id, set()).add(sub)
+        self.connections += 1
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subscribers.get(sub.user_id)
+        if subs is None or sub not in subs:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._subscribers[sub.user_id]
+        self.connections -= 1
+
+    def publish(self, event: dict) -> None:
+        for sub in self._subscribers.get(event["user_id"], ()):
+            sub.push(event)
+            self.published += 1
+
+    def on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            self.publish(json.loads(payload))
+        except (ValueError, KeyError):
+            logger.warning("Malformed %s notification: %r", channel, payload)
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "users": len(self._subscribers),
+            "rejected": self.rejected,
+            "published": self.published,
+            "dropped_slow": self.dropped_slow,
+        }
+
+
+_hub: BalanceHub | None = None
+
+
+def get_balance_hub() -> BalanceHub:
+    """Returns the worker's hub, creating it on first use."""
+    global _hub
+    if _hub is None:
+        _hub = BalanceHub(settings.SSE_MAX_CONNECTIONS)
+        metrics.register("balance_events", _hub.stats)
+    return _hub
+
+
+def format_event(event: dict) -> str:
+    return f"event: balance\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_balance_events(sub: Subscription, send) -> None:
+    """
+    Writes a subscriber's events to an SSE stream until the client goes
+    away or stops reading. Sends a comment line as heartbeat when idle.
+
+    Args:
+        sub (Subscription): The subscriber.
+        send (callable): Async callable writing a str chunk to the client.
+    """
+    await send(": connected\n\n")
+    while True:
+        events = await sub.next_batch(settings.SSE_HEARTBEAT_INTERVAL)
+        chunk = "".join(format_event(e) for e in events) if events else ": ping\n\n"
+        try:
+            await asyncio.wait_for(send(chunk), settings.SSE_SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            get_balance_hub().dropped_slow += 1
+            return
+
+
+async def listen_balance_changes(app) -> None:
+    """
+    Background task holding a dedicated LISTEN connection and forwarding
+    notifications emitted by webhook transactions (on any worker) to this
+    worker's hub. Reconnects when the connection drops.
+    """
+    hub = get_balance_hub()
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(asyncpg_dsn())
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda _: closed.set())
+            await conn.add_listener(BALANCE_CHANNEL, hub.on_notify)
+            await closed.wait()
+            logger.warning("LISTEN connection lost, reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("LISTEN connection failed")
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(1)
@@ -0,0 +1,29 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from config import settings
+
+_process_pool: ProcessPoolExecutor | None = None
+
+
+def process_pool_size() -> int:
+    return settings.HASH_WORKERS or os.cpu_count() or 1
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Returns the worker's process pool for CPU-bound work such as password
+    hashing, creating it on first use.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=process_pool_size())
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Stops the process pool if it was started."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
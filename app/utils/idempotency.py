@@ -0,0 +1,292 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from sanic import response
+from sanic.log import logger
+from sanic.request import Request
+from sanic.response import HTTPResponse
+
+from config import settings
+from db import async_session_maker
+from repositories.idempotency import IdempotencyRepo
+from uow import UnitOfWork
+from utils import metrics
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+class StoredResponse:
+    """
+    A stored response, or a claim (status None) held by the worker that is
+    still processing the request.
+    """
+
+    __slots__ = ("status", "content_type", "body", "request_hash", "expires_at")
+
+    def __init__(
+        self,
+        status: int | None,
+        content_type: str | None,
+        body: bytes | None,
+        request_hash: str,
+        expires_at: float,
+    ):
+        self.status = status
+        self.content_type = content_type
+        self.body = body
+        self.request_hash = request_hash
+        self.expires_at = expires_at
+
+    @property
+    def pending(self) -> bool:
+        return self.status is None
+
+    def matches(self, request_hash: str) -> bool:
+        return self.request_hash == request_hash
+
+    def to_response(self) -> HTTPResponse:
+        return HTTPResponse(
+            body=self.body,
+            status=self.status,
+            content_type=self.content_type,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+
+class IdempotencyStore:
+    """
+    Stored responses of idempotent requests: an in-process LRU in front of
+    the idempotency_keys table, plus the set of keys currently being
+    processed by this worker so concurrent duplicates wait for the first.
+    Across workers, the first request inserts a claim row for its key and
+    the others wait until the claim turns into a stored response.
+    """
+
+    def __init__(self, ttl: float, cache_size: int, pending_timeout: float):
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.pending_timeout = pending_timeout
+        self.in_flight: dict[str, asyncio.Future] = {}
+        self._lru: OrderedDict[str, StoredResponse] = OrderedDict()
+        self.replayed = 0
+        self.coalesced = 0
+        self.stored = 0
+        self.mismatched = 0
+
+    @staticmethod
+    def scope(request: Request, key: str) -> str:
+        user_id = getattr(request.ctx, "user_id", None)
+        raw = f"{request.method} {request.path} {user_id} {key}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @staticmethod
+    def request_hash(request: Request) -> str:
+        return hashlib.sha256(request.body or b"").hexdigest()
+
+    def _remember(self, scope: str, stored: StoredResponse) -> None:
+        self._lru[scope] = stored
+        self._lru.move_to_end(scope)
+        if len(self._lru) > self.cache_size:
+            self._lru.popitem(last=False)
+
+    def cached(self, scope: str) -> StoredResponse | None:
+        stored = self._lru.get(scope)
+        if stored is not None:
+            if stored.expires_at > time.time():
+                self._lru.move_to_end(scope)
+                return stored
+            del self._lru[scope]
+        return None
+
+    async def claim(self, scope: str, request_hash: str) -> StoredResponse | None:
+        """
+        Claims the key for processing by this worker.
+
+        Returns:
+            StoredResponse | None: None if the claim was taken, otherwise the
+                                   existing row (a stored response or another
+                                   worker's claim), or a claim with the
+                                   caller's hash if the row vanished meanwhile.
+        """
+        now = datetime.now(timezone.utc)
+        not_before = now - timedelta(seconds=self.ttl)
+        stale_before = now - timedelta(seconds=self.pending_timeout)
+        async with UnitOfWork(async_session_maker) as uow:
+            uow.set_repository("idempotency", IdempotencyRepo)
+            if await uow.idempotency.claim(scope, request_hash, not_before, stale_before):
+                return None
+            row = await uow.idempotency.get(scope, not_before)
+            if row is None:
+                return StoredResponse(None, None, None, request_hash, 0)
+            stored = StoredResponse(
+                row.status,
+                row.content_type,
+                row.body,
+                row.request_hash,
+                row.created_at.timestamp() + self.ttl,
+            )
+        if not stored.pending:
+            self._remember(scope, stored)
+        return stored
+
+    async def complete(self, scope: str, request_hash: str, resp: HTTPResponse) -> None:
+        stored = StoredResponse(
+            resp.status,
+            resp.content_type,
+            bytes(resp.body or b""),
+            request_hash,
+            time.time() + self.ttl,
+        )
+        async with UnitOfWork(async_session_maker) as uow:
+            uow.set_repository("idempotency", IdempotencyRepo)
+            await uow.idempotency.complete(
+                scope, stored.status, stored.content_type, stored.body
+            )
+        self._remember(scope, stored)
+        self.stored += 1
+
+    async def release(self, scope: str) -> None:
+        async with UnitOfWork(async_session_maker) as uow:
+            uow.set_repository("idempotency", IdempotencyRepo)
+            await uow.idempotency.release(scope)
+
+    async def delete_expired(self) -> int:
+        before = datetime.now(timezone.utc) - timedelta(seconds=self.ttl)
+        async with UnitOfWork(async_session_maker) as uow:
+            uow.set_repository("idempotency", IdempotencyRepo)
+            return await uow.idempotency.delete_expired(before)
+
+    def stats(self) -> dict:
+        return {
+            "cached": len(self._lru),
+            "in_flight": len(self.in_flight),
+            "replayed": self.replayed,
+            "coalesced": self.coalesced,
+            "stored": self.stored,
+            "mismatched": self.mismatched,
+        }
+
+
+_store: IdempotencyStore | None = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Returns the worker's idempotency store, creating it on first use."""
+    global _store
+    if _store is None:
+        _store = IdempotencyStore(
+            settings.IDEMPOTENCY_TTL_SECONDS,
+            settings.IDEMPOTENCY_CACHE_SIZE,
+            settings.IDEMPOTENCY_PENDING_TIMEOUT,
+        )
+        metrics.register("idempotency", _store.stats)
+    return _store
+
+
+def _storable(resp: HTTPResponse) -> bool:
+    return resp.status < 500 and resp.status != 429
+
+
+def idempotent(handler):
+    """
+    Decorator making a mutating handler idempotent per Idempotency-Key header.
+
+    A repeated request with the same key (and the same method, path and
+    authenticated user) gets the stored response bytes without running the
+    handler again; the same key with a different body gets a 422. A
+    duplicate arriving while the first is still running, on any worker,
+    waits for it, up to IDEMPOTENCY_WAIT_TIMEOUT, after which it gets a 409.
+    Requests without the header are handled normally.
+    Apply it below auth_required so the user is part of the scope.
+    """
+
+    @wraps(handler)
+    async def wrapper(request: Request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return await handler(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return response.json(
+                {"message": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters"},
+                status=400,
+            )
+
+        store = get_idempotency_store()
+        scope = store.scope(request, key)
+        request_hash = store.request_hash(request)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        delay = 0.05
+        while True:
+            stored = store.cached(scope)
+            if stored is None:
+                pending = store.in_flight.get(scope)
+                if pending is not None:
+                    store.coalesced += 1
+                    await asyncio.shield(pending)
+                    continue
+                stored = await store.claim(scope, request_hash)
+                if stored is None:
+                    break
+            if not stored.matches(request_hash):
+                store.mismatched += 1
+                return response.json(
+                    {"message": f"{HEADER} was already used with a different request body"},
+                    status=422,
+                )
+            if not stored.pending:
+                store.replayed += 1
+                return stored.to_response()
+            # Another worker holds the claim; poll until it stores a response,
+            # drops the claim or abandons it.
+            if time.monotonic() >= deadline:
+                return response.json(
+                    {"message": f"a request with this {HEADER} is still being processed"},
+                    status=409,
+                    headers={"Retry-After": "1"},
+                )
+            store.coalesced += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+        done = asyncio.get_running_loop().create_future()
+        store.in_flight[scope] = done
+        completed = False
+        try:
+            resp = await handler(request, *args, **kwargs)
+            if _storable(resp):
+                try:
+                    await store.complete(scope, request_hash, resp)
+                    completed = True
+                except Exception:
+                    logger.exception("Could not store idempotent response")
+            return resp
+        finally:
+            try:
+                if not completed:
+                    # Let a retry run the handler again.
+                    await asyncio.shield(store.release(scope))
+            except Exception:
+                logger.exception("Could not release idempotency key")
+            finally:
+                del store.in_flight[scope]
+                done.set_result(None)
+
+    return wrapper
+
+
+async def cleanup_expired(app) -> None:
+    """Background task deleting expired stored responses periodically."""
+    store = get_idempotency_store()
+    while True:
+        await asyncio.sleep(settings.IDEMPOTENCY_CLEANUP_INTERVAL)
+        try:
+            deleted = await store.delete_expired()
+            if deleted:
+                logger.info("Deleted %d expired idempotency keys", deleted)
+        except Exception:
+            logger.exception("Idempotency key cleanup failed")
@@ -0,0 +1,214 @@
+import asyncio
+import time
+from collections import deque
+
+from config import settings
+from utils import metrics
+
+# Default limits per route class. `target_latency` is in seconds; the limit
+# grows additively while requests finish under it and shrinks
+# multiplicatively when they do not (AIMD).
+ROUTE_CLASSES = {
+    "webhook": {
+        "initial": 20, "min_limit": 5, "max_limit": 100,
+        "max_queue": 200, "target_latency": 0.25,
+    },
+    "user": {
+        "initial": 20, "min_limit": 2, "max_limit": 100,
+        "max_queue": 50, "target_latency": 0.1,
+    },
+    "auth": {
+        "initial": 8, "min_limit": 1, "max_limit": 32,
+        "max_queue": 16, "target_latency": 0.5,
+    },
+    "admin": {
+        "initial": 4, "min_limit": 1, "max_limit": 16,
+        "max_queue": 8, "target_latency": 1.0,
+    },
+}
+
+# Classes shed immediately while payment webhooks are queueing.
+LOW_PRIORITY = ("user", "admin")
+
+# Long-lived streams hold their connection for minutes and are capped
+# separately, so they never take a limiter slot. Profiles mostly sleep and
+# run one at a time per worker.
+UNLIMITED_PATHS = ("/me/accounts/events", "/admin/profile")
+
+ROUTE_PREFIXES = (
+    ("/webhooks", "webhook"),
+    ("/auth", "auth"),
+    ("/admin", "admin"),
+    ("/me", "user"),
+)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limiter with a bounded FIFO wait queue whose limit adapts
+    to observed latency. The limit is cut at most once per round trip: only
+    a slow request that started after the last cut can cut it again, so a
+    burst of slow requests already in flight counts as one congestion
+    signal.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        max_queue: int,
+        target_latency: float,
+        backoff: float = 0.9,
+    ):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.in_flight = 0
+        self.shed = 0
+        self.completed = 0
+        self.latency_ewma = 0.0
+        self._decreased_at = float("-inf")
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float) -> bool:
+        """
+        Takes a slot, waiting up to `timeout` seconds in the queue.
+
+        Returns:
+            bool: False if the request must be shed.
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await asyncio.wait_for(fut, timeout)
+            return True
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if fut.done() and not fut.cancelled():
+                # The slot was handed over just as we gave up.
+                self._release_slot()
+            else:
+                fut.cancel()
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.shed += 1
+            return False
+
+    def release(self, latency: float) -> None:
+        """Returns a slot and adapts the limit to the request's latency."""
+        self.completed += 1
+        self.latency_ewma += 0.1 * (latency - self.latency_ewma)
+        if latency > self.target_latency:
+            now = time.monotonic()
+            if now - latency >= self._decreased_at:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._decreased_at = now
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self.in_flight += 1
+            fut.set_result(True)
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "shed": self.shed,
+            "completed": self.completed,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 2),
+        }
+
+
+class Slot:
+    """A held limiter slot; release() is idempotent."""
+
+    __slots__ = ("limiter", "started", "released")
+
+    def __init__(self, limiter: AdaptiveLimiter):
+        self.limiter = limiter
+        self.started = time.monotonic()
+        self.released = False
+
+    def release(self, *_) -> None:
+        if not self.released:
+            self.released = True
+            self.limiter.release(time.monotonic() - self.started)
+
+
+class RouteLimiters:
+    """Holds one AdaptiveLimiter per route class."""
+
+    def __init__(self, classes: dict[str, dict]):
+        self.limiters = {
+            name: AdaptiveLimiter(name, **params) for name, params in classes.items()
+        }
+
+    @staticmethod
+    def classify(path: str) -> str | None:
+        if path in UNLIMITED_PATHS:
+            return None
+        for prefix, route_class in ROUTE_PREFIXES:
+            if path.startswith(prefix):
+                return route_class
+        return None
+
+    async def acquire(self, route_class: str) -> Slot | None:
+        """
+        Takes a slot for a route class, or returns None if the request must
+        be shed.
+        """
+        limiter = self.limiters[route_class]
+        webhook = self.limiters.get("webhook")
+        if route_class in LOW_PRIORITY and webhook is not None and webhook.queued:
+            limiter.shed += 1
+            return None
+        if not await limiter.acquire(settings.LIMITER_QUEUE_TIMEOUT):
+            return None
+        return Slot(limiter)
+
+    def stats(self) -> dict:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+_route_limiters: RouteLimiters | None = None
+
+
+def get_route_limiters() -> RouteLimiters:
+    """Returns the worker's route limiters, creating them on first use."""
+    global _route_limiters
+    if _route_limiters is None:
+        classes = {
+            name: {**params, **settings.LIMITER_OVERRIDES.get(name, {})}
+            for name, params in ROUTE_CLASSES.items()
+        }
+        _route_limiters = RouteLimiters(classes)
+        metrics.register("limiter", _route_limiters.stats)
+    return _route_limiters
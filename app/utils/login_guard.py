@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import hmac
+import time
+from collections import OrderedDict, deque
+
+from sanic.log import logger
+
+from config import settings
+from db import async_session_maker
+from repositories.login_failure import LoginFailureRepo
+from uow import UnitOfWork
+from utils import metrics
+
+# Granularity of the shared counters; the shared window slides by buckets.
+SHARED_BUCKET_SECONDS = 60
+
+
+class SlidingWindowCounter:
+    """
+    Failure timestamps per key over the last `window` seconds. Only the
+    newest `limit` timestamps of a key are kept, which is all the check
+    needs, and the least recently failed keys are evicted past `max_keys`.
+    """
+
+    def __init__(self, limit: int, window: float, max_keys: int):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._keys: OrderedDict[str, deque] = OrderedDict()
+
+    def retry_after(self, key: str, now: float) -> float | None:
+        """Returns the seconds until the key may try again, or None if it may now."""
+        failures = self._keys.get(key)
+        if failures is None or len(failures) < self.limit:
+            return None
+        wait = failures[0] + self.window - now
+        return wait if wait > 0 else None
+
+    def add(self, key: str, now: float) -> None:
+        failures = self._keys.get(key)
+        if failures is None:
+            failures = self._keys[key] = deque(maxlen=self.limit)
+            if len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+        else:
+            self._keys.move_to_end(key)
+        failures.append(now)
+
+    def reset(self, key: str) -> None:
+        self._keys.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class LoginGuard:
+    """
+    Front line of /auth/login against credential stuffing.
+
+    Failed attempts are counted per email and per client IP in sliding
+    windows, and (email, password) pairs that recently failed are
+    remembered as an HMAC digest, so that throttled and repeated attempts
+    are rejected before any database lookup or bcrypt verify. With
+    LOGIN_THROTTLE_SHARED the counters are also kept in Postgres, so the
+    limits hold across workers.
+    """
+
+    def __init__(self):
+        window = settings.LOGIN_FAILURE_WINDOW
+        max_keys = settings.LOGIN_THROTTLE_MAX_KEYS
+        self.by_email = SlidingWindowCounter(settings.LOGIN_EMAIL_MAX_FAILURES, window, max_keys)
+        self.by_ip = SlidingWindowCounter(settings.LOGIN_IP_MAX_FAILURES, window, max_keys)
+        self.shared = settings.LOGIN_THROTTLE_SHARED
+        self._known_bad: OrderedDict[tuple[str, bytes], float] = OrderedDict()
+        self.throttled = 0
+        self.known_bad_hits = 0
+        self.failures = 0
+
+    @staticmethod
+    def _keys(email: str, ip: str | None) -> tuple[str, str | None]:
+        return f"email:{email.lower()}", f"ip:{ip}" if ip else None
+
+    @staticmethod
+    def _digest(email: str, password: str) -> bytes:
+        return hmac.new(
+            settings.SECRET_KEY.encode(), f"{email}\0{password}".encode(), hashlib.sha256
+        ).digest()
+
+    async def allowed(self, email: str, ip: str | None) -> bool:
+        """
+        Checks the email and IP limits. The local counters are consulted
+        first, so a worker under attack answers without touching the database.
+        """
+        email_key, ip_key = self._keys(email, ip)
+        now = time.monotonic()
+        if self.by_email.retry_after(email_key, now) is not None or (
+            ip_key and self.by_ip.retry_after(ip_key, now) is not None
+        ):
+            self.throttled += 1
+            return False
+        if not self.shared:
+            return True
+
+        since = int(time.time() - settings.LOGIN_FAILURE_WINDOW) // SHARED_BUCKET_SECONDS
+        keys = [k for k in (email_key, ip_key) if k]
+        try:
+            async with UnitOfWork(async_session_maker) as uow:
+                uow.set_repository("login_failure", LoginFailureRepo)
+                counts = await uow.login_failure.counts(keys, since)
+        except Exception:
+            logger.exception("Could not read shared login failures")
+            return True
+        if counts.get(email_key, 0) >= settings.LOGIN_EMAIL_MAX_FAILURES or (
+            ip_key and counts.get(ip_key, 0) >= settings.LOGIN_IP_MAX_FAILURES
+        ):
+            self.throttled += 1
+            return False
+        return True
+
+    def known_bad(self, email: str, password: str) -> bool:
+        """Tells whether the pair failed to verify within LOGIN_NEGATIVE_CACHE_TTL."""
+        key = (email, self._digest(email, password))
+        expires_at = self._known_bad.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._known_bad[key]
+            return False
+        self.known_bad_hits += 1
+        return True
+
+    async def record_failure(self, email: str, ip: str | None, password: str) -> None:
+        email_key, ip_key = self._keys(email, ip)
+        now = time.monotonic()
+        self.failures += 1
+        self.by_email.add(email_key, now)
+        if ip_key:
+            self.by_ip.add(ip_key, now)
+
+        key = (email, self._digest(email, password))
+        self._known_bad[key] = now + settings.LOGIN_NEGATIVE_CACHE_TTL
+        self._known_bad.move_to_end(key)
+        if len(self._known_bad) > settings.LOGIN_NEGATIVE_CACHE_SIZE:
+            self._known_bad.popitem(last=False)
+
+        if self.shared:
+            bucket = int(time.time()) // SHARED_BUCKET_SECONDS
+            try:
+                async with UnitOfWork(async_session_maker) as uow:
+                    uow.set_repository("login_failure", LoginFailureRepo)
+                    await uow.login_failure.add([k for k in (email_key, ip_key) if k], bucket)
+            except Exception:
+                logger.exception("Could not record shared login failure")
+
+    async def record_success(self, email: str) -> None:
+        """Clears the email's failures; the IP keeps its count."""
+        email_key, _ = self._keys(email, None)
+        self.by_email.reset(email_key)
+        if self.shared:
+            try:
+                async with UnitOfWork(async_session_maker) as uow:
+                    uow.set_repository("login_failure", LoginFailureRepo)
+                    await uow.login_failure.reset(email_key)
+            except Exception:
+                logger.exception("Could not reset shared login failures")
+
+    def forget(self, email: str) -> None:
+        """
+        Drops the remembered bad passwords and local failure count of an
+        email, so that a password just set for it is accepted right away
+        by this worker (others forget within LOGIN_NEGATIVE_CACHE_TTL).
+        """
+        self.by_email.reset(self._keys(email, None)[0])
+        email = email.lower()
+        for key in [k for k in self._known_bad if k[0].lower() == email]:
+            del self._known_bad[key]
+
+    @staticmethod
+    async def delay_rejection(started: float) -> None:
+        """
+        Sleeps until LOGIN_REJECT_DELAY seconds after `started` (a
+        time.monotonic() value), so that throttled, cached, unknown-email
+        and wrong-password rejections all take the same time.
+        """
+        remaining = started + settings.LOGIN_REJECT_DELAY - time.monotonic()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    async def delete_expired(self) -> int:
+        before = int(time.time() - settings.LOGIN_FAILURE_WINDOW) // SHARED_BUCKET_SECONDS
+        async with UnitOfWork(async_session_maker) as uow:
+            uow.set_repository("login_failure", LoginFailureRepo)
+            return await uow.login_failure.delete_expired(before)
+
+    def stats(self) -> dict:
+        return {
+            "emails": len(self.by_email),
+            "ips": len(self.by_ip),
+            "known_bad": len(self._known_bad),
+            "throttled": self.throttled,
+            "known_bad_hits": self.known_bad_hits,
+            "failures": self.failures,
+        }
+
+
+_guard: LoginGuard | None = None
+
+
+def get_login_guard() -> LoginGuard:
+    """Returns the worker's login guard, creating it on first use."""
+    global _guard
+    if _guard is None:
+        _guard = LoginGuard()
+        metrics.register("login_guard", _guard.stats)
+    return _guard
+
+
+async def cleanup_login_failures(app) -> None:
+    """Background task deleting expired shared login failure buckets."""
+    if not settings.LOGIN_THROTTLE_SHARED:
+        return
+    guard = get_login_guard()
+    while True:
+        await asyncio.sleep(SHARED_BUCKET_SECONDS)
+        try:
+            await guard.delete_expired()
+        except Exception:
+            logger.exception("Login failure cleanup failed")
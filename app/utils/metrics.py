@@ -0,0 +1,16 @@
+from typing import Callable
+
+_collectors: dict[str, Callable[[], dict]] = {}
+
+
+def register(name: str, collector: Callable[[], dict]) -> None:
+    """
+    Registers a callable returning the current metrics of a component.
+    The collector is called on every snapshot, so it must be cheap.
+    """
+    _collectors[name] = collector
+
+
+def snapshot() -> dict:
+    """Returns the metrics of every registered component of this worker."""
+    return {name: collector() for name, collector in _collectors.items()}
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import os
+import urllib.request
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from sanic.log import logger
+
+from config import settings
+from db import async_session_maker
+from repositories.outbox import OutboxRepo
+from uow import UnitOfWork
+from utils import metrics
+
+MAX_BACKOFF = 30.0
+
+
+class FileSink:
+    """Appends events as NDJSON lines to a local file and fsyncs each batch."""
+
+    def __init__(self, url: str):
+        self.name = url
+        self.path = urlsplit(url).path
+
+    def _append(self, data: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def send(self, messages: list[dict]) -> None:
+        data = "".join(json.dumps(m) + "\n" for m in messages)
+        await asyncio.to_thread(self._append, data)
+
+
+class HttpSink:
+    """
+    POSTs each batch as {"events": [...]} to an endpoint. Any non-2xx
+    response fails the batch, which is then retried.
+    """
+
+    def __init__(self, url: str):
+        self.name = url
+        self.url = url
+
+    def _post(self, body: bytes) -> None:
+        req = urllib.request.Request(
+            self.url,
+            data=body,
+            method="POST",
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(req, timeout=settings.OUTBOX_HTTP_TIMEOUT) as resp:
+            resp.read()
+
+    async def send(self, messages: list[dict]) -> None:
+        body = json.dumps({"events": messages}).encode()
+        await asyncio.to_thread(self._post, body)
+
+
+# Sink class per URL scheme of OUTBOX_SINK_URL.
+SINKS = {
+    "file": FileSink,
+    "http": HttpSink,
+    "https": HttpSink,
+}
+
+
+def make_sink(url: str):
+    scheme = urlsplit(url).scheme
+    if scheme not in SINKS:
+        raise ValueError(f"Unsupported outbox sink: {url!r}")
+    return SINKS[scheme](url)
+
+
+def to_message(event) -> dict:
+    return {
+        "id": event.id,
+        "topic": event.topic,
+        "created_at": event.created_at.isoformat(),
+        "payload": event.payload,
+    }
+
+
+class OutboxRelay:
+    """
+    Drains the outbox into a sink. Each batch is claimed for `lease`
+    seconds in a short transaction, sent with no transaction open, and
+    deleted in a second one, so a slow sink holds no row locks or pooled
+    connection. Relays on several workers split the work, and an event is
+    only removed after the sink accepted it (at-least-once; consumers
+    dedupe by "id"). A batch whose relay died is claimed again once its
+    lease runs out.
+    """
+
+    def __init__(self, sink, batch_size: int, poll_interval: float, lease: float):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.delivered = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_event_id = None
+        self.lag_seconds = 0.0
+
+    async def deliver_batch(self) -> int:
+        """Delivers one batch and returns the number of events sent."""
+        async with UnitOfWork(async_session_maker) as uow:
+            uow.set_repository("outbox", OutboxRepo)
+            events = await uow.outbox.claim_batch(self.batch_size, self.lease)
+        if not events:
+            self.lag_seconds = 0.0
+            return 0
+
+        ids = [e.id for e in events]
+        try:
+            await self.sink.send([to_message(e) for e in events])
+        except Exception:
+            async with UnitOfWork(async_session_maker) as uow:
+                uow.set_repository("outbox", OutboxRepo)
+                await uow.outbox.release_ids(ids)
+            raise
+        async with UnitOfWork(async_session_maker) as uow:
+            uow.set_repository("outbox", OutboxRepo)
+            await uow.outbox.delete_ids(ids)
+            await uow.outbox.advance_offset(self.sink.name, events[-1].id, len(events))
+
+        self.delivered += len(events)
+        self.batches += 1
+        self.last_event_id = events[-1].id
+        self.lag_seconds = (
+            datetime.now(timezone.utc) - events[0].created_at
+        ).total_seconds()
+        return len(events)
+
+    async def run(self) -> None:
+        failures = 0
+        while True:
+            try:
+                sent = await self.deliver_batch()
+                failures = 0
+            except Exception:
+                self.failures += 1
+                failures += 1
+                logger.exception("Outbox delivery to %s failed", self.sink.name)
+                await asyncio.sleep(min(self.poll_interval * 2 ** failures, MAX_BACKOFF))
+                continue
+            if sent < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> dict:
+        return {
+            "sink": self.sink.name,
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "failures": self.failures,
+            "last_event_id": self.last_event_id,
+            "lag_seconds": round(self.lag_seconds, 3),
+        }
+
+
+async def relay_outbox(app) -> None:
+    """
+    Background task delivering outbox events to OUTBOX_SINK_URL. Does
+    nothing when no sink is configured.
+    """
+    if not settings.OUTBOX_SINK_URL:
+        if settings.OUTBOX_ENABLED:
+            logger.warning("OUTBOX_ENABLED is set without OUTBOX_SINK_URL; outbox_events will grow")
+        return
+    relay = OutboxRelay(
+        make_sink(settings.OUTBOX_SINK_URL),
+        settings.OUTBOX_BATCH_SIZE,
+        settings.OUTBOX_POLL_INTERVAL,
+        settings.OUTBOX_CLAIM_LEASE,
+    )
+    metrics.register("outbox", relay.stats)
+    logger.info("Relaying outbox events to %s", relay.sink.name)
+    await relay.run()
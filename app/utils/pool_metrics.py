@@ -0,0 +1,58 @@
+import time
+
+from sanic.log import logger
+from sqlalchemy import event
+
+from config import settings
+from utils import metrics
+
+
+class PoolStats:
+    """
+    Tracks how long connections stay checked out of the pool, using the
+    pool's checkout/checkin events.
+    """
+
+    def __init__(self, pool, slow_ms: float):
+        self.pool = pool
+        self.slow_ms = slow_ms
+        self.checkouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow = 0
+
+    def on_checkout(self, dbapi_connection, record, proxy) -> None:
+        record.info["checked_out_at"] = time.perf_counter()
+        self.checkouts += 1
+
+    def on_checkin(self, dbapi_connection, record) -> None:
+        started = record.info.pop("checked_out_at", None)
+        if started is None:
+            return
+        held_ms = (time.perf_counter() - started) * 1000
+        self.total_ms += held_ms
+        self.max_ms = max(self.max_ms, held_ms)
+        if held_ms >= self.slow_ms:
+            self.slow += 1
+            logger.warning("Connection held for %.0f ms", held_ms)
+
+    def snapshot(self) -> dict:
+        returned = self.checkouts - self.pool.checkedout()
+        return {
+            "size": self.pool.size(),
+            "checked_out": self.pool.checkedout(),
+            "overflow": self.pool.overflow(),
+            "checkouts": self.checkouts,
+            "avg_held_ms": round(self.total_ms / returned, 2) if returned else None,
+            "max_held_ms": round(self.max_ms, 2),
+            "slow": self.slow,
+        }
+
+
+def install(engine) -> PoolStats:
+    """Attaches checkout metrics to an engine's pool and registers them."""
+    stats = PoolStats(engine.pool, settings.DB_SLOW_CHECKOUT_MS)
+    event.listen(engine.sync_engine, "checkout", stats.on_checkout)
+    event.listen(engine.sync_engine, "checkin", stats.on_checkin)
+    metrics.register("pool", stats.snapshot)
+    return stats
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Async task stacks are walked once per this many thread samples; walking
+# every task is costlier than one thread stack and waits change slowly.
+TASK_SAMPLE_EVERY = 10
+
+
+def _label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+def thread_stack(frame) -> list[str]:
+    """Labels of a thread's frames, outermost first."""
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def task_stack(task: asyncio.Task) -> list[str]:
+    """
+    Labels of the coroutines a task is suspended in, outermost first, ending
+    with what the innermost one awaits (usually a Future, or another Task).
+    """
+    labels = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        code = (
+            getattr(awaitable, "cr_code", None)
+            or getattr(awaitable, "gi_code", None)
+            or getattr(awaitable, "ag_code", None)
+        )
+        if code is None:
+            if isinstance(awaitable, asyncio.Task):
+                labels.append(f"<Task {awaitable.get_name()}>")
+            else:
+                # Awaiting a Future goes through its C iterator.
+                name = type(awaitable).__qualname__
+                labels.append("<Future>" if name == "FutureIter" else f"<{name}>")
+            break
+        labels.append(_label(code))
+        awaitable = (
+            getattr(awaitable, "cr_await", None)
+            or getattr(awaitable, "gi_yieldfrom", None)
+            or getattr(awaitable, "ag_await", None)
+        )
+    return labels
+
+
+class Profile:
+    """
+    Statistical profile of this worker: stacks of every thread sampled from
+    a side thread every `interval` seconds, which also catches code that
+    blocks the event loop, plus the await chains of all pending asyncio
+    tasks, which show what each coroutine is waiting on.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.threads = Counter()
+        self.tasks = Counter()
+        self.thread_samples = 0
+        self.task_samples = 0
+        self.started_at = None
+        self.duration = 0.0
+
+    def _sample_threads(self, stop: threading.Event) -> None:
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                name = names.get(ident)
+                if name is None:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                    name = names.get(ident, str(ident))
+                self.threads[(f"thread {name}", *thread_stack(frame))] += 1
+            self.thread_samples += 1
+
+    def _sample_tasks(self) -> None:
+        current = asyncio.current_task()
+        for task in asyncio.all_tasks():
+            if task is not current:
+                self.tasks[(f"task {task.get_name()}", *task_stack(task))] += 1
+        self.task_samples += 1
+
+    async def run(self, seconds: float) -> None:
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self._sample_threads, args=(stop,), name="profiler", daemon=True
+        )
+        self.started_at = time.time()
+        started = time.monotonic()
+        sampler.start()
+        try:
+            while time.monotonic() - started < seconds:
+                await asyncio.sleep(self.interval * TASK_SAMPLE_EVERY)
+                self._sample_tasks()
+        finally:
+            stop.set()
+            await asyncio.to_thread(sampler.join)
+            self.duration = time.monotonic() - started
+
+    def collapsed(self) -> str:
+        """
+        The samples in collapsed-stack format ("frame;frame;... count" per
+        line), as read by flamegraph.pl and speedscope. Thread stacks are
+        rooted at "thread <name>", task await chains at "task <name>".
+        """
+        lines = [
+            f"{';'.join(stack)} {count}"
+            for counter in (self.threads, self.tasks)
+            for stack, count in counter.most_common()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def summary(self, top: int = 20) -> dict:
+        """The most frequent stacks with their share of samples."""
+
+        def entries(counter: Counter, samples: int) -> list[dict]:
+            return [
+                {
+                    "stack": list(stack),
+                    "samples": count,
+                    "share": round(count / samples, 4) if samples else None,
+                }
+                for stack, count in counter.most_common(top)
+            ]
+
+        return {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "duration": round(self.duration, 3),
+            "interval_ms": self.interval * 1000,
+            "thread_samples": self.thread_samples,
+            "task_samples": self.task_samples,
+            "threads": entries(self.threads, self.thread_samples),
+            "tasks": entries(self.tasks, self.task_samples),
+        }
+
+
+_running = False
+
+
+async def profile_worker(seconds: float, interval: float) -> Profile | None:
+    """
+    Profiles this worker for `seconds`, or returns None if a profile is
+    already running here.
+    """
+    global _running
+    if _running:
+        return None
+    _running = True
+    try:
+        profile = Profile(interval)
+        await profile.run(seconds)
+        return profile
+    finally:
+        _running = False
@@ -1,12 +1,55 @@
 import hashlib
 from config import settings
-from passlib.context import CryptContext
 
-pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_pwd = None
+
+SUPPORTED_SCHEMES = ("bcrypt", "argon2")
+
+
+def pwd_context_options() -> dict:
+    """
+    CryptContext options from the PASSWORD_* settings.
+
+    The first scheme hashes new passwords and the others are only verified.
+    The configured cost is both the default and the accepted range, so
+    needs_update() flags every hash made with another scheme or cost.
+    """
+    bcrypt_rounds = settings.PASSWORD_BCRYPT_ROUNDS
+    argon2_rounds = settings.PASSWORD_ARGON2_TIME_COST
+    return {
+        "schemes": settings.PASSWORD_SCHEMES,
+        "deprecated": "auto",
+        "bcrypt__rounds": bcrypt_rounds,
+        "bcrypt__min_rounds": bcrypt_rounds,
+        "bcrypt__max_rounds": bcrypt_rounds,
+        "argon2__rounds": argon2_rounds,
+        "argon2__min_rounds": argon2_rounds,
+        "argon2__max_rounds": argon2_rounds,
+        "argon2__memory_cost": settings.PASSWORD_ARGON2_MEMORY_COST,
+        "argon2__parallelism": settings.PASSWORD_ARGON2_PARALLELISM,
+    }
+
+
+def get_pwd_context():
+    """
+    Returns the password hashing context, importing passlib and the hash
+    backends on the first password operation rather than at startup.
+    """
+    global _pwd
+    if _pwd is None:
+        from passlib.context import CryptContext
+
+        _pwd = CryptContext(**pwd_context_options())
+    return _pwd
 
 
 def compute_signature(
-    *, account_id: int, amount: float, transaction_id: str, user_id: int
+    *,
+    account_id: int,
+    amount: float,
+    transaction_id: str,
+    user_id: int,
+    secret: str | None = None,
 ) -> str:
     """
     Compute a SHA-256 signature for payment validation.
@@ -16,11 +59,15 @@ def compute_signature(
         amount (float): Payment amount.
         transaction_id (str): Unique transaction ID.
         user_id (int): ID of the user.
+        secret (str | None): Signing secret; defaults to SECRET_KEY. Lets
+            tools sign for another instance, e.g. when replaying webhooks.
 
     Returns:
         str: Hexadecimal SHA-256 signature string.
     """
-    raw = f"{account_id}{amount}{transaction_id}{user_id}{settings.SECRET_KEY}"
+    if secret is None:
+        secret = settings.SECRET_KEY
+    raw = f"{account_id}{amount}{transaction_id}{user_id}{secret}"
     return hashlib.sha256(raw.encode()).hexdigest()
 
 
@@ -35,12 +82,25 @@ def verify_password(plain: str, hashed: str) -> bool:
     Returns:
         bool: True if the password matches, False otherwise.
     """
-    return pwd.verify(plain, hashed)
+    return get_pwd_context().verify(plain, hashed)
+
+
+def password_needs_update(hashed: str) -> bool:
+    """
+    Tell whether a stored hash uses another scheme or cost than configured.
+
+    Args:
+        hashed (str): Hashed password stored in the database.
+
+    Returns:
+        bool: True if the password should be rehashed on its next verify.
+    """
+    return get_pwd_context().needs_update(hashed)
 
 
 def hash_password(password: str) -> str:
     """
-    Hash a plaintext password using bcrypt.
+    Hash a plaintext password with the configured default scheme.
 
     Args:
         password (str): Plaintext password.
@@ -48,4 +108,20 @@ def hash_password(password: str) -> str:
     Returns:
         str: Hashed password string suitable for storage.
     """
-    return pwd.hash(password)
+    return get_pwd_context().hash(password)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """
+    Hash a batch of plaintext passwords.
+
+    Module-level so it can be shipped to a process pool.
+
+    Args:
+        passwords (list[str]): Plaintext passwords.
+
+    Returns:
+        list[str]: Hashed passwords in the same order.
+    """
+    pwd = get_pwd_context()
+    return [pwd.hash(p) for p in passwords]
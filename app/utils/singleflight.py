@@ -0,0 +1,71 @@
+import asyncio
+from collections import defaultdict
+from typing import Awaitable, Callable, Hashable
+
+from utils import metrics
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for a key is in
+    flight, later callers with the same key await its result instead of
+    issuing their own. Nothing is kept once the call completes, so results
+    are never staler than a fresh call started at the same time.
+
+    Keys are tuples whose first element names the operation; metrics are
+    aggregated per operation.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self._stats: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "executed": 0, "shared": 0, "errors": 0}
+        )
+        metrics.register(f"singleflight.{name}", self.stats)
+
+    async def do(self, key: tuple, fn: Callable[[], Awaitable]):
+        """
+        Runs `fn` unless a call with the same key is already in flight, in
+        which case its result (or exception) is shared.
+        """
+        stats = self._stats[key[0]]
+        stats["calls"] += 1
+        while True:
+            pending = self._calls.get(key)
+            if pending is None:
+                break
+            stats["shared"] += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if pending.cancelled():
+                    # The leading call was cancelled; run it ourselves.
+                    continue
+                raise
+
+        fut = asyncio.get_running_loop().create_future()
+        self._calls[key] = fut
+        stats["executed"] += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            stats["errors"] += 1
+            fut.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting.
+            fut.exception()
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {
+            op: {**counters, "in_flight": sum(1 for k in self._calls if k[0] == op)}
+            for op, counters in self._stats.items()
+        }
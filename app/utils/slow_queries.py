@@ -0,0 +1,224 @@
+import asyncio
+import os
+import random
+import re
+import sys
+import time
+from collections import deque
+
+import asyncpg
+import greenlet
+from sanic.log import logger
+from sanic.request import Request
+from sqlalchemy import event
+
+from config import settings
+from utils import metrics
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Distinct statements aggregated per worker; past this the one with the
+# least total time is forgotten.
+MAX_STATEMENTS = 1000
+
+# Only plain SELECTs are re-run by EXPLAIN ANALYZE. Writes and row-locking
+# reads get a plain EXPLAIN, so capturing a plan never changes data or
+# blocks a webhook.
+ROW_LOCK = re.compile(r"\bfor\s+(no\s+key\s+)?(update|share|key\s+share)\b", re.I)
+
+
+def _analyzable(statement: str) -> bool:
+    return statement.lstrip()[:6].lower() == "select" and not ROW_LOCK.search(statement)
+
+
+def _origin() -> str | None:
+    """
+    The innermost application frame that issued the statement, e.g. the
+    repository method. Statements run in a greenlet spawned by SQLAlchemy;
+    its parent's frame continues into the awaiting coroutines.
+    """
+    current = greenlet.getcurrent()
+    frame = current.parent.gr_frame if current.parent is not None else sys._getframe()
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR) and filename != __file__:
+            return f"{os.path.relpath(filename, APP_DIR)}:{frame.f_code.co_qualname}"
+        frame = frame.f_back
+    return None
+
+
+def _route() -> str | None:
+    try:
+        request = Request.get_current()
+    except Exception:
+        return None
+    return f"{request.method} {request.uri_template or request.path}"
+
+
+class SlowQueryLog:
+    """
+    Statements slower than `threshold_ms`: the latest ones in a ring buffer
+    and a per-statement aggregate for finding the top offenders. A sampled
+    fraction of slow statements gets its plan captured with EXPLAIN on a
+    dedicated connection, outside the pool and off the request path.
+    """
+
+    def __init__(self, threshold_ms: float, buffer_size: int, explain_sample: float):
+        self.threshold_ms = threshold_ms
+        self.explain_sample = explain_sample
+        self.recent: deque[dict] = deque(maxlen=buffer_size)
+        self.statements: dict[str, dict] = {}
+        self.slow = 0
+        self.explains = 0
+        self._explain_conn = None
+        self._explain_task = None
+        self._explaining = False
+
+    def before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context.slow_query_started = time.perf_counter()
+
+    def after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context.slow_query_started) * 1000
+        if elapsed_ms < self.threshold_ms:
+            return
+        self.record(statement, elapsed_ms, _origin(), _route())
+        if (
+            not executemany
+            and not self._explaining
+            and random.random() < self.explain_sample
+        ):
+            self._explaining = True
+            self._explain_task = asyncio.get_running_loop().create_task(
+                self.explain(statement, parameters)
+            )
+
+    def record(self, statement: str, elapsed_ms: float, origin: str | None, route: str | None):
+        self.slow += 1
+        self.recent.append(
+            {
+                "at": time.time(),
+                "ms": round(elapsed_ms, 2),
+                "sql": statement,
+                "origin": origin,
+                "route": route,
+            }
+        )
+        entry = self.statements.get(statement)
+        if entry is None:
+            if len(self.statements) >= MAX_STATEMENTS:
+                least = min(self.statements, key=lambda s: self.statements[s]["total_ms"])
+                del self.statements[least]
+            entry = self.statements[statement] = {
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "origins": set(),
+                "routes": set(),
+                "plan": None,
+            }
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        if origin:
+            entry["origins"].add(origin)
+        if route:
+            entry["routes"].add(route)
+
+    async def _connection(self):
+        from db import asyncpg_dsn  # db installs this module on its engine
+
+        if self._explain_conn is None or self._explain_conn.is_closed():
+            timeout_ms = int(settings.DB_SLOW_QUERY_EXPLAIN_TIMEOUT * 1000)
+            self._explain_conn = await asyncpg.connect(
+                asyncpg_dsn(), server_settings={"statement_timeout": str(timeout_ms)}
+            )
+        return self._explain_conn
+
+    async def close(self) -> None:
+        """Closes the EXPLAIN connection, if one was opened."""
+        if self._explain_conn is not None and not self._explain_conn.is_closed():
+            await self._explain_conn.close()
+        self._explain_conn = None
+
+    async def explain(self, statement: str, parameters) -> None:
+        """
+        Captures the plan of a slow statement with its original parameters,
+        in a transaction that is rolled back. Plain SELECTs are re-run under
+        ANALYZE; other statements are only planned.
+        """
+        analyze = _analyzable(statement)
+        options = "ANALYZE, BUFFERS" if analyze else "VERBOSE"
+        try:
+            conn = await self._connection()
+            transaction = conn.transaction()
+            await transaction.start()
+            try:
+                rows = await conn.fetch(
+                    f"EXPLAIN ({options}) {statement}", *(parameters or ())
+                )
+            finally:
+                await transaction.rollback()
+        except Exception as e:
+            logger.warning("Could not EXPLAIN slow statement: %s", e)
+            return
+        finally:
+            self._explaining = False
+        self.explains += 1
+        entry = self.statements.get(statement)
+        if entry is not None:
+            entry["plan"] = {
+                "at": time.time(),
+                "analyze": analyze,
+                "text": "\n".join(r[0] for r in rows),
+            }
+
+    def top(self, limit: int) -> list[dict]:
+        """The slow statements with the most total time, worst first."""
+        ranked = sorted(
+            self.statements.items(), key=lambda item: item[1]["total_ms"], reverse=True
+        )
+        return [
+            {
+                "sql": statement,
+                "count": e["count"],
+                "total_ms": round(e["total_ms"], 2),
+                "avg_ms": round(e["total_ms"] / e["count"], 2),
+                "max_ms": round(e["max_ms"], 2),
+                "origins": sorted(e["origins"]),
+                "routes": sorted(e["routes"]),
+                "plan": e["plan"],
+            }
+            for statement, e in ranked[:limit]
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "slow": self.slow,
+            "statements": len(self.statements),
+            "explains": self.explains,
+        }
+
+
+_log: SlowQueryLog | None = None
+
+
+def get_slow_query_log() -> SlowQueryLog:
+    """Returns the worker's slow query log, creating it on first use."""
+    global _log
+    if _log is None:
+        _log = SlowQueryLog(
+            settings.DB_SLOW_QUERY_MS,
+            settings.DB_SLOW_QUERY_BUFFER,
+            settings.DB_SLOW_QUERY_EXPLAIN_SAMPLE,
+        )
+        metrics.register("slow_queries", _log.stats)
+    return _log
+
+
+def install(engine) -> SlowQueryLog:
+    """Times every statement of an engine and logs the slow ones."""
+    log = get_slow_query_log()
+    event.listen(engine.sync_engine, "before_cursor_execute", log.before_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", log.after_execute)
+    return log
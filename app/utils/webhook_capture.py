@@ -0,0 +1,206 @@
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+from sanic.log import logger
+from sanic.request import Request
+
+from config import settings
+from utils import metrics
+from utils.idempotency import HEADER as IDEMPOTENCY_HEADER
+
+FILE_PREFIX = "webhooks-"
+FILE_SUFFIX = ".ndjson.gz"
+
+
+class CapturedRequest:
+    __slots__ = ("ts", "body", "idempotency_key", "status", "done")
+
+    def __init__(self, ts: float, body: bytes, idempotency_key: str | None):
+        self.ts = ts
+        self.body = body
+        self.idempotency_key = idempotency_key
+        self.status = None
+        self.done = False
+
+    def to_line(self) -> str:
+        entry = {
+            "ts": self.ts,
+            "body": self.body.decode("utf-8", errors="replace"),
+            "status": self.status,
+        }
+        if self.idempotency_key:
+            entry["idempotency_key"] = self.idempotency_key
+        return json.dumps(entry) + "\n"
+
+
+class WebhookCapture:
+    """
+    Records raw webhook requests for replay. The request path only appends
+    to an in-memory buffer; a background task writes the buffer to gzipped
+    NDJSON files in a worker thread, starting a new file every `max_bytes`
+    of input and keeping the newest `keep_files` files of this worker. When
+    the writer falls behind by `max_buffer` records, new ones are dropped
+    rather than slowing down webhooks.
+
+    A request takes its place in the buffer when it arrives and is written
+    once it and every earlier request have finished, so files stay sorted
+    by arrival time, as replay expects.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, keep_files: int, max_buffer: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.keep_files = keep_files
+        self.max_buffer = max_buffer
+        self._buffer: deque[CapturedRequest] = deque()
+        self._file = None
+        self._file_bytes = 0
+        # Held while the file is written, which happens in a worker thread.
+        self._lock = threading.RLock()
+        self.captured = 0
+        self.dropped = 0
+        self.files = 0
+
+    def start(
+        self, received_at: float, body: bytes, idempotency_key: str | None
+    ) -> CapturedRequest | None:
+        """Reserves the request's place in the buffer; None if it is dropped."""
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            return None
+        entry = CapturedRequest(received_at, body, idempotency_key)
+        self._buffer.append(entry)
+        self.captured += 1
+        return entry
+
+    @staticmethod
+    def finish(entry: CapturedRequest, status: int | None) -> None:
+        """Records the response status; None if the request was cancelled."""
+        entry.status = status
+        entry.done = True
+
+    def _take(self, finished_only: bool) -> list[CapturedRequest]:
+        entries = []
+        while self._buffer and (self._buffer[0].done or not finished_only):
+            entries.append(self._buffer.popleft())
+        return entries
+
+    def _open(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{FILE_PREFIX}{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}{FILE_SUFFIX}"
+        self._file = gzip.open(os.path.join(self.directory, name), "at", encoding="utf-8")
+        self._file_bytes = 0
+        self.files += 1
+
+        own = sorted(
+            f
+            for f in os.listdir(self.directory)
+            if f.startswith(FILE_PREFIX) and f.endswith(f"-{os.getpid()}{FILE_SUFFIX}")
+        )
+        for old in own[: -self.keep_files]:
+            os.remove(os.path.join(self.directory, old))
+
+    def _write(self, entries: list[CapturedRequest]) -> None:
+        with self._lock:
+            if self._file is None or self._file_bytes >= self.max_bytes:
+                self.close()
+                self._open()
+            data = "".join(e.to_line() for e in entries)
+            self._file.write(data)
+            self._file.flush()
+            self._file_bytes += len(data)
+
+    async def flush(self) -> None:
+        entries = self._take(finished_only=True)
+        if entries:
+            await asyncio.to_thread(self._write, entries)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def shutdown(self) -> None:
+        """Writes what is still buffered, finished or not, and closes the file."""
+        entries = self._take(finished_only=False)
+        if entries:
+            self._write(entries)
+        self.close()
+
+    def stats(self) -> dict:
+        return {
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "buffered": len(self._buffer),
+            "files": self.files,
+        }
+
+
+_capture: WebhookCapture | None = None
+
+
+def get_webhook_capture() -> WebhookCapture | None:
+    """Returns the worker's capture, or None unless WEBHOOK_CAPTURE_DIR is set."""
+    global _capture
+    if _capture is None and settings.WEBHOOK_CAPTURE_DIR:
+        _capture = WebhookCapture(
+            settings.WEBHOOK_CAPTURE_DIR,
+            settings.WEBHOOK_CAPTURE_MAX_BYTES,
+            settings.WEBHOOK_CAPTURE_KEEP_FILES,
+            settings.WEBHOOK_CAPTURE_BUFFER,
+        )
+        metrics.register("webhook_capture", _capture.stats)
+    return _capture
+
+
+def captured(handler):
+    """
+    Decorator recording each request body, its arrival time and the
+    response status when capture is enabled. Apply it above @idempotent so
+    replayed responses are captured as the client saw them.
+    """
+
+    @wraps(handler)
+    async def wrapper(request: Request, *args, **kwargs):
+        capture = get_webhook_capture()
+        if capture is None:
+            return await handler(request, *args, **kwargs)
+        entry = capture.start(
+            time.time(), request.body, request.headers.get(IDEMPOTENCY_HEADER)
+        )
+        status = None
+        try:
+            resp = await handler(request, *args, **kwargs)
+            status = resp.status
+            return resp
+        except Exception as e:
+            status = getattr(e, "status_code", 500)
+            raise
+        finally:
+            if entry is not None:
+                capture.finish(entry, status)
+
+    return wrapper
+
+
+async def write_webhook_capture(app) -> None:
+    """Background task writing captured webhooks to disk every second."""
+    capture = get_webhook_capture()
+    if capture is None:
+        return
+    try:
+        while True:
+            await asyncio.sleep(1)
+            try:
+                await capture.flush()
+            except Exception:
+                logger.exception("Could not write webhook capture")
+    finally:
+        capture.shutdown()